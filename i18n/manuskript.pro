@@ -10,6 +10,7 @@ FORMS += ../manuskript/ui/search_ui.ui
 FORMS += ../manuskript/ui/settings_ui.ui
 FORMS += ../manuskript/ui/tools/frequency_ui.ui
 FORMS += ../manuskript/ui/tools/targets_ui.ui
+FORMS += ../manuskript/ui/tools/spellcheckReport_ui.ui
 FORMS += ../manuskript/ui/editors/locker_ui.ui
 FORMS += ../manuskript/ui/editors/editorWidget_ui.ui
 FORMS += ../manuskript/ui/editors/completer_ui.ui
@@ -139,6 +140,8 @@ SOURCES += ../manuskript/ui/tools/frequency_ui.py
 SOURCES += ../manuskript/ui/tools/targets_ui.py
 SOURCES += ../manuskript/ui/tools/frequencyAnalyzer.py
 SOURCES += ../manuskript/ui/tools/targets.py
+SOURCES += ../manuskript/ui/tools/spellcheckReport_ui.py
+SOURCES += ../manuskript/ui/tools/spellcheckReport.py
 SOURCES += ../manuskript/ui/helpLabel.py
 SOURCES += ../manuskript/ui/editors/completer_ui.py
 SOURCES += ../manuskript/ui/editors/fullScreenEditor.py
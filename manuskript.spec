@@ -30,7 +30,9 @@ a = Analysis(
         ("sample-projects", "sample-projects"),
         ("i18n", "i18n"),
     ],
-    hiddenimports=["xml.dom"],
+    # Optional modules imported by name on first use (see lazyModule)
+    hiddenimports=["xml.dom", "enchant", "spellchecker", "symspellpy",
+                   "language_tool_python", "markdown"],
     hookspath=[],
     runtime_hooks=[],
     excludes=[],
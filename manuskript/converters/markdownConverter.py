@@ -9,15 +9,13 @@ from PyQt5.QtWidgets import qApp, QMessageBox
 from PyQt5.QtGui import QCursor
 
 from manuskript.converters import abstractConverter
-from manuskript.functions import mainWindow
+from manuskript.functions import mainWindow, lazyModule
 
 import logging
 LOGGER = logging.getLogger(__name__)
 
-try:
-    import markdown as MD
-except ImportError:
-    MD = None
+# Optional, imported when first used
+MD = lazyModule("markdown")
 
 
 class markdownConverter(abstractConverter):
@@ -29,7 +27,7 @@ class markdownConverter(abstractConverter):
 
     @classmethod
     def isValid(self):
-        return MD != None
+        return bool(MD)
 
     @classmethod
     def convert(self, markdown):
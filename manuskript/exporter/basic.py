@@ -1,18 +1,134 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
+import json
 import os
 import shutil
 import subprocess
+import threading
 
-from PyQt5.QtCore import QSettings
+from PyQt5.QtCore import QObject, QSettings, pyqtSignal
 from PyQt5.QtWidgets import QWidget
 
 from manuskript.models import outlineItem
 from manuskript.functions import mainWindow
+from manuskript.version import getVersion
 
 import logging
 LOGGER = logging.getLogger(__name__)
 
+class exporterCapabilities(QObject):
+    """
+    Knows what the external tool of an exporter can do: whether it is
+    installed, its version, and what the exporter's `detect` adds (formats,
+    LaTeX engines, etc.).
+
+    Detecting it means running the tool, so it is probed once per session in
+    a background thread (see `probe`). Meanwhile, the results of the previous
+    session are used, which are saved in the application settings with a
+    version stamp and the custom path of the tool. If there are none (first
+    run, new version, new custom path), nothing is known until the probe ends:
+    the tool is considered absent, see `isKnown`. `changed` is emitted when the
+    results of the probe differ from them. Results are probed again when the
+    custom path changes (see `invalidate`).
+
+    Exporters of the same name share their capabilities, see `get`.
+    """
+
+    changed = pyqtSignal()
+    _probed = pyqtSignal(object)
+
+    # Increment when the format of the saved results changes
+    VERSION = 1
+
+    # Exporter name → capabilities
+    _instances = {}
+
+    def __init__(self, exporter, parent=None):
+        QObject.__init__(self, parent)
+        self.exporter = exporter
+        self.settingsKey = "Exporters/{}_capabilities".format(exporter.name)
+        self._results = None
+        self._thread = None
+        self._probed.connect(self.setResults)
+
+    @classmethod
+    def get(cls, exporter):
+        "Returns the capabilities of `exporter`."
+        if exporter.name not in cls._instances:
+            cls._instances[exporter.name] = cls(exporter)
+        return cls._instances[exporter.name]
+
+    @classmethod
+    def stamp(cls):
+        return "{}/{}".format(getVersion(), cls.VERSION)
+
+    def results(self):
+        """Returns a dict of the capabilities, starting the probe if it was
+        not yet. It is empty if nothing is known yet: `changed` is emitted
+        once it is."""
+        if self._results is None:
+            self._results = self.loadResults()
+        self.probe()
+        return self._results
+
+    def isKnown(self):
+        "Returns False while the tool is being probed for the first time."
+        return bool(self.results())
+
+    def value(self, name, default=None):
+        return self.results().get(name, default)
+
+    def probe(self):
+        "Probes the tool in the background, once."
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="{} probe".format(self.exporter.name))
+            self._thread.start()
+
+    def invalidate(self):
+        "Forgets the results, and probes the tool again."
+        self._results = {}
+        self._thread = None
+        QSettings().remove(self.settingsKey)
+        self.probe()
+
+    def detect(self):
+        "Probes the tool right away. It can be slow."
+        try:
+            return self.exporter.detect()
+        except Exception as e:
+            LOGGER.warning("Can't probe %s: %s", self.exporter.name, e)
+            return {"valid": 0}
+
+    def _run(self):
+        results = self.detect()
+        if threading.current_thread() is self._thread:
+            self._probed.emit(results)
+
+    def setResults(self, results):
+        if results == self._results:
+            return
+        self._results = results
+        self.saveResults(results)
+        self.changed.emit()
+
+    def loadResults(self):
+        try:
+            saved = json.loads(QSettings().value(self.settingsKey, "{}"))
+            if saved.get("stamp") == self.stamp() and \
+               saved.get("customPath") == self.exporter.customPath:
+                return saved["results"]
+        except Exception:
+            pass
+        return {}
+
+    def saveResults(self, results):
+        QSettings().setValue(self.settingsKey, json.dumps({
+            "stamp": self.stamp(),
+            "customPath": self.exporter.customPath,
+            "results": results}))
+
+
 class basicExporter:
 
     name = ""
@@ -27,11 +143,16 @@ class basicExporter:
     def __init__(self):
         settings = QSettings()
         self.customPath = settings.value("Exporters/{}_customPath".format(self.name), "")
+        self.capabilities = exporterCapabilities.get(self)
 
     def setCustomPath(self, path):
+        changed = path != self.customPath
         self.customPath = path
         settings = QSettings()
         settings.setValue("Exporters/{}_customPath".format(self.name), self.customPath)
+        if changed:
+            self.capabilities.exporter = self
+            self.capabilities.invalidate()
 
     def getFormatByName(self, name):
         for f in self.exportTo:
@@ -41,15 +162,21 @@ class basicExporter:
         return None
 
     def isValid(self):
+        "Returns 2 if the tool is installed, 1 if it is found at the custom path, 0 otherwise."
+        return self.capabilities.value("valid", 0)
+
+    def version(self):
+        return self.capabilities.value("version", "")
+
+    def detect(self):
+        """Returns a dict of the capabilities of the tool, stored by
+        `capabilities`. It runs in a background thread."""
         if self.path() != None:
-            return 2
+            return {"valid": 2, "command": self.cmd}
         elif self.customPath and os.path.exists(self.customPath):
-            return 1
+            return {"valid": 1, "command": self.customPath}
         else:
-            return 0
-
-    def version(self):
-        return ""
+            return {"valid": 0, "command": None}
 
     def path(self):
         return shutil.which(self.cmd)
@@ -62,7 +189,11 @@ class basicExporter:
         else:
             LOGGER.error("No command for %s.", self.name)
             return None
-        r = subprocess.check_output([run] + args)  # timeout=.2
+        return self.runCommand(run, args)
+
+    @staticmethod
+    def runCommand(command, args, timeout=None):
+        r = subprocess.check_output([command] + args, timeout=timeout)
         return r.decode("utf-8")
 
         # Example of how to run a command
@@ -4,16 +4,13 @@ from PyQt5.QtCore import Qt, QUrl
 from PyQt5.QtWidgets import QPlainTextEdit, qApp, QTabWidget, QFrame, QTextEdit
 
 from manuskript.exporter.manuskript.markdown import markdown, markdownSettings
-from manuskript.ui.views.webView import webView
 from manuskript.ui.exporters.manuskript.plainTextSettings import exporterSettings
-from manuskript.functions import safeTranslate
+from manuskript.functions import safeTranslate, lazyModule
 
 import os
 
-try:
-    import markdown as MD
-except ImportError:
-    MD = None
+# Optional, imported when first used
+MD = lazyModule("markdown")
 
 class HTML(markdown):
     name = "HTML"
@@ -26,11 +23,14 @@ class HTML(markdown):
     exportDefaultSuffix = ".html"
 
     def isValid(self):
-        return MD != None
+        return bool(MD)
 
     def settingsWidget(self):
         w = markdownSettings(self)
         w.loadSettings()
+        # Last markdown converted, and its conversion: kept as long as the
+        # export dialog is, see `convert`
+        w.converted = (None, None)
         return w
 
     def previewWidget(self):
@@ -56,6 +56,8 @@ class HTML(markdown):
         t.addTab(w0, safeTranslate(qApp, "Export", "Markdown source"))
         t.addTab(w1, safeTranslate(qApp, "Export", "HTML Source"))
         
+        # Imported here, since loading the web engine is slow
+        from manuskript.ui.views.webView import webView
         if webView:
             w2 = webView()
             t.addTab(w2, safeTranslate(qApp, "Export", "HTML Output"))
@@ -64,8 +66,21 @@ class HTML(markdown):
         return t
 
     def output(self, settingsWidget):
-        html = MD.markdown(markdown.output(self, settingsWidget))
-        return html
+        return self.convert(markdown.output(self, settingsWidget), settingsWidget)
+
+    def convert(self, md, settingsWidget=None):
+        """Returns `md` converted to HTML. The conversion is kept in
+        `settingsWidget`, and done again only when `md` changes."""
+        converted = getattr(settingsWidget, "converted", (None, None))
+        if converted[0] != md:
+            converted = (md, MD.markdown(md))
+            if settingsWidget is not None:
+                settingsWidget.converted = converted
+        return converted[1]
+
+    def outputChunks(self, settingsWidget):
+        # The module 'markdown' converts the whole text at once
+        yield self.output(settingsWidget)
 
     def preview(self, settingsWidget, previewWidget):
         settings = settingsWidget.getSettings()
@@ -74,7 +89,7 @@ class HTML(markdown):
         settingsWidget.writeSettings()
 
         md = markdown.output(self, settingsWidget)
-        html = MD.markdown(md)
+        html = self.convert(md, settingsWidget)
         path = os.path.join(self.projectPath(), "dummy.html")
 
         self.preparesTextEditView(previewWidget.widget(0), settings["Preview"]["PreviewFont"])
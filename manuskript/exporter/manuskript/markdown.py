@@ -36,11 +36,13 @@ class markdown(plainText):
         # Save settings
         settingsWidget.writeSettings()
 
+        previewWidget.clear()
+
         # Prepares text edit
         self.preparesTextEditViewMarkdown(previewWidget, settingsWidget.settings)
         self.preparesTextEditView(previewWidget, settings["Preview"]["PreviewFont"])
 
-        previewWidget.setPlainText(self.output(settingsWidget))
+        self.appendChunks(previewWidget, self.outputChunks(settingsWidget))
 
     def processTitle(self, text, level, settings):
         return "{} {}\n".format(
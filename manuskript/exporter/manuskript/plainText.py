@@ -1,7 +1,19 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
+import functools
+import itertools
+import json
+import multiprocessing
+import os
 import re
-from PyQt5.QtGui import QFont, QTextCharFormat
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5 import sip
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont, QTextCharFormat, QTextCursor
 from PyQt5.QtWidgets import QPlainTextEdit, qApp, QFrame, QFileDialog, QMessageBox
 
 from manuskript.exporter.basic import basicFormat
@@ -13,6 +25,13 @@ import codecs
 import logging
 LOGGER = logging.getLogger(__name__)
 
+
+def processTexts(cls, texts, settings):
+    "Processes `texts` as format `cls` does, in a worker process."
+    fmt = cls.__new__(cls)
+    return [fmt.processText(text, settings) for text in texts]
+
+
 class plainText(basicFormat):
     name = safeTranslate(qApp, "Export", "Plain text")
     description = safeTranslate(qApp, "Export", """Simplest export to plain text. Allows you to use your own markup not understood
@@ -29,6 +48,25 @@ class plainText(basicFormat):
     exportFilter = "Text files (*.txt);; Any files (*)"
     exportDefaultSuffix = ".txt"  # qt ignores the period, but it is clearer in our code to have it
 
+    # Maximum time (in seconds) spent appending chunks to the preview at once
+    previewSlice = 0.02
+    previewTimer = None
+
+    # Compiled transformations, see transforms
+    _transforms = None
+
+    # Processed titles and texts of items, shared by all formats, see itemChunks
+    compileCache = OrderedDict()
+    compileCacheSize = 0
+    compileCacheLimit = 32 * 1024 * 1024  # characters
+
+    # Minimum number of characters of text to process them in parallel, and
+    # approximate number of characters sent to a worker process at once
+    parallelThreshold = 2 * 1024 * 1024
+    parallelBatchSize = 256 * 1024
+    # Maximum time (in seconds) spent waiting for a batch at once
+    parallelWait = 0.005
+
     def __init__(self):
         pass
 
@@ -48,10 +86,24 @@ class plainText(basicFormat):
         try:
             return self.concatenate(mainWindow().mdlOutline.rootItem, settings)
         except re.error as e:
-            QMessageBox.warning(mainWindow().dialog, safeTranslate(qApp, "Export", "Error"),
-                                safeTranslate(qApp, "Export", "Could not process regular expression: \n{}").format(str(e)))
+            self.regexError(e)
             return ""
 
+    def outputChunks(self, settingsWidget):
+        """
+        Returns an iterator over the output, in chunks, for export and preview
+        to process it without building the whole manuscript in memory.
+
+        Formats that need the whole text at once (e.g. to convert it) yield
+        it as a single chunk.
+        """
+        settings = settingsWidget.getSettings()
+        return self.compileChunks(mainWindow().mdlOutline.rootItem, settings)
+
+    def regexError(self, e):
+        QMessageBox.warning(mainWindow().dialog, safeTranslate(qApp, "Export", "Error"),
+                            safeTranslate(qApp, "Export", "Could not process regular expression: \n{}").format(str(e)))
+
     def getExportFilename(self, settingsWidget, varName=None, filter=None):
 
         if varName == None:
@@ -90,14 +142,41 @@ class plainText(basicFormat):
 
         if filename:
             settingsWidget.writeSettings()
-            content = self.output(settingsWidget)
+            self.writeChunks(filename, self.outputChunks(settingsWidget))
 
-            if not content:
-                LOGGER.error("No content. Nothing saved.")
-                return
+    def writeChunks(self, filename, chunks):
+        """
+        Writes `chunks` to `filename`, as they are compiled. The file is only
+        replaced once the whole output is written. Returns True on success.
+        """
+        tmp = filename + ".tmp"
+        written = False
 
-            with open(filename, "wt", encoding="utf8", newline="\n") as f:
-                f.write(content)
+        try:
+            with open(tmp, "wt", encoding="utf8", newline="\n") as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        written = True
+
+        except re.error as e:
+            os.remove(tmp)
+            self.regexError(e)
+            return False
+
+        except BaseException:
+            # Interrupted or failed: the file being written is incomplete
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        if not written:
+            os.remove(tmp)
+            LOGGER.error("No content. Nothing saved.")
+            return False
+
+        os.replace(tmp, filename)
+        return True
 
     def preview(self, settingsWidget, previewWidget):
         settings = settingsWidget.getSettings()
@@ -105,12 +184,50 @@ class plainText(basicFormat):
         # Save settings
         settingsWidget.writeSettings()
 
-        r = self.output(settingsWidget)
+        previewWidget.clear()
 
         # Set preview font
         self.preparesTextEditView(previewWidget, settings["Preview"]["PreviewFont"])
 
-        previewWidget.setPlainText(r)
+        self.appendChunks(previewWidget, self.outputChunks(settingsWidget))
+
+    def appendChunks(self, view, chunks):
+        """
+        Appends `chunks` at the end of `view` as they are compiled, in slices
+        of `previewSlice` seconds so that the interface stays responsive while
+        large books are previewed. A preview still in progress is stopped.
+        """
+        self.stopPreview()
+
+        cursor = view.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        timer = QTimer(view)
+        timer.setInterval(0)
+
+        def append():
+            end = time.perf_counter() + self.previewSlice
+            try:
+                for chunk in chunks:
+                    cursor.insertText(chunk)
+                    if time.perf_counter() > end:
+                        return
+            except re.error as e:
+                self.regexError(e)
+            self.stopPreview()
+
+        timer.timeout.connect(append)
+        self.previewTimer = timer
+        timer.start()
+
+    def stopPreview(self):
+        timer = self.previewTimer
+        self.previewTimer = None
+        if timer is not None and not sip.isdeleted(timer):
+            timer.stop()
+            timer.deleteLater()
+
+    def isPreviewing(self):
+        return self.previewTimer is not None
 
     def preparesTextEditView(self, view, textFont):
         cf = QTextCharFormat()
@@ -120,100 +237,299 @@ class plainText(basicFormat):
         view.setCurrentCharFormat(cf)
 
     def concatenate(self, item: outlineItem, settings) -> str:
-        s = settings
-        r = ""
-
-        # Do we include item
-        if not item.compile() or s["Content"]["IgnoreCompile"]:
-            return ""
-
-        # What do we include
-        l = item.level()
-        if l >= 0:  # item is not root
-
-            if item.isFolder():
-                if not s["Content"]["More"] and s["Content"]["FolderTitle"] or\
-                       s["Content"]["More"] and s["Content"]["FolderTitle"][l]:
-
-                    r += self.processTitle(item.title(), l, settings)
-
-            elif item.isText():
-                if not s["Content"]["More"] and s["Content"]["TextTitle"] or \
-                       s["Content"]["More"] and s["Content"]["TextTitle"][l]:
-
-                    r += self.processTitle(item.title(), l, settings)
-
-                if not s["Content"]["More"] and s["Content"]["TextText"] or \
-                       s["Content"]["More"] and s["Content"]["TextText"][l]:
+        return "".join(self.compileChunks(item, settings))
+
+    def compileChunks(self, item: outlineItem, settings):
+        """
+        Returns an iterator over the output of `item` and its children, as
+        titles, texts and separators. The outline is read right away (see
+        compileList): editing it while the output is compiled doesn't change
+        it.
+        """
+        key = self.settingsKey(settings)
+        entries = self.compileList(item, settings)
+        return self._compileChunks(entries, settings, key)
+
+    def _compileChunks(self, entries, settings, key):
+        jobs = self.parallelJobs(entries, settings, key)
+        parallel = {k for k, text in jobs}
+        results = self.processTextsInParallel(jobs, settings)
+        # Texts processed in parallel, until they are output
+        texts = {}
 
-                    r += self.processText(item.text(), settings)
+        try:
+            for entry in entries:
+                if type(entry) == str:
+                    yield entry
+                    continue
+
+                k = self.itemKey(entry, key)
+                if k in parallel and k not in texts:
+                    for result in results:
+                        if result is None:
+                            # Not processed yet: lets the caller go on meanwhile
+                            yield ""
+                        else:
+                            texts[result[0]] = result[1]
+                            if result[0] == k:
+                                break
+
+                yield from self.itemChunks(entry, settings, key, texts)
+                texts.pop(k, None)
+        finally:
+            results.close()
+
+    def compileList(self, item: outlineItem, settings):
+        """
+        Returns what compiling `item` and its children is made of, in order:
+        the separators, and for each item a tuple (item, level, version, type,
+        title, text) of its current state.
+        """
+        s = settings
+        entries = []
 
-        content = ""
+        def add(item):
+            # Do we include item
+            if not item.compile() or s["Content"]["IgnoreCompile"]:
+                return
 
-        # Add item children
-        last = None
-        for c in item.children():
+            if item.level() >= 0:  # item is not root
+                entries.append((item, item.level(), item.version(), item.type(),
+                                item.title(), item.text()))
+
+            # Add item children
+            last = None
+            for c in item.children():
+
+                # Separator
+                if last:
+                    # Between folder
+                    if last == c.type() == "folder":
+                        entries.append(s["Separator"]["FF"])
+
+                    elif last == c.type() == "md":
+                        entries.append(s["Separator"]["TT"])
+
+                    elif last == "folder" and c.type() == "md":
+                        entries.append(s["Separator"]["FT"])
+
+                    elif last == "md" and c.type() == "folder":
+                        entries.append(s["Separator"]["TF"])
+
+                add(c)
+
+                last = c.type()
+
+        add(item)
+        return entries
+
+    def settingsKey(self, settings):
+        "Returns a key identifying the settings that the output of an item depends on."
+        return json.dumps([settings["Content"], settings["Transform"]], sort_keys=True)
+
+    def itemKey(self, entry, key):
+        "Returns the key of `entry` (see compileList) in the compile cache."
+        item, level, version = entry[:3]
+        return (item.ID(), version, level, type(self), key)
+
+    def itemChunks(self, entry, settings, key, texts={}):
+        """
+        Returns the title and text of an item (without its children), from
+        `entry` (see compileList), as processed by this format. They are
+        cached, and processed again only when the item or the settings
+        change. `texts` maps the keys of items to their texts when already
+        processed.
+        """
+        k = self.itemKey(entry, key)
+        cache = plainText.compileCache
+
+        chunks = cache.get(k)
+        if chunks is not None:
+            cache.move_to_end(k)
+            return chunks
+
+        chunks = tuple(self.processItem(entry, settings, texts.get(k)))
+        size = sum(len(c) for c in chunks)
+        if size <= self.compileCacheLimit:
+            cache[k] = chunks
+            plainText.compileCacheSize += size
+
+        while plainText.compileCacheSize > self.compileCacheLimit:
+            k, old = cache.popitem(last=False)
+            plainText.compileCacheSize -= sum(len(c) for c in old)
+
+        return chunks
+
+    @staticmethod
+    def clearCompileCache():
+        plainText.compileCache.clear()
+        plainText.compileCacheSize = 0
+
+    def includes(self, settings, content, level):
+        "Returns True if `content` (e.g. \"TextText\") is included at `level`, in settings[\"Content\"]."
+        s = settings["Content"]
+        return not s["More"] and s[content] or s["More"] and s[content][level]
+
+    def processItem(self, entry, settings, text=None):
+        """Yields the title and text of an item from `entry` (see compileList),
+        as set in settings[\"Content\"]. `text` is the text of the item if it
+        is already processed."""
+        item, l, version, itemType, title, content = entry
+
+        if itemType == "folder":
+            if self.includes(settings, "FolderTitle", l):
+                yield self.processTitle(title, l, settings)
+
+        elif itemType == "md":
+            if self.includes(settings, "TextTitle", l):
+                yield self.processTitle(title, l, settings)
+
+            if self.includes(settings, "TextText", l):
+                yield text if text is not None else self.processText(content, settings)
+
+    def workers(self, settings):
+        "Returns the number of processes to use to process texts."
+        return settings.get("Performance", {}).get("Workers", 0) or os.cpu_count() or 1
+
+    def parallelJobs(self, entries, settings, key):
+        """
+        Returns the list of (key, text) of the texts of `entries` (see
+        compileList) that are not cached, in order, to process them in
+        parallel (see processTextsInParallel). It is empty if there is not
+        enough text for it to be worth it.
+        """
+        if self.workers(settings) < 2:
+            return []
+
+        jobs = []
+        for entry in entries:
+            if type(entry) == str:
+                continue
+            item, l, version, itemType, title, content = entry
+            if itemType == "md" and self.includes(settings, "TextText", l):
+                k = self.itemKey(entry, key)
+                if k not in self.compileCache:
+                    jobs.append((k, content))
+
+        if not jobs or sum(len(text) for k, text in jobs) < self.parallelThreshold:
+            return []
+        return jobs
+
+    def processTextsInParallel(self, jobs, settings):
+        """
+        Processes the texts of `jobs` (see parallelJobs) in a pool of worker
+        processes, in batches of about `parallelBatchSize` characters.
+
+        Yields the (key, processed text) of the jobs in order, as batches are
+        processed, and None each time `parallelWait` seconds were spent
+        waiting for the next one. Only a few batches are processed ahead,
+        so that the processed texts are never all held at once. If the pool
+        breaks, the remaining texts are not yielded.
+        """
+        if not jobs:
+            return
+
+        # Batches of about `parallelBatchSize` characters, in order
+        batches = [[]]
+        size = 0
+        for job in jobs:
+            if size >= self.parallelBatchSize:
+                batches.append([])
+                size = 0
+            batches[-1].append(job)
+            size += len(job[1])
+
+        workers = min(self.workers(settings), len(batches))
+        # Spawned, since forking the GUI process is unsafe
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        remaining = iter(batches)
+        pending = deque()
 
-            # Separator
-            if last:
-                # Between folder
-                if last == c.type() == "folder":
-                    content += s["Separator"]["FF"]
+        try:
+            while True:
+                # Each worker has a batch ahead
+                for batch in itertools.islice(remaining, 2 * workers - len(pending)):
+                    pending.append((batch, executor.submit(
+                        processTexts, type(self), [text for k, text in batch], settings)))
+                if not pending:
+                    return
+
+                batch, future = pending[0]
+                if not wait([future], self.parallelWait).done:
+                    yield None
+                    continue
+
+                pending.popleft()
+                for (k, text), processed in zip(batch, future.result()):
+                    yield k, processed
+
+        except BrokenProcessPool as e:
+            LOGGER.warning("Could not process texts in parallel: %s", e)
+
+        finally:
+            for batch, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
 
-                elif last == c.type() == "md":
-                    content += s["Separator"]["TT"]
+    def processTitle(self, text, level, settings):
+        return text + "\n"
 
-                elif last == "folder" and c.type() == "md":
-                    content += s["Separator"]["FT"]
+    def processText(self, content, settings):
+        for transform in self.transforms(settings):
+            content = transform(content)
 
-                elif last == "md" and c.type() == "folder":
-                    content += s["Separator"]["TF"]
+        content += "\n"
 
-            content += self.concatenate(c, settings)
+        return content
 
-            last = c.type()
+    def transforms(self, settings):
+        """
+        Returns the transformations of settings["Transform"], as a tuple of
+        functions taking a text and returning it transformed. They are
+        compiled once, and again only when these settings change.
+        """
+        key = json.dumps(settings["Transform"], sort_keys=True)
+        if self._transforms is None or self._transforms[0] != key:
+            self._transforms = (key, self.compileTransforms(settings["Transform"]))
+        return self._transforms[1]
 
-        # r += self.processContent(content, settings)
-        r += content
+    @staticmethod
+    def compileTransforms(s):
+        "Compiles the transformations `s` (settings[\"Transform\"]) in the order they apply."
 
-        return r
+        def replace(A, B):
+            return lambda text: text.replace(A, B)
 
-    def processTitle(self, text, level, settings):
-        return text + "\n"
+        def substitute(A, B):
+            return functools.partial(re.compile(A).sub, B)
 
-    def processText(self, content, settings):
-        s = settings["Transform"]
+        r = []
 
         if s["Dash"]:
-            content = content.replace("---", "—")
+            r.append(replace("---", "—"))
 
         if s["Ellipse"]:
-            content = content.replace("...", "…")
+            r.append(replace("...", "…"))
 
         if s["Spaces"]:
-            o = ""
-            while o != content:
-                o = content
-                content = content.replace("  ", " ")
-
-        if s["DoubleQuotes"]:
-            q = s["DoubleQuotes"].split("___")
-            s["Custom"].append([True, '"(.*?)"', "{}\\1{}".format(q[0], q[1]), True])
-
-        if s["SingleQuote"]:
-            q = s["SingleQuote"].split("___")
-            s["Custom"].append([True, "'(.*?)'", "{}\\1{}".format(q[0], q[1]), True])
+            r.append(substitute(" {2,}", " "))
 
         for enabled, A, B, reg in s["Custom"]:
             if not enabled:
                 continue
 
             if not reg:
-                content = content.replace(A, B)
+                r.append(replace(A, B))
 
             else:
-                content = re.sub(A, B, content)
+                r.append(substitute(A, B))
 
-        content += "\n"
+        if s["DoubleQuotes"]:
+            q = s["DoubleQuotes"].split("___")
+            r.append(substitute('"(.*?)"', "{}\\1{}".format(q[0], q[1])))
 
-        return content
+        if s["SingleQuote"]:
+            q = s["SingleQuote"].split("___")
+            r.append(substitute("'(.*?)'", "{}\\1{}".format(q[0], q[1])))
+
+        return tuple(r)
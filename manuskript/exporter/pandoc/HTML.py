@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
+from PyQt5 import sip
 from PyQt5.QtWidgets import qApp, QTextEdit
 from PyQt5.QtCore import QUrl
+from PyQt5.QtGui import QTextCursor
 
 from manuskript.exporter.manuskript import HTML as MskHTML
 from manuskript.exporter.pandoc.abstractPlainText import abstractPlainText
@@ -33,18 +35,30 @@ class HTML(abstractPlainText):
         # Save settings
         settingsWidget.writeSettings()
 
-        src = self.src(settingsWidget)
-
-        html = self.output(settingsWidget)
         path = os.path.join(self.projectPath(), "dummy.html")
-        
-        self.preparesTextEditView(previewWidget.widget(0), settings["Preview"]["PreviewFont"])
-        self.preparesTextEditViewMarkdown(previewWidget.widget(0), settings)
-        previewWidget.widget(0).setPlainText(src)
-        self.preparesTextEditView(previewWidget.widget(1), settings["Preview"]["PreviewFont"])
-        previewWidget.widget(1).setPlainText(html)
-        w2 = previewWidget.widget(2)
-        if isinstance(w2, QTextEdit):
-            w2.setHtml(html)
-        else:
-            w2.setHtml(html, QUrl.fromLocalFile(path))
+
+        source = previewWidget.widget(0)
+        self.preparesTextEditView(source, settings["Preview"]["PreviewFont"])
+        self.preparesTextEditViewMarkdown(source, settings)
+        source.clear()
+
+        def tee(chunks):
+            "Shows the source in the first tab as it is streamed to pandoc."
+            for chunk in chunks:
+                if not sip.isdeleted(source):
+                    cursor = QTextCursor(source.document())
+                    cursor.movePosition(QTextCursor.End)
+                    cursor.insertText(chunk)
+                yield chunk
+
+        def show(html):
+            self.preparesTextEditView(previewWidget.widget(1), settings["Preview"]["PreviewFont"])
+            previewWidget.widget(1).setPlainText(html)
+            w2 = previewWidget.widget(2)
+            if isinstance(w2, QTextEdit):
+                w2.setHtml(html)
+            else:
+                w2.setHtml(html, QUrl.fromLocalFile(path))
+
+        return self.startPreview(settingsWidget, previewWidget, show,
+                                 src=tee(self.srcChunks(settingsWidget)))
@@ -1,14 +1,12 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
 import random
-import shutil
 
 from PyQt5.QtCore import QUrl
 from PyQt5.QtWidgets import qApp
 
 from manuskript.exporter.pandoc.abstractOutput import abstractOutput
 from manuskript.functions import tempFile, safeTranslate
-from manuskript.ui.views.PDFViewer import PDFViewer
 
 
 class PDF(abstractOutput):
@@ -30,23 +28,22 @@ class PDF(abstractOutput):
     }
 
     def isValid(self):
-        path = shutil.which("pdflatex") or shutil.which("xelatex")
-        return path != None
+        return bool(self.exporter.capabilities.value("latexEngines"))
 
-    def output(self, settingsWidget, outputfile=None):
+    def pandocArgs(self, settingsWidget):
         args = settingsWidget.runnableSettings()
         args.remove("--to=pdf")
         args.append("--to=latex")
-        src = self.src(settingsWidget)
-        return self.exporter.convert(src, args, outputfile)
+        return args
 
     def previewWidget(self):
+        # Imported here, since loading the web engine is slow
+        from manuskript.ui.views.PDFViewer import PDFViewer
         return PDFViewer()
 
     def preview(self, settingsWidget, previewWidget):
         filename = tempFile("msk_pdfpreview.pdf")
 
         settingsWidget.writeSettings()
-        content = self.output(settingsWidget, outputfile=filename)
-
-        previewWidget.loadPDF(filename)
+        return self.startPreview(settingsWidget, previewWidget,
+                                 lambda output: previewWidget.loadPDF(filename), outputfile=filename)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
+import shutil
 import subprocess
+import threading
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QCursor
@@ -10,6 +12,7 @@ from manuskript.exporter.basic import basicExporter, basicFormat
 from manuskript.exporter.pandoc.HTML import HTML
 from manuskript.exporter.pandoc.PDF import PDF
 from manuskript.exporter.pandoc.outputFormats import ePub, OpenDocument, DocX
+from manuskript.exporter.pandoc.process import pandocProcess
 from manuskript.exporter.pandoc.plainText import reST, markdown, latex, OPML
 from manuskript.functions import mainWindow, safeTranslate
 
@@ -42,14 +45,36 @@ class pandocExporter(basicExporter):
             OPML(self),
         ]
 
-    def version(self):
-        if self.isValid():
-            r = self.run(["--version"])
-            return r.split("\n")[0]
-        else:
-            return ""
+    # LaTeX engines pandoc can use to produce PDF
+    latexEngines = ["pdflatex", "lualatex", "xelatex"]
+
+    def detect(self):
+        r = basicExporter.detect(self)
+        r["version"] = ""
+        r["outputFormats"] = []
+        if r["command"]:
+            # Each step can fail (Pandoc < 1.18 has no --list-output-formats),
+            # what was found before is kept.
+            version = self.probeCommand(r["command"], ["--version"])
+            if version is not None:
+                r["version"] = version.split("\n")[0]
+            formats = self.probeCommand(r["command"], ["--list-output-formats"])
+            if formats is not None:
+                r["outputFormats"] = formats.split()
+        r["latexEngines"] = [e for e in self.latexEngines if shutil.which(e)]
+        return r
+
+    def probeCommand(self, command, args):
+        "Returns the output of `command`, or None if it fails or hangs."
+        try:
+            return self.runCommand(command, args, timeout=30)
+        except (subprocess.SubprocessError, OSError) as e:
+            LOGGER.warning("Can't run %s %s: %s", command, " ".join(args), e)
+            return None
 
-    def convert(self, src, args, outputfile=None):
+    def commandLine(self, args, outputfile=None):
+        """Returns the command line running pandoc with `args`, and the
+        metadata of the project. Returns None if pandoc is not found."""
         if self.isValid() == 2:
             run = self.cmd
         elif self.isValid() == 1:
@@ -82,6 +107,13 @@ class pandocExporter(basicExporter):
             title = mainWindow().mdlFlatData.item(0, 0).text().strip()
         args.append("--metadata=title:{}".format(title))
 
+        return args
+
+    def convert(self, src, args, outputfile=None):
+        args = self.commandLine(args, outputfile)
+        if args is None:
+            return None
+
         qApp.setOverrideCursor(QCursor(Qt.WaitCursor))
 
         p = subprocess.Popen(
@@ -91,25 +123,102 @@ class pandocExporter(basicExporter):
             stderr=subprocess.PIPE
         )
 
-        if not type(src) == bytes:
-            src = src.encode("utf-8")  # assumes utf-8
-
-        stdout, stderr = p.communicate(src)
-
-        qApp.restoreOverrideCursor()
+        try:
+            stdout, stderr = self.communicate(p, src)
+        finally:
+            qApp.restoreOverrideCursor()
 
         if stderr or p.returncode != 0:
-            err_type = "ERROR" if p.returncode != 0 else "WARNING"
-            err = "%s on export\n" % err_type \
-                + "Return code: %d\n" % p.returncode \
-                + "Command and parameters:\n%s\n" % p.args \
-                + "Stderr content:\n" + stderr.decode("utf-8")
-            if p.returncode != 0:
-                LOGGER.error(err)
-                QMessageBox.critical(mainWindow().dialog, safeTranslate(qApp, "Export", "Error"), err)
-            else:
-                LOGGER.warning(err)
+            self.reportErrors(p.returncode, p.args, stderr.decode("utf-8"))
             return None
 
         return stdout.decode("utf-8")
 
+    def reportErrors(self, returncode, args, stderr):
+        err_type = "ERROR" if returncode != 0 else "WARNING"
+        err = "%s on export\n" % err_type \
+            + "Return code: %s\n" % returncode \
+            + "Command and parameters:\n%s\n" % args \
+            + "Stderr content:\n" + stderr
+        if returncode != 0:
+            LOGGER.error(err)
+            QMessageBox.critical(mainWindow().dialog, safeTranslate(qApp, "Export", "Error"), err)
+        else:
+            LOGGER.warning(err)
+
+    def start(self, src, args, outputfile=None, name=""):
+        """
+        Starts converting `src` (see convert) in the background, and returns
+        the pandocProcess, or None if pandoc is not found. Errors are reported
+        once it is finished.
+        """
+        # Pandoc tells what it is doing, for progress
+        args = self.commandLine(args + ["--verbose"], outputfile)
+        if args is None:
+            return None
+
+        job = pandocProcess(args[0], args[1:], src, name=name)
+        job.finished.connect(lambda output: self.processFinished(job))
+        job.start()
+        return job
+
+    def processFinished(self, job):
+        if job.error:
+            LOGGER.error("%s: %s", job.name, job.error)
+            QMessageBox.critical(mainWindow().dialog, safeTranslate(qApp, "Export", "Error"), job.error)
+
+        elif not job.cancelled and job.returnCode() != 0:
+            self.reportErrors(job.returnCode(), [job.program] + job.args,
+                              job.stderr.decode("utf-8", "replace"))
+
+        elif not job.cancelled:
+            # Warnings, without the progress asked for with --verbose
+            warnings = [line for line in job.stderr.decode("utf-8", "replace").splitlines()
+                        if line.strip() and not line.startswith("[INFO]")]
+            if warnings:
+                self.reportErrors(0, [job.program] + job.args, "\n".join(warnings) + "\n")
+
+    @staticmethod
+    def communicate(p, src):
+        """
+        Writes `src` to the input of process `p`, and returns its output and
+        errors. `src` is a string, or an iterable of strings that are written
+        as they come, so that the whole source is never held in memory.
+        """
+        if type(src) in [str, bytes]:
+            src = [src]
+
+        # Outputs are read in threads, so that the process never blocks on a
+        # full pipe while we are writing to it.
+        outputs = {}
+
+        def read(pipe):
+            outputs[pipe] = pipe.read()
+
+        readers = [threading.Thread(target=read, args=(pipe,), daemon=True)
+                   for pipe in [p.stdout, p.stderr]]
+        for t in readers:
+            t.start()
+
+        try:
+            for chunk in src:
+                if not type(chunk) == bytes:
+                    chunk = chunk.encode("utf-8")  # assumes utf-8
+                p.stdin.write(chunk)
+        except BrokenPipeError:
+            # The process exited early: its errors tell why
+            pass
+        except BaseException:
+            p.kill()
+            raise
+        finally:
+            try:
+                p.stdin.close()
+            except BrokenPipeError:
+                pass
+            for t in readers:
+                t.join()
+            p.wait()
+
+        return outputs[p.stdout], outputs[p.stderr]
+
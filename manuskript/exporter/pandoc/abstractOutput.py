@@ -15,10 +15,3 @@ class abstractOutput(abstractPlainText):
         "Settings": True,
         "Preview": False,
     }
-
-    def export(self, settingsWidget):
-        filename = self.getExportFilename(settingsWidget)
-        settingsWidget.writeSettings()
-        if filename:
-            content = self.output(settingsWidget, outputfile=filename)
-
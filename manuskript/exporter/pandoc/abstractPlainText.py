@@ -2,6 +2,7 @@
 # --!-- coding: utf8 --!--
 import re
 
+from PyQt5 import sip
 from PyQt5.QtGui import QTextCharFormat, QFont
 from PyQt5.QtWidgets import qApp, QVBoxLayout, QCheckBox, QWidget, QHBoxLayout, QLabel, QSpinBox, QComboBox
 
@@ -24,6 +25,12 @@ class abstractPlainText(markdown):
 
     def __init__(self, exporter):
         self.exporter = exporter
+        self.previewJob = None
+
+    def isValid(self):
+        # Formats pandoc can write, if it could tell
+        formats = self.exporter.capabilities.value("outputFormats")
+        return not formats or self.toFormat in formats
 
     def settingsWidget(self):
         # Get pandoc major version to determine valid command line options
@@ -42,10 +49,62 @@ class abstractPlainText(markdown):
     def src(self, settingsWidget):
         return markdown.output(self, settingsWidget)
 
+    def srcChunks(self, settingsWidget):
+        "Returns the markdown source in chunks, to be streamed to pandoc."
+        return markdown.outputChunks(self, settingsWidget)
+
+    def pandocArgs(self, settingsWidget):
+        "Returns the arguments given to pandoc."
+        return settingsWidget.runnableSettings()
+
     def output(self, settingsWidget, outputfile=None):
-        args = settingsWidget.runnableSettings()
-        src = self.src(settingsWidget)
-        return self.exporter.convert(src, args, outputfile)
+        return self.convertSrc(settingsWidget, self.pandocArgs(settingsWidget), outputfile)
+
+    def outputChunks(self, settingsWidget):
+        # Pandoc returns the converted document at once
+        yield self.output(settingsWidget) or ""
+
+    def convertSrc(self, settingsWidget, args, outputfile=None):
+        "Streams the markdown source to pandoc, and returns its output."
+        try:
+            return self.exporter.convert(self.srcChunks(settingsWidget), args, outputfile)
+        except re.error as e:
+            self.regexError(e)
+            return None
+
+    def start(self, settingsWidget, outputfile=None, src=None):
+        """Starts converting the markdown source (by default `srcChunks`) with
+        pandoc in the background. Returns the pandocProcess, or None if pandoc
+        is not found."""
+        if src is None:
+            src = self.srcChunks(settingsWidget)
+        return self.exporter.start(src, self.pandocArgs(settingsWidget),
+                                   outputfile, name=self.name)
+
+    def export(self, settingsWidget):
+        filename = self.getExportFilename(settingsWidget)
+        settingsWidget.writeSettings()
+        if filename:
+            return self.start(settingsWidget, outputfile=filename)
+
+    def startPreview(self, settingsWidget, previewWidget, show, outputfile=None, src=None):
+        """
+        Starts converting the source (see `start`) for `previewWidget`, and
+        returns the pandocProcess. `show` is called with the output once it is
+        done, if the preview widget still exists. A preview still running is
+        cancelled.
+        """
+        if self.previewJob is not None:
+            self.previewJob.cancel()
+
+        def finished(output):
+            if output is not None and not sip.isdeleted(previewWidget):
+                show(output)
+
+        self.previewJob = self.start(settingsWidget, outputfile=outputfile, src=src)
+        if self.previewJob is not None:
+            self.previewJob.finished.connect(finished)
+        return self.previewJob
 
     def preview(self, settingsWidget, previewWidget):
         settings = settingsWidget.getSettings()
@@ -57,9 +116,7 @@ class abstractPlainText(markdown):
         self.preparesTextEditViewMarkdown(previewWidget, settingsWidget.settings)
         self.preparesTextEditView(previewWidget, settings["Preview"]["PreviewFont"])
 
-        r = self.output(settingsWidget)
-
-        previewWidget.setPlainText(r)
+        return self.startPreview(settingsWidget, previewWidget, previewWidget.setPlainText)
 
 
 def versionAsInt(version):
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+import re
+import time
+
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+from PyQt5.QtWidgets import qApp
+
+from manuskript.functions import safeTranslate
+
+import logging
+LOGGER = logging.getLogger(__name__)
+
+
+class pandocProcess(QObject):
+    """
+    Runs pandoc (or any command converting its input) in the background.
+
+    The source, a string or an iterable of strings (see
+    plainText.outputChunks), is written to the input of the process in time
+    slices, as it is compiled. Each line the process writes on its error
+    output is emitted with `progress`. Once the process is done, `finished`
+    is emitted with its output, or None if it failed, was cancelled or timed
+    out.
+
+    Processes are independent: several of them can run at once.
+    """
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(object)
+
+    # Maximum time (in milliseconds) a process can run
+    timeout = 10 * 60 * 1000
+    # Maximum time (in seconds) spent compiling the source at once
+    writeSlice = 0.02
+    # Number of bytes written to the process after which we wait for it to
+    # read them, before compiling more of the source
+    writeBufferLimit = 1024 * 1024
+
+    # Processes running, kept here so that they live until they finish
+    running = set()
+
+    def __init__(self, program, args, src, name="", parent=None):
+        QObject.__init__(self, parent)
+        self.name = name
+        self.program = program
+        self.args = args
+        self.src = iter([src] if type(src) in [str, bytes] else src)
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self.error = ""
+        self.cancelled = False
+        self.done = False
+
+        self.process = QProcess(self)
+        self.process.readyReadStandardOutput.connect(self.readOutput)
+        self.process.readyReadStandardError.connect(self.readErrors)
+        self.process.finished.connect(self.processFinished)
+        self.process.errorOccurred.connect(self.processError)
+
+        self._writer = QTimer(self)
+        self._writer.setInterval(0)
+        self._writer.timeout.connect(self.write)
+
+        self._timeout = QTimer(self)
+        self._timeout.setSingleShot(True)
+        self._timeout.timeout.connect(self.timedOut)
+
+    def start(self):
+        pandocProcess.running.add(self)
+        self.process.start(self.program, self.args)
+        self._timeout.start(self.timeout)
+        self._writer.start()
+
+    def write(self):
+        if self.process.bytesToWrite() > self.writeBufferLimit:
+            return
+
+        end = time.perf_counter() + self.writeSlice
+        try:
+            for chunk in self.src:
+                if not type(chunk) == bytes:
+                    chunk = chunk.encode("utf-8")  # assumes utf-8
+                self.process.write(chunk)
+                if time.perf_counter() > end or self.process.bytesToWrite() > self.writeBufferLimit:
+                    return
+        except re.error as e:
+            self.error = safeTranslate(qApp, "Export", "Could not process regular expression: \n{}").format(str(e))
+            self.cancel()
+            return
+
+        self._writer.stop()
+        self.process.closeWriteChannel()
+
+    def readOutput(self):
+        self.stdout += bytes(self.process.readAllStandardOutput())
+
+    def readErrors(self):
+        start = self.stderr.rfind(b"\n") + 1
+        self.stderr += bytes(self.process.readAllStandardError())
+        end = self.stderr.rfind(b"\n") + 1
+        # Complete lines only
+        for line in self.stderr[start:end].decode("utf-8", "replace").splitlines():
+            if line.strip():
+                self.progress.emit(line.strip())
+
+    def cancel(self):
+        "Stops the process. `finished` is emitted with None."
+        if self.done:
+            return
+        self.cancelled = True
+        self.process.kill()
+        if self.process.state() == QProcess.NotRunning:
+            self.finish()
+
+    def timedOut(self):
+        self.error = safeTranslate(qApp, "Export", "Timed out after {} seconds.").format(self.timeout // 1000)
+        self.cancel()
+
+    def isRunning(self):
+        return not self.done
+
+    def returnCode(self):
+        "Returns the exit code of the process, or None if it did not exit normally."
+        if self.cancelled or self.process.exitStatus() != QProcess.NormalExit:
+            return None
+        return self.process.exitCode()
+
+    def processError(self, error):
+        if error == QProcess.FailedToStart:
+            self.error = self.process.errorString()
+            self.finish()
+
+    def processFinished(self, exitCode, exitStatus):
+        self.readOutput()
+        self.readErrors()
+        if exitStatus != QProcess.NormalExit and not self.error and not self.cancelled:
+            self.error = self.process.errorString()
+        self.finish()
+
+    def finish(self):
+        if self.done:
+            return
+        self.done = True
+        self._writer.stop()
+        self._timeout.stop()
+        pandocProcess.running.discard(self)
+
+        if self.cancelled or self.error or self.returnCode() != 0:
+            self.finished.emit(None)
+        else:
+            self.finished.emit(self.stdout.decode("utf-8"))
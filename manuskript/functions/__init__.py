@@ -5,8 +5,10 @@ import os
 import re
 import sys
 import pathlib
+import threading
 from random import *
 
+from PyQt5 import sip
 from PyQt5.QtCore import Qt, QRect, QStandardPaths, QObject, QProcess, QRegExp
 from PyQt5.QtCore import QDir, QUrl, QTimer
 from PyQt5.QtGui import QBrush, QIcon, QPainter, QColor, QImage, QPixmap
@@ -216,33 +218,115 @@ def mixColors(col1, col2, f=0.5):
     return QColor(r, g, b) if not fromString else QColor(r, g, b).name()
 
 
+class outlineItemPalette():
+    """
+    Caches the colors used to paint outline items (POV and label colors) and
+    the status names. Resolving a color means rendering an icon to a pixmap
+    (see iconColor), which is too slow to be done for each painted item.
+
+    The cache is emptied whenever mdlCharacter, mdlLabels or mdlStatus change,
+    and when the main window switches to new models (project loaded/closed).
+    """
+
+    def __init__(self):
+        self._models = None
+        self._cache = {}
+        # Incremented each time the cache is emptied, so that views caching
+        # things painted with these colors know they have to update them.
+        self._version = 0
+
+    def invalidate(self, *args):
+        self._cache.clear()
+        self._version += 1
+
+    def version(self):
+        self._checkModels(mainWindow())
+        return self._version
+
+    def _checkModels(self, mw):
+        models = (mw.mdlCharacter, mw.mdlLabels, mw.mdlStatus)
+        if self._models is not None and all(a is b for a, b in zip(models, self._models)):
+            return
+
+        self.invalidate()
+        # The previous models must neither invalidate the cache nor keep it
+        for m in self._models or []:
+            if not sip.isdeleted(m):
+                for signal in self._signals(m):
+                    try:
+                        signal.disconnect(self.invalidate)
+                    except TypeError:
+                        pass
+
+        self._models = models
+        for m in models:
+            for signal in self._signals(m):
+                signal.connect(self.invalidate)
+
+    @staticmethod
+    def _signals(model):
+        return [model.dataChanged, model.rowsInserted, model.rowsRemoved, model.rowsMoved,
+                model.modelReset, model.layoutChanged]
+
+    def POVColor(self, POV):
+        "Returns the color (QColor) of character whose ID is POV."
+        mw = mainWindow()
+        self._checkModels(mw)
+        key = ("POV", POV)
+        if key not in self._cache:
+            color = QColor(Qt.transparent)
+            if POV != "":
+                for i in range(mw.mdlCharacter.rowCount()):
+                    if mw.mdlCharacter.ID(i) == POV:
+                        color = iconColor(mw.mdlCharacter.icon(i))
+            self._cache[key] = color
+        return QColor(self._cache[key])
+
+    def labelColor(self, label):
+        "Returns the color (QColor) of label ``label`` (an index in mdlLabels)."
+        mw = mainWindow()
+        self._checkModels(mw)
+        key = ("Label", label)
+        if key not in self._cache:
+            if label == "":
+                color = QColor(Qt.transparent)
+            else:
+                color = iconColor(mw.mdlLabels.item(toInt(label)).icon())
+            self._cache[key] = color
+        return QColor(self._cache[key])
+
+    def statusName(self, status):
+        "Returns the name of status ``status`` (an index in mdlStatus)."
+        mw = mainWindow()
+        self._checkModels(mw)
+        key = ("Status", status)
+        if key not in self._cache:
+            name = ""
+            if status:
+                it = mw.mdlStatus.item(int(status), 0)
+                if it != None:
+                    name = it.text()
+            self._cache[key] = name
+        return self._cache[key]
+
+
+outlinePalette = outlineItemPalette()
+
+
 def outlineItemColors(item):
     from manuskript.ui import style as S
 
     """Takes an OutlineItem and returns a dict of colors."""
     colors = {}
-    mw = mainWindow()
 
     # POV
-    colors["POV"] = QColor(Qt.transparent)
-    POV = item.data(Outline.POV)
-    if POV == "":
-        col = QColor(Qt.transparent)
-    else:
-        for i in range(mw.mdlCharacter.rowCount()):
-            if mw.mdlCharacter.ID(i) == POV:
-                colors["POV"] = iconColor(mw.mdlCharacter.icon(i))
+    colors["POV"] = outlinePalette.POVColor(item.data(Outline.POV))
 
     # Label
-    lbl = item.data(Outline.label)
-    if lbl == "":
-        col = QColor(Qt.transparent)
-    else:
-        col = iconColor(mw.mdlLabels.item(toInt(lbl)).icon())
     # if col == Qt.black:
     #     # Don't know why, but transparent is rendered as black
     #     col = QColor(Qt.transparent)
-    colors["Label"] = col
+    colors["Label"] = outlinePalette.labelColor(item.data(Outline.label))
 
     # Progress
     pg = item.data(Outline.goalPercentage) if item.data(Outline.setGoal) else None
@@ -480,41 +564,55 @@ def search(searchRegex, text):
 
     :param searchRegex:    a regex object with the search to perform
     :param text:            text to search on
-    :return:                list of tuples (startPos, endPos)
+    :return:                list of tuples (startPos, endPos, context)
+    """
+    return [(startPos, endPos, getSearchResultContext(text, startPos, endPos))
+            for (startPos, endPos, context) in searchLazy(searchRegex, text)]
+
+
+def searchLazy(searchRegex, text):
+    """
+    Same as search(), but the context of each occurrence is not built. It is
+    replaced by a callable returning it, so that it is only computed if the
+    result is actually displayed.
+
+    :param searchRegex:    a regex object with the search to perform
+    :param text:            text to search on
+    :return:                list of tuples (startPos, endPos, contextGetter)
     """
     if text is not None:
-        return [(m.start(), m.end(), getSearchResultContext(text, m.start(), m.end())) for m in searchRegex.finditer(str(text))]
+        text = str(text)
+        return [(m.start(), m.end(), searchResultContextGetter(text, m.start(), m.end()))
+                for m in searchRegex.finditer(text)]
     else:
         return []
 
+
+def searchResultContextGetter(text, startPos, endPos):
+    return lambda: getSearchResultContext(text, startPos, endPos)
+
+
 def getSearchResultContext(text, startPos, endPos):
     matchSize = endPos - startPos
     maxContextSize = max(matchSize, 600)
     extraContextSize = int((maxContextSize - matchSize) / 2)
     separator = "[...]"
 
-    context = ""
-
-    i = startPos - 1
-    while i > 0 and (startPos - i) < extraContextSize and text[i] != '\n':
-        i -= 1
-    contextStartPos = i
-    if i > 0:
-        context += separator + " "
-    context += text[contextStartPos:startPos].replace('\n', '')
-
-    context += '<b>' + text[startPos:endPos].replace('\n', '') + '</b>'
-
-    i = endPos
-    while i < len(text) and (i - endPos) < extraContextSize and text[i] != '\n':
-        i += 1
-    contextEndPos = i
+    # Context stops at the first line break or after extraContextSize characters.
+    bound = min(startPos - 1, max(0, startPos - extraContextSize))
+    contextStartPos = max(text.rfind('\n', bound, startPos), bound)
 
-    context += text[endPos:contextEndPos].replace('\n', '')
-    if i < len(text):
-        context += " " + separator
+    bound = min(len(text), endPos + extraContextSize)
+    contextEndPos = text.find('\n', endPos, bound)
+    if contextEndPos == -1:
+        contextEndPos = bound
 
-    return context
+    return "{}{}<b>{}</b>{}{}".format(
+        separator + " " if contextStartPos > 0 else "",
+        text[contextStartPos:startPos].replace('\n', ''),
+        text[startPos:endPos].replace('\n', ''),
+        text[endPos:contextEndPos].replace('\n', ''),
+        " " + separator if contextEndPos < len(text) else "")
 
 
 # Based on answer by jfs at:
@@ -594,5 +692,50 @@ def showInFolder(path, open_file_as_fallback=False):
     return QDesktopServices.openUrl(QUrl(path if open_file_as_fallback else dirPath))
 
 
+class lazyModule:
+    """
+    Stands for an optional module, which is only imported when it is first
+    used: when one of its attributes is accessed, or when its availability
+    is checked with `bool()`.
+
+    The modules ``names`` are tried in order, and ``check`` can reject one
+    that was imported (too old, for example). If none can be used, the proxy
+    is False and accessing an attribute raises ImportError.
+    """
+
+    def __init__(self, *names, check=None):
+        self._names = names
+        self._check = check
+        self._module = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        "Imports the module if it was not yet, and returns it, or None."
+        with self._lock:
+            if not self._loaded:
+                for name in self._names:
+                    try:
+                        __import__(name)
+                        module = sys.modules[name]
+                        if self._check and not self._check(module):
+                            continue
+                    except Exception:
+                        continue
+                    self._module = module
+                    break
+                self._loaded = True
+        return self._module
+
+    def __bool__(self):
+        return self.load() is not None
+
+    def __getattr__(self, name):
+        module = self.load()
+        if module is None:
+            raise ImportError("No module named {}".format(" or ".join(self._names)))
+        return getattr(module, name)
+
+
 # Spellchecker loads writablePath from this file, so we need to load it after they get defined
 from manuskript.functions.spellchecker import Spellchecker
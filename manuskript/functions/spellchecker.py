@@ -1,47 +1,195 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
 
-import os, gzip, json, glob, re, string
-from PyQt5.QtCore import QLocale
-from collections import OrderedDict
-from manuskript.functions import writablePath
+import os, gzip, json, glob, re, string, threading, bisect, subprocess, mmap, tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, CancelledError
+from PyQt5.QtCore import QLocale, QObject, QSettings, QCoreApplication, pyqtSignal
+from collections import OrderedDict, deque
+from manuskript.functions import writablePath, lazyModule
+from manuskript.version import getVersion
 
-try:
-    import enchant
-except ImportError:
-    enchant = None
+import logging
+LOGGER = logging.getLogger(__name__)
 
-try:
-    import spellchecker as pyspellchecker
-except ImportError:
-    pyspellchecker = None
+# The libraries are optional, and only imported when first used.
+enchant = lazyModule("enchant")
+
+pyspellchecker = lazyModule("spellchecker")
 
 SYMSPELLPY_MIN_VERSION = "6.3.8"
-try:
-    import symspellpy
+
+def checkSymspellpyVersion(module):
     import distutils.version
 
-    if ((not hasattr(symspellpy, '__version__')) or
-        (distutils.version.LooseVersion(symspellpy.__version__) < SYMSPELLPY_MIN_VERSION)):
-        symspellpy = None
+    return (hasattr(module, '__version__') and
+            distutils.version.LooseVersion(module.__version__) >= SYMSPELLPY_MIN_VERSION)
+
+symspellpy = lazyModule("symspellpy", check=checkSymspellpyVersion)
+
+languagetool = lazyModule("language_tool_python", "language_check")
 
-except ImportError:
-    symspellpy = None
+def use_language_check():
+    return bool(languagetool) and languagetool.__name__ == "language_check"
 
+class VerdictCache:
+    """
+    Bounded LRU cache of the verdicts of `BasicDictionary.isMisspelled`,
+    keyed by (dictionary, word) and shared by all dictionaries.
 
-use_language_check = False
+    Common words are looked up thousands of times per document, and the
+    lookup is relatively expensive with some libraries.
+    """
+
+    def __init__(self, limit=50000):
+        self.limit = limit
+        self._verdicts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, dictionary, word):
+        "Returns the cached verdict for ``word``, or None."
+        key = (dictionary, word)
+        with self._lock:
+            verdict = self._verdicts.get(key)
+            if verdict is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._verdicts.move_to_end(key)
+            return verdict
+
+    def set(self, dictionary, word, verdict):
+        with self._lock:
+            self._verdicts[(dictionary, word)] = verdict
+            if len(self._verdicts) > self.limit:
+                self._verdicts.popitem(last=False)
+
+    def invalidate(self, dictionary=None):
+        "Forgets the verdicts of ``dictionary`` (all of them by default)."
+        with self._lock:
+            if dictionary is None:
+                self._verdicts.clear()
+            else:
+                for key in [k for k in self._verdicts if k[0] == dictionary]:
+                    del self._verdicts[key]
+
+    def hitRatio(self):
+        "Returns the ratio of lookups answered from the cache, for profiling."
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+    def resetStatistics(self):
+        self.hits = 0
+        self.misses = 0
+
+class SpellcheckerCapabilities(QObject):
+    """
+    Knows which spellchecking libraries are usable, and their dictionaries.
+
+    Detecting it can be slow (LanguageTool needs to start java and a server),
+    so it is probed once per session in a background thread (see `probe`).
+    Meanwhile, the results of the previous session are used, which are saved
+    in the application settings with a version stamp. `changed` is emitted
+    when the results of the probe differ from them.
+    """
+
+    changed = pyqtSignal()
+    _probed = pyqtSignal(object)
+
+    # Increment when the format of the saved results changes
+    VERSION = 1
+    settingsKey = "Spellchecker/capabilities"
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+        self._results = None
+        self._saved = False
+        self._thread = None
+        self._probed.connect(self.setResults)
+
+    @classmethod
+    def stamp(cls):
+        return "{}/{}".format(getVersion(), cls.VERSION)
+
+    def results(self):
+        """Returns an OrderedDict: library name → {"installed", "dictionaries",
+        "default"}, starting the probe if it was not yet."""
+        if self._results is None:
+            self._results = self.loadResults()
+            self._saved = bool(self._results)
+            if not self._results:
+                # Nothing known yet (first run, or another version): the
+                # libraries that are quick to probe are probed right away
+                self._results = self.detect(quick=True)
+        self.probe()
+        return self._results
+
+    def library(self, lib):
+        return self.results().get(lib, {"installed": False,
+                                         "dictionaries": [],
+                                         "default": None})
+
+    def probe(self):
+        "Probes the libraries in the background, once."
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="Spellchecker probe")
+            self._thread.start()
+
+    @staticmethod
+    def detect(quick=False):
+        """Probes the libraries right away. It can be slow, unless ``quick``
+        is True, in which case libraries with a slow probe are said not to be
+        installed."""
+        results = OrderedDict()
+        for impl in Spellchecker.implementations:
+            if quick and impl.slowProbe:
+                results[impl.getLibraryName()] = {"installed": False,
+                                                  "dictionaries": [],
+                                                  "default": None}
+                continue
+            try:
+                results[impl.getLibraryName()] = impl.probe()
+            except Exception as e:
+                LOGGER.warning("Can't probe %s: %s", impl.getLibraryName(), e)
+                results[impl.getLibraryName()] = {"installed": False,
+                                                  "dictionaries": [],
+                                                  "default": None}
+        return results
+
+    def _run(self):
+        self._probed.emit(self.detect())
+
+    def setResults(self, results):
+        changed = results != self._results
+        self._results = results
+        if changed or not self._saved:
+            self.saveResults(results)
+            self._saved = True
+        if changed:
+            self.changed.emit()
+
+    def loadResults(self):
+        try:
+            saved = json.loads(QSettings().value(self.settingsKey, "{}"))
+            if saved.get("stamp") == self.stamp():
+                return OrderedDict(saved["libraries"])
+        except Exception:
+            pass
+        return OrderedDict()
+
+    def saveResults(self, results):
+        QSettings().setValue(self.settingsKey, json.dumps({
+            "stamp": self.stamp(),
+            "libraries": list(results.items())}))
 
-try:
-    try:
-        import language_tool_python as languagetool
-    except:
-        import language_check as languagetool
-        use_language_check = True
-except:
-    languagetool = None
 
 class Spellchecker:
     dictionaries = {}
+    verdicts = VerdictCache()
+    capabilities = SpellcheckerCapabilities()
     # In order of priority
     implementations = []
 
@@ -54,8 +202,8 @@ class Spellchecker:
 
     @staticmethod
     def isInstalled():
-        for impl in Spellchecker.implementations:
-            if impl.isInstalled():
+        for lib in Spellchecker.capabilities.results().values():
+            if lib["installed"]:
                 return True
         return False
 
@@ -70,7 +218,7 @@ class Spellchecker:
     def availableLibraries():
         ret = []
         for impl in Spellchecker.implementations:
-            if impl.isInstalled():
+            if Spellchecker.capabilities.library(impl.getLibraryName())["installed"]:
                 ret.append(impl.getLibraryName())
         return ret
 
@@ -78,20 +226,30 @@ class Spellchecker:
     def availableDictionaries():
         dictionaries = OrderedDict()
         for impl in Spellchecker.implementations:
-            if impl.isInstalled():
-                dictionaries[impl.getLibraryName()] = impl.availableDictionaries()
+            lib = Spellchecker.capabilities.library(impl.getLibraryName())
+            if lib["installed"]:
+                dictionaries[impl.getLibraryName()] = list(lib["dictionaries"])
         return dictionaries
 
     @staticmethod
     def normalizeDictName(lib, dictionary):
         return "{}:{}".format(lib, dictionary)
 
+    @staticmethod
+    def service():
+        """Returns the shared SpellcheckService, used to check texts in the
+        background."""
+        global _service
+        if _service is None:
+            _service = SpellcheckService()
+        return _service
+
     @staticmethod
     def getDefaultDictionary():
         for impl in Spellchecker.implementations:
-            default = impl.getDefaultDictionary()
-            if default:
-                return Spellchecker.normalizeDictName(impl.getLibraryName(), default)
+            lib = Spellchecker.capabilities.library(impl.getLibraryName())
+            if lib["installed"] and lib["default"]:
+                return Spellchecker.normalizeDictName(impl.getLibraryName(), lib["default"])
         return None
 
     @staticmethod
@@ -120,7 +278,8 @@ class Spellchecker:
             d = Spellchecker.dictionaries.get(dictionary, None)
             if d == None:
                 for impl in Spellchecker.implementations:
-                    if impl.isInstalled() and lib == impl.getLibraryName():
+                    if lib == impl.getLibraryName() and \
+                       Spellchecker.capabilities.library(lib)["installed"]:
                         d = impl(name)
                         Spellchecker.dictionaries[dictionary] = d
                         break
@@ -129,6 +288,284 @@ class Spellchecker:
             pass
         return None
 
+class SpellcheckService(QObject):
+    """
+    Checks texts (typically the blocks of a document) in a worker thread, and
+    caches the resulting matches per dictionary and text, so that highlighting
+    a document does not stall the GUI thread.
+
+    `request` queues a text to be checked, and `checked` is emitted (in the GUI
+    thread) with the dictionary and the text once the matches are available
+    from `cachedMatches`.
+    """
+
+    checked = pyqtSignal(object, str)
+
+    # Maximum number of cached texts
+    cacheLimit = 8192
+    # Maximum number of texts checked together
+    batchSize = 32
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeUp = threading.Condition(self._lock)
+        self._queue = deque()
+        self._queued = set()
+        # Incremented on invalidation, so that results computed before are
+        # not cached.
+        self._generation = 0
+        self._thread = None
+
+    @staticmethod
+    def cacheKey(dictionary, text):
+        return (dictionary.normalizedName, text)
+
+    def cachedMatches(self, dictionary, text):
+        """Returns the cached matches of ``text`` with ``dictionary``, or
+        None if it has not been checked yet."""
+        key = self.cacheKey(dictionary, text)
+        with self._lock:
+            matches = self._cache.get(key)
+            if matches is not None:
+                self._cache.move_to_end(key)
+            return matches
+
+    def check(self, dictionary, text):
+        """Returns the matches of ``text`` with ``dictionary``, checking it
+        right away if it is not cached."""
+        if not dictionary.isReady():
+            return dictionary.checkText(text)
+        matches = self.cachedMatches(dictionary, text)
+        if matches is None:
+            with self._lock:
+                generation = self._generation
+            matches = dictionary.checkText(text)
+            self._store(dictionary, text, matches, generation)
+        return matches
+
+    def request(self, dictionary, text):
+        """Queues ``text`` to be checked with ``dictionary`` in the
+        background. `checked` is emitted when it's done."""
+        key = self.cacheKey(dictionary, text)
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            self._queue.append((key, dictionary, text))
+            if self._thread is None:
+                # Daemon, so that it doesn't prevent the application from
+                # quitting.
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name="Spellcheck")
+                self._thread.start()
+            self._wakeUp.notify()
+
+    def invalidate(self, dictionary=None):
+        """Clears the cached matches (of ``dictionary`` only, if given), for
+        example after a word has been added to it."""
+        with self._lock:
+            self._generation += 1
+            if dictionary is None:
+                self._cache.clear()
+            else:
+                name = self.cacheKey(dictionary, "")[0]
+                for key in [k for k in self._cache if k[0] == name]:
+                    del self._cache[key]
+
+    def _store(self, dictionary, text, matches, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._cache[self.cacheKey(dictionary, text)] = matches
+            while len(self._cache) > self.cacheLimit:
+                self._cache.popitem(last=False)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._wakeUp.wait()
+
+                # Takes the texts queued for the same dictionary together, so
+                # that they can be checked at once (see checkTexts).
+                batch = [self._queue.popleft()]
+                dictionary = batch[0][1]
+                while self._queue and len(batch) < self.batchSize and \
+                      self._queue[0][1] is dictionary:
+                    batch.append(self._queue.popleft())
+                generation = self._generation
+
+            texts = [text for key, d, text in batch]
+            try:
+                dictionary.waitUntilReady()
+                results = dictionary.checkTexts(texts)
+            except Exception as e:
+                LOGGER.warning("Spellchecking failed: %s", e)
+                results = [[] for text in texts]
+
+            for text, matches in zip(texts, results):
+                self._store(dictionary, text, matches, generation)
+            with self._lock:
+                for key, d, text in batch:
+                    self._queued.discard(key)
+            for text in texts:
+                self.checked.emit(dictionary, text)
+
+_service = None
+
+def checkChunk(dictionary, chunk):
+    """
+    Checks the texts of ``chunk``, a list of (key, text), and returns the list
+    of (key, [(start, end), ...]) of their misspelled words.
+
+    ``dictionary`` is a dictionary or, when run in a worker process, the
+    (class, name, organization, application) needed to load it there.
+    """
+    if isinstance(dictionary, tuple):
+        dictionary = processDictionary(*dictionary)
+    dictionary.waitUntilReady()
+
+    # Like the highlighter, adds a space so that the last word is checked
+    results = dictionary.checkTexts([text + " " for key, text in chunk])
+
+    return [(key, [(m.start, m.end) for m in matches
+                   if m.locqualityissuetype == 'misspelling'])
+            for (key, text), matches in zip(chunk, results)]
+
+# (class, name) → dictionary, in worker processes
+_processDictionaries = {}
+
+def processDictionary(cls, name, organization, application):
+    d = _processDictionaries.get((cls, name))
+    if d is None:
+        # So that the dictionaries are found in the application's data folder
+        QCoreApplication.setOrganizationName(organization)
+        QCoreApplication.setApplicationName(application)
+        d = cls(name)
+        _processDictionaries[(cls, name)] = d
+    return d
+
+class ProjectSpellcheck(QObject):
+    """
+    Checks the spelling of many texts at once (a whole project, typically),
+    with a pool of worker processes, and aggregates the misspelled words.
+
+    ``texts`` is a list of (key, text). Once `finished` is emitted,
+    `misspelled` maps each misspelled word to the list of its occurrences,
+    as (key, start, end).
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+    _checked = pyqtSignal(object)
+
+    # Approximate number of characters sent to a worker at once
+    chunkSize = 50000
+
+    def __init__(self, dictionary, texts, workers=None, processes=None, parent=None):
+        QObject.__init__(self, parent)
+        self.dictionary = dictionary
+        self.texts = OrderedDict(texts)
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = dictionary.supportsProcesses if processes is None else processes
+        self.misspelled = OrderedDict()
+        self._executor = None
+        self._futures = []
+        self._done = 0
+        self._total = 0
+        self._cancelled = False
+        self._checked.connect(self._addResults)
+
+    def chunks(self):
+        chunks = []
+        chunk = []
+        size = 0
+        for key, text in self.texts.items():
+            if not text:
+                continue
+            chunk.append((key, text))
+            size += len(text)
+            if size >= self.chunkSize:
+                chunks.append(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def start(self):
+        chunks = self.chunks()
+        self._total = len(chunks)
+        if not chunks:
+            self.finished.emit()
+            return
+
+        workers = min(self.workers, len(chunks))
+        if self.processes:
+            # Spawned, since forking the GUI process is unsafe
+            self._executor = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"))
+            d = self.dictionary
+            dictionary = (type(d), d.name, QCoreApplication.organizationName(),
+                          QCoreApplication.applicationName())
+        else:
+            self._executor = ThreadPoolExecutor(workers)
+            dictionary = self.dictionary
+
+        for chunk in chunks:
+            future = self._executor.submit(checkChunk, dictionary, chunk)
+            future.add_done_callback(self._chunkDone)
+            self._futures.append(future)
+        self._executor.shutdown(wait=False)
+
+    def cancel(self):
+        self._cancelled = True
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    def isFinished(self):
+        return self._done == self._total
+
+    def _chunkDone(self, future):
+        # Called from another thread
+        try:
+            results = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            LOGGER.warning("Spellchecking failed: %s", e)
+            results = []
+        self._checked.emit(results)
+
+    def _addResults(self, results):
+        if self._cancelled:
+            return
+
+        for key, matches in results:
+            text = self.texts[key]
+            for start, end in matches:
+                word = text[start:end]
+                if not self.dictionary.isCustomWord(word):
+                    self.misspelled.setdefault(word, []).append((key, start, end))
+
+        self._done += 1
+        self.progress.emit(self._done, self._total)
+        if self._done == self._total:
+            self._sortResults()
+            self.finished.emit()
+
+    def _sortResults(self):
+        "Sorts the words and their occurrences in the order of the texts."
+        order = {key: i for i, key in enumerate(self.texts)}
+        position = lambda o: (order[o[0]], o[1])
+        for occurrences in self.misspelled.values():
+            occurrences.sort(key=position)
+        self.misspelled = OrderedDict(sorted(self.misspelled.items(),
+                                             key=lambda i: position(i[1][0])))
+
 class BasicMatch:
     def __init__(self, startIndex, endIndex):
         self.start = startIndex
@@ -141,26 +578,46 @@ class BasicMatch:
         return text[self.start:self.end]
 
 class BasicDictionary:
+    # Whether the dictionary can be loaded in worker processes, see
+    # ProjectSpellcheck
+    supportsProcesses = True
+    # Whether probing the library takes a while, see SpellcheckerCapabilities
+    slowProbe = False
+
     def __init__(self, name):
+        # Dictionaries are used both from the GUI thread and from the thread
+        # of the SpellcheckService, while the libraries are not thread-safe:
+        # the calls to the library are done holding this lock.
+        self._lock = threading.Lock()
         self._lang = name
         if not self._lang:
             self._lang = self.getDefaultDictionary()
 
         self._customDict = set()
-        customPath = self.getCustomDictionaryPath()
+        self._journalLength = 0
+        # Changes made since the custom dictionary was last saved. The journal
+        # is read first: it is only emptied once the dictionary containing its
+        # changes is saved (see _saveCustomDict), so none of them can be missed.
+        journal = self._readJournal()
         try:
-            with gzip.open(customPath, 'rt', encoding='utf-8') as f:
+            with gzip.open(self.getCustomDictionaryPath(), 'rt', encoding='utf-8') as f:
                 self._customDict = set(json.loads(f.read()))
-                for word in self._customDict:
-                    self._dict.create_dictionary_entry(word, self.CUSTOM_COUNT)
         except:
-            # If error loading the file, overwrite with empty dictionary
-            self._saveCustomDict()
+            # If error loading the file, start with an empty dictionary
+            pass
+
+        # Only replayed: dictionaries are also loaded in worker processes (see
+        # ProjectSpellcheck), so the journal is compacted by `addWords` only.
+        self._replayJournal(journal)
 
     @property
     def name(self):
         return self._lang
 
+    @property
+    def normalizedName(self):
+        return Spellchecker.normalizeDictName(self.getLibraryName(), self.name)
+
     @staticmethod
     def getLibraryName():
         raise NotImplemented
@@ -185,6 +642,16 @@ class BasicDictionary:
     def availableDictionaries():
         raise NotImplemented
 
+    @classmethod
+    def probe(cls):
+        """Returns whether the library is usable, its dictionaries and the
+        default one. It can be slow, see SpellcheckerCapabilities."""
+        if not cls.isInstalled():
+            return {"installed": False, "dictionaries": [], "default": None}
+        return {"installed": True,
+                "dictionaries": list(cls.availableDictionaries()),
+                "default": cls.getDefaultDictionary()}
+
     def checkText(self, text):
         # Based on http://john.nachtimwald.com/2009/08/22/qplaintextedit-with-in-line-spell-check/
         WORDS = r'(?iu)((?:[^_\W]|\')+)[^A-Za-z0-9\']'
@@ -199,7 +666,7 @@ class BasicDictionary:
 
         for word_object in re.finditer(WORDS, text):
             word = word_object.group(1)
-            mispelled = self.isMisspelled(word)
+            mispelled = self.isMisspelledCached(word)
             if mispelled == False:
                 continue
             punctuation = string.punctuation.replace('-', '')
@@ -219,7 +686,7 @@ class BasicDictionary:
                 # ((?:[a-zA-Z]|\')+) greedily matches for letters and apostrophes
                 
                 temp = re.match(apostrophe_WORDS, word)
-                mispelled = self.isMisspelled(temp.group(1)) if temp else False
+                mispelled = self.isMisspelledCached(temp.group(1)) if temp else False
 
             if (mispelled and not self.isCustomWord(word)):
 
@@ -229,9 +696,34 @@ class BasicDictionary:
 
         return matches
 
+    def isReady(self):
+        """Returns False while the dictionary is still loading, in which case
+        it finds no mistake."""
+        return True
+
+    def waitUntilReady(self, timeout=None):
+        "Blocks until the dictionary is loaded."
+        return True
+
+    def checkTexts(self, texts):
+        """Returns the matches of each of ``texts``. Libraries able to check
+        several texts at once more efficiently can reimplement it."""
+        return [self.checkText(text) for text in texts]
+
     def isMisspelled(self, word):
         raise NotImplemented
 
+    def isMisspelledCached(self, word):
+        """Same as `isMisspelled`, but remembers the verdict in the shared
+        `Spellchecker.verdicts` cache."""
+        if not self.isReady():
+            return self.isMisspelled(word)
+        verdict = Spellchecker.verdicts.get(self.normalizedName, word)
+        if verdict is None:
+            verdict = self.isMisspelled(word)
+            Spellchecker.verdicts.set(self.normalizedName, word, verdict)
+        return verdict
+
     def getSuggestions(self, word):
         raise NotImplemented
 
@@ -239,7 +731,7 @@ class BasicDictionary:
         if start < end:
             word = text[start:end]
 
-            if (self.isMisspelled(word) and not self.isCustomWord(word)):
+            if (self.isMisspelledCached(word) and not self.isCustomWord(word)):
                 match = BasicMatch(start, end)
                 match.replacements = self.getSuggestions(word)
 
@@ -251,16 +743,26 @@ class BasicDictionary:
         return word.lower() in self._customDict
 
     def addWord(self, word):
-        word = word.lower()
-        if not word in self._customDict:
-            self._customDict.add(word)
-            self._saveCustomDict()
+        self.addWords([word])
+
+    def addWords(self, words):
+        "Adds all ``words`` to the custom dictionary at once."
+        added = []
+        for word in words:
+            word = word.lower()
+            if not word in self._customDict:
+                self._customDict.add(word)
+                added.append(word)
+        if added:
+            self._appendToJournal("+", added)
+        Spellchecker.verdicts.invalidate(self.normalizedName)
 
     def removeWord(self, word):
         word = word.lower()
         if word in self._customDict:
             self._customDict.remove(word)
-            self._saveCustomDict()
+            self._appendToJournal("-", [word])
+        Spellchecker.verdicts.invalidate(self.normalizedName)
 
     @classmethod
     def getResourcesPath(cls):
@@ -272,15 +774,69 @@ class BasicDictionary:
     def getCustomDictionaryPath(self):
         return os.path.join(self.getResourcesPath(), "{}.json.gz".format(self._lang))
 
+    # Number of changes in the journal before the custom dictionary is saved
+    # again as a whole
+    JOURNAL_LIMIT = 500
+
+    def getCustomDictionaryJournalPath(self):
+        return os.path.join(self.getResourcesPath(), "{}.journal".format(self._lang))
+
+    # Serializes the writes to the journals and custom dictionaries
+    _journalLock = threading.Lock()
+
+    def _appendToJournal(self, operation, words):
+        """Records the addition ('+') or removal ('-') of ``words`` at the end
+        of the journal, which is cheaper than saving the whole custom
+        dictionary every time."""
+        with self._journalLock:
+            with open(self.getCustomDictionaryJournalPath(), "a", encoding="utf-8", newline="\n") as f:
+                for word in words:
+                    f.write("{}{}\n".format(operation, word))
+            self._journalLength += len(words)
+
+            if self._journalLength >= self.JOURNAL_LIMIT:
+                self._saveCustomDict()
+
+    def _readJournal(self):
+        "Returns the list of (operation, word) in the journal."
+        try:
+            with open(self.getCustomDictionaryJournalPath(), "r", encoding="utf-8") as f:
+                return [(line[:1], line[1:].rstrip("\n")) for line in f if line.endswith("\n")]
+        except FileNotFoundError:
+            return []
+
+    def _replayJournal(self, journal=None):
+        for operation, word in self._readJournal() if journal is None else journal:
+            if operation == "+":
+                self._customDict.add(word)
+            elif operation == "-":
+                self._customDict.discard(word)
+            self._journalLength += 1
+
     def _saveCustomDict(self):
+        """Saves the whole custom dictionary, and empties the journal. Called
+        with `_journalLock` held."""
         customPath = self.getCustomDictionaryPath()
-        with gzip.open(customPath, "wt", newline="\n") as f:
-            f.write(json.dumps(list(self._customDict)))
+        # Unique, so that it can't be mixed up with another save
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(customPath))
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", newline="\n") as f:
+                f.write(json.dumps(list(self._customDict)))
+            os.replace(tmpPath, customPath)
+        except:
+            os.remove(tmpPath)
+            raise
+
+        # Truncated rather than removed, after the dictionary is saved
+        open(self.getCustomDictionaryJournalPath(), "w").close()
+        self._journalLength = 0
 
 
 class EnchantDictionary(BasicDictionary):
 
     def __init__(self, name):
+        # See BasicDictionary
+        self._lock = threading.Lock()
         self._lang = name
         if not (self._lang and enchant.dict_exists(self._lang)):
             self._lang = self.getDefaultDictionary()
@@ -297,7 +853,7 @@ class EnchantDictionary(BasicDictionary):
 
     @staticmethod
     def isInstalled():
-        return enchant != None
+        return bool(enchant)
 
     @staticmethod
     def availableDictionaries():
@@ -322,19 +878,28 @@ class EnchantDictionary(BasicDictionary):
         return default_locale
 
     def isMisspelled(self, word):
-        return not self._dict.check(word)
+        with self._lock:
+            return not self._dict.check(word)
 
     def getSuggestions(self, word):
-        return self._dict.suggest(word)
+        with self._lock:
+            return self._dict.suggest(word)
 
     def isCustomWord(self, word):
-        return self._dict.is_added(word)
+        with self._lock:
+            return self._dict.is_added(word)
 
-    def addWord(self, word):
-        self._dict.add(word)
+    def addWords(self, words):
+        # The personal word list of enchant is already appended to
+        with self._lock:
+            for word in words:
+                self._dict.add(word)
+        Spellchecker.verdicts.invalidate(self.normalizedName)
 
     def removeWord(self, word):
-        self._dict.remove(word)
+        with self._lock:
+            self._dict.remove(word)
+        Spellchecker.verdicts.invalidate(self.normalizedName)
 
     def getCustomDictionaryPath(self):
         return os.path.join(self.getResourcesPath(), "{}.txt".format(self.name))
@@ -357,7 +922,7 @@ class PySpellcheckerDictionary(BasicDictionary):
 
     @staticmethod
     def isInstalled():
-        return pyspellchecker != None
+        return bool(pyspellchecker)
 
     @staticmethod
     def availableDictionaries():
@@ -383,21 +948,26 @@ class PySpellcheckerDictionary(BasicDictionary):
         return default_locale
 
     def isMisspelled(self, word):
-        return len(self._dict.unknown([word])) > 0
+        with self._lock:
+            return len(self._dict.unknown([word])) > 0
 
     def getSuggestions(self, word):
-        candidates = self._dict.candidates(word)
+        with self._lock:
+            candidates = self._dict.candidates(word)
         if candidates and word in candidates:
             candidates.remove(word)
         return candidates
 
-    def addWord(self, word):
-        BasicDictionary.addWord(self, word)
-        self._dict.word_frequency.add(word.lower())
+    def addWords(self, words):
+        # Loading the words at once only updates the frequency table once
+        with self._lock:
+            self._dict.word_frequency.load_words([word.lower() for word in words])
+        BasicDictionary.addWords(self, words)
 
     def removeWord(self, word):
+        with self._lock:
+            self._dict.word_frequency.remove(word.lower())
         BasicDictionary.removeWord(self, word)
-        self._dict.word_frequency.remove(word.lower())
 
 class SymSpellDictionary(BasicDictionary):
     CUSTOM_COUNT = 1
@@ -406,28 +976,105 @@ class SymSpellDictionary(BasicDictionary):
     def __init__(self, name):
         BasicDictionary.__init__(self, name)
 
-        self._dict = symspellpy.SymSpell(self.DISTANCE)
+        # Loading the dictionary takes a while, so it is done in the
+        # background. Until it's ready, no word is misspelled.
+        self._dict = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._load, daemon=True,
+                         name="symspellpy {}".format(self.name)).start()
 
+    def _load(self):
+        sym = symspellpy.SymSpell(self.DISTANCE)
+        try:
+            self._loadDictionary(sym)
+        except Exception as e:
+            LOGGER.warning("Can't load dictionary '%s': %s", self.name, e)
+
+        with self._lock:
+            for word in self._customDict:
+                sym.create_dictionary_entry(word, self.CUSTOM_COUNT)
+            self._dict = sym
+        self._ready.set()
+
+    def _loadDictionary(self, sym):
+        # Dictionaries in symspellpy's own format, with the deletes already
+        # computed: loading them is much faster than building them
         cachePath = self.getCachedDictionaryPath()
+        wordsPath = self.getWordsDictionaryPath()
+        if os.path.exists(cachePath) and not self.isOlder(cachePath, wordsPath) \
+           and sym.load_pickle(cachePath, False):
+            return
+
+        if not os.path.exists(wordsPath):
+            if not pyspellchecker:
+                return
+            path = os.path.join(pyspellchecker.__path__[0], "resources", "{}.json.gz".format(self.name))
+            if not os.path.exists(path):
+                return
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                self.saveWords(wordsPath, json.loads(f.read()))
+
+        self.loadWords(sym, wordsPath)
+        # Before the custom words are added
+        self.savePickle(sym, cachePath)
+
+    @staticmethod
+    def isOlder(path, otherPath):
+        "Returns whether file ``path`` is older than ``otherPath``, if it exists."
+        return os.path.exists(otherPath) and \
+            os.path.getmtime(path) < os.path.getmtime(otherPath)
+
+    @staticmethod
+    def savePickle(sym, path):
+        """Saves ``sym`` to ``path`` (see _loadDictionary). The dictionary
+        might be built in several processes at once, so it is written to a
+        unique file first."""
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        os.close(fd)
         try:
-            if not self._dict.load_pickle(cachePath, False):
-                raise Exception("Can't load cached dictionary. " +
-                                "File might be corrupted or incompatible with installed symspellpy version")
-        except:
-            if pyspellchecker:
-                path = os.path.join(pyspellchecker.__path__[0], "resources", "{}.json.gz".format(self.name))
-                if os.path.exists(path):
-                    with gzip.open(path, 'rt', encoding='utf-8') as f:
-                        data = json.loads(f.read())
-                        for key in data:
-                            self._dict.create_dictionary_entry(key, data[key])
-                    self._dict.save_pickle(cachePath, False)
-        for word in self._customDict:
-            self._dict.create_dictionary_entry(word, self.CUSTOM_COUNT)
+            sym.save_pickle(tmpPath, False)
+            os.replace(tmpPath, path)
+        except Exception as e:
+            LOGGER.warning("Can't save dictionary '%s': %s", path, e)
+            try:
+                os.remove(tmpPath)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def saveWords(path, frequencies):
+        """Writes the ``frequencies`` of words to ``path``, as lines of
+        'word<tab>count'. It's much smaller than a pickled SymSpell, which is
+        built from it (see _loadDictionary)."""
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        with open(fd, "w", encoding="utf-8", newline="\n") as f:
+            for word, count in frequencies.items():
+                f.write("{}\t{}\n".format(word, count))
+        os.replace(tmpPath, path)
+
+    @staticmethod
+    def loadWords(sym, path):
+        "Adds the words from file ``path`` (see saveWords) to ``sym``."
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            for line in iter(m.readline, b""):
+                word, _, count = line.decode("utf-8").rstrip("\n").partition("\t")
+                if word:
+                    sym.create_dictionary_entry(word, int(count or 1))
+
+    def isReady(self):
+        return self._ready.is_set()
+
+    def waitUntilReady(self, timeout=None):
+        return self._ready.wait(timeout)
 
     def getCachedDictionaryPath(self):
         return os.path.join(self.getResourcesPath(), "{}.sym".format(self.name))
 
+    def getWordsDictionaryPath(self):
+        return os.path.join(self.getResourcesPath(), "{}.words".format(self.name))
+
     @staticmethod
     def getLibraryName():
         return "symspellpy"
@@ -442,15 +1089,17 @@ class SymSpellDictionary(BasicDictionary):
 
     @staticmethod
     def isInstalled():
-        return symspellpy != None
+        return bool(symspellpy)
 
     @classmethod
     def availableDictionaries(cls):
         if SymSpellDictionary.isInstalled():
-            files = glob.glob(os.path.join(cls.getResourcesPath(), "*.sym"))
             dictionaries = []
-            for file in files:
-                dictionaries.append(os.path.basename(file)[:-4])
+            for ext in ["sym", "words"]:
+                for file in glob.glob(os.path.join(cls.getResourcesPath(), "*." + ext)):
+                    name = os.path.basename(file)[:-len(ext) - 1]
+                    if not name in dictionaries:
+                        dictionaries.append(name)
             for sp_dict in PySpellcheckerDictionary.availableDictionaries():
                 if not sp_dict in dictionaries:
                     dictionaries.append(sp_dict)
@@ -465,21 +1114,27 @@ class SymSpellDictionary(BasicDictionary):
         return PySpellcheckerDictionary.getDefaultDictionary()
 
     def isMisspelled(self, word):
-        suggestions = self._dict.lookup(word.lower(), symspellpy.Verbosity.TOP)
-        if len(suggestions) > 0 and suggestions[0].distance == 0:
+        if not self.isReady():
             return False
-        # Try the word as is, since a dictionary might have uppercase letter as part
-        # of it's spelling ("I'm" or "January" for example)
-        suggestions = self._dict.lookup(word, symspellpy.Verbosity.TOP)
+        with self._lock:
+            suggestions = self._dict.lookup(word.lower(), symspellpy.Verbosity.TOP)
+            if len(suggestions) > 0 and suggestions[0].distance == 0:
+                return False
+            # Try the word as is, since a dictionary might have uppercase letter as part
+            # of it's spelling ("I'm" or "January" for example)
+            suggestions = self._dict.lookup(word, symspellpy.Verbosity.TOP)
         if len(suggestions) > 0 and suggestions[0].distance == 0:
             return False
         return True
 
     def getSuggestions(self, word):
+        if not self.isReady():
+            return []
         upper = word.isupper()
         upper1 = word[0].isupper()
-        suggestions = self._dict.lookup_compound(word, 2)
-        suggestions.extend(self._dict.lookup(word, symspellpy.Verbosity.CLOSEST))
+        with self._lock:
+            suggestions = self._dict.lookup_compound(word, 2)
+            suggestions.extend(self._dict.lookup(word, symspellpy.Verbosity.CLOSEST))
         candidates = []
         for sug in suggestions:
             if upper:
@@ -492,43 +1147,71 @@ class SymSpellDictionary(BasicDictionary):
                 candidates.append(term)
         return candidates
 
-    def addWord(self, word):
-        BasicDictionary.addWord(self, word)
-        self._dict.create_dictionary_entry(word.lower(), self.CUSTOM_COUNT)
+    def addWords(self, words):
+        with self._lock:
+            # If still loading, custom words are added when it's done
+            if self._dict:
+                for word in words:
+                    self._dict.create_dictionary_entry(word.lower(), self.CUSTOM_COUNT)
+            BasicDictionary.addWords(self, words)
 
     def removeWord(self, word):
-        BasicDictionary.removeWord(self, word)
-        # Since 6.3.8
-        self._dict.delete_dictionary_entry(word)
+        with self._lock:
+            if self._dict:
+                # Since 6.3.8
+                self._dict.delete_dictionary_entry(word)
+            BasicDictionary.removeWord(self, word)
 
 def get_languagetool_match_errorLength(match):
-    if use_language_check:
+    if use_language_check():
         return match.errorlength
     else:
         return match.errorLength
 
 def get_languagetool_match_ruleIssueType(match):
-    if use_language_check:
+    if use_language_check():
         return match.locqualityissuetype
     else:
         return match.ruleIssueType
 
 def get_languagetool_match_message(match):
-    if use_language_check:
+    if use_language_check():
         return match.msg
     else:
         return match.message
 
 class LanguageToolCache:
+    """
+    Bounded LRU cache of the LanguageTool matches of texts, keyed by content.
+    """
+
+    def __init__(self, limit=512):
+        self.limit = limit
+        self._matches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, text):
+        return text in self._matches
+
+    def get(self, text):
+        with self._lock:
+            matches = self._matches.get(text)
+            if matches is not None:
+                self._matches.move_to_end(text)
+            return matches
 
-    def __init__(self, tool, text):
-        self._length = len(text)
-        self._matches = self._buildMatches(tool, text)
+    def set(self, text, matches):
+        with self._lock:
+            self._matches[text] = matches
+            while len(self._matches) > self.limit:
+                self._matches.popitem(last=False)
 
-    def getMatches(self):
-        return self._matches
+    def clear(self):
+        with self._lock:
+            self._matches.clear()
 
-    def _buildMatches(self, tool, text):
+    @staticmethod
+    def buildMatches(tool, text):
         matches = []
 
         for match in tool.check(text):
@@ -544,25 +1227,33 @@ class LanguageToolCache:
 
         return matches
 
-    def update(self, tool, text):
-        if len(text) != self._length:
-            self._matches = self._buildMatches(tool, text)
-
 def get_languagetool_languages(tool):
-    if use_language_check:
+    if use_language_check():
         return languagetool.get_languages()
     else:
         return tool._get_languages()
 
 def get_languagetool_locale_language():
-    if use_language_check:
+    if use_language_check():
         return languagetool.get_locale_language()
     else:
         return languagetool.utils.get_locale_language()
 
 class LanguageToolDictionary(BasicDictionary):
 
-    _tool = None
+    # Checks are done by a local server, that's enough
+    supportsProcesses = False
+    # Java and the server need to be started
+    slowProbe = True
+
+    # Language → LanguageTool instance. Each one runs a local server, which
+    # is kept for the whole session.
+    _tools = {}
+    # Whether LanguageTool and java can be run, see isInstalled
+    _installed = None
+
+    # Separates the paragraphs checked together, see checkTexts
+    BATCH_SEPARATOR = "\n\n"
 
     def __init__(self, name):
         BasicDictionary.__init__(self, name)
@@ -570,18 +1261,27 @@ class LanguageToolDictionary(BasicDictionary):
         if not (self._lang and self._lang in get_languagetool_languages(self.getTool())):
             self._lang = self.getDefaultDictionary()
 
-        self.tool = languagetool.LanguageTool(self._lang)
-        self._cache = {}
+        self.tool = self.getTool(self._lang)
+        if self.tool == None:
+            raise RuntimeError("Can't start LanguageTool for '{}'".format(self._lang))
+        self._cache = LanguageToolCache()
 
     @staticmethod
-    def getTool():
-        if LanguageToolDictionary._tool == None:
+    def getTool(language=None):
+        """Returns the LanguageTool instance for ``language`` (or the default
+        language), creating it the first time."""
+        tool = LanguageToolDictionary._tools.get(language)
+        if tool == None:
             try:
-                LanguageToolDictionary._tool = languagetool.LanguageTool()
+                if language:
+                    tool = languagetool.LanguageTool(language)
+                else:
+                    tool = languagetool.LanguageTool()
             except:
                 return None
+            LanguageToolDictionary._tools[language] = tool
 
-        return LanguageToolDictionary._tool
+        return tool
 
     @staticmethod
     def getLibraryName():
@@ -589,21 +1289,32 @@ class LanguageToolDictionary(BasicDictionary):
 
     @staticmethod
     def getLibraryURL():
-        if use_language_check:
+        if use_language_check():
             return "https://pypi.org/project/language-check/"
         else:
             return "https://pypi.org/project/language-tool-python/"
 
     @staticmethod
     def isInstalled():
-        if (languagetool != None) and (LanguageToolDictionary.getTool() != None):
+        if LanguageToolDictionary._installed is None:
+            # Only set once known, since it can be asked from several threads
+            installed = False
 
-            # This check, if Java is installed, is necessary to
-            # make sure LanguageTool can be run without problems.
-            #
-            return (os.system('java -version') == 0)
+            if bool(languagetool) and (LanguageToolDictionary.getTool() != None):
 
-        return False
+                # This check, if Java is installed, is necessary to
+                # make sure LanguageTool can be run without problems.
+                #
+                try:
+                    installed = subprocess.run(
+                        ["java", "-version"], stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL).returncode == 0
+                except OSError:
+                    pass
+
+            LanguageToolDictionary._installed = installed
+
+        return LanguageToolDictionary._installed
 
     @staticmethod
     def availableDictionaries():
@@ -634,29 +1345,59 @@ class LanguageToolDictionary(BasicDictionary):
         return default_locale
 
     def checkText(self, text):
-        matches = []
-
         if len(text) == 0:
-            return matches
-
-        textId = hash(text)
-        cacheEntry = None
-
-        if not textId in self._cache:
-            cacheEntry = LanguageToolCache(self.tool, text)
-
-            self._cache[textId] = cacheEntry
-        else:
-            cacheEntry = self._cache[textId]
-            cacheEntry.update(self.tool, text)
-
-        for match in cacheEntry.getMatches():
+            return []
+
+        matches = self._cache.get(text)
+        if matches is None:
+            with self._lock:
+                matches = LanguageToolCache.buildMatches(self.tool, text)
+            self._cache.set(text, matches)
+
+        return self._filterCustomWords(text, matches)
+
+    def checkTexts(self, texts):
+        """Checks several paragraphs with a single LanguageTool request, by
+        joining those that are not cached, and splitting the matches back."""
+        unchecked = []
+        for text in texts:
+            if text and not text in self._cache and not text in unchecked:
+                unchecked.append(text)
+
+        if len(unchecked) > 1:
+            offsets = []
+            position = 0
+            for text in unchecked:
+                offsets.append(position)
+                position += len(text) + len(self.BATCH_SEPARATOR)
+
+            results = [[] for text in unchecked]
+            joined = self.BATCH_SEPARATOR.join(unchecked)
+            with self._lock:
+                joinedMatches = LanguageToolCache.buildMatches(self.tool, joined)
+            for match in joinedMatches:
+                i = bisect.bisect_right(offsets, match.start) - 1
+                match.start -= offsets[i]
+                match.end -= offsets[i]
+                # Ignores matches spanning over several paragraphs
+                if match.end <= len(unchecked[i]):
+                    results[i].append(match)
+
+            for text, matches in zip(unchecked, results):
+                self._cache.set(text, matches)
+
+        return [self.checkText(text) for text in texts]
+
+    def _filterCustomWords(self, text, matches):
+        result = []
+
+        for match in matches:
             word = match.getWord(text)
 
             if not (match.locqualityissuetype == 'misspelling' and self.isCustomWord(word)):
-                matches.append(match)
+                result.append(match)
 
-        return matches
+        return result
 
     def isMisspelled(self, word):
         if self.isCustomWord(word):
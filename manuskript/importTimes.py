@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Debugging aid measuring how long importing modules takes, like
+# `python -X importtime`, but built in and reported through the log.
+# Enabled with the --import-times command line argument, see main.py.
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+
+_times = []  # (depth, module name, self seconds, cumulative seconds)
+_local = threading.local()
+_import = None
+
+
+def loading(name, globals=None, fromlist=(), level=0):
+    """Returns the names of the modules an import statement loads, that are
+    not loaded yet. With `fromlist`, they are the submodules of `name` it
+    names (`from manuskript import mainWindow`)."""
+    if level:
+        try:
+            name = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+        except (ImportError, ValueError):
+            return []
+
+    module = sys.modules.get(name)
+    if module is None:
+        return [name]
+    if not hasattr(module, "__path__"):
+        # Not a package: `fromlist` only lists attributes
+        return []
+    submodules = ["{}.{}".format(name, f) for f in fromlist or ()
+                  if f != "*" and not hasattr(module, f)]
+    return [m for m in submodules if m not in sys.modules]
+
+
+def start():
+    """Starts measuring the imports. It should be called before any other
+    manuskript module is imported."""
+    global _import
+    if _import is not None:
+        return
+    _import = builtins.__import__
+
+    def timedImport(name, globals=None, locals=None, fromlist=(), level=0):
+        names = loading(name, globals, fromlist, level)
+        if not names:
+            return _import(name, globals, locals, fromlist, level)
+
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(0.)
+        start = time.perf_counter()
+        try:
+            return _import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            _times.append((len(stack), ", ".join(names), cumulative - children, cumulative))
+
+    builtins.__import__ = timedImport
+
+
+def stop():
+    "Stops measuring the imports."
+    global _import
+    if _import is not None:
+        builtins.__import__ = _import
+        _import = None
+
+
+def report(logger, count=30):
+    """Logs the ``count`` slowest imports since the last report, and the total
+    time spent importing the top-level modules. It can be called at any time:
+    main.py calls it once started, and again on exit for the modules imported
+    when first used."""
+    times = _times[:]
+    del _times[:len(times)]
+    if not times:
+        return
+    total = sum(t[3] for t in times if t[0] == 0)
+    logger.info("Import times (self | cumulative, in ms), %.1f ms in total:", total * 1000)
+    for depth, name, own, cumulative in sorted(times, key=lambda t: -t[3])[:count]:
+        logger.info("  %8.1f | %8.1f | %s%s", own * 1000, cumulative * 1000,
+                    "  " * depth, name)
@@ -296,6 +296,15 @@ def attributesFromOptionalModule(module, *attributes):
         # The list is consumed as a part of the unpacking syntax.
         return v
 
+def distributionVersion(distribution):
+    """Returns the version of an installed distribution (a package installed
+    with pip, for example), without importing it, or None."""
+    try:
+        from importlib import metadata  # Python 3.8+
+        return metadata.version(distribution)
+    except Exception:
+        return None
+
 def logRuntimeInformation(logger=None):
     """Logs all important runtime information neatly together.
 
@@ -357,23 +366,32 @@ def logRuntimeInformation(logger=None):
     logger.info("  * libxml   %s (compiled: %s)", vt2s(etree.LIBXML_VERSION), vt2s(etree.LIBXML_COMPILED_VERSION))
     logger.info("  * libxslt  %s (compiled: %s)", vt2s(etree.LIBXSLT_VERSION), vt2s(etree.LIBXSLT_COMPILED_VERSION))
 
+    # Optional modules are only imported when they are used, so their versions
+    # are read from the installed distributions, to keep the startup fast.
+    dv = distributionVersion
+
     # Spellcheckers. (Optional)
-    enchant_mod_ver, enchant_lib_ver = afom("enchant", "__version__", "get_enchant_version")
+    enchant_lib_ver = None
+    if "enchant" in sys.modules:
+        enchant_lib_ver = afom("enchant", "get_enchant_version")
     if enchant_lib_ver:
         enchant_lib_ver = enchant_lib_ver()
         if isinstance(enchant_lib_ver, bytes):  # PyEnchant version < 3.0.2
             enchant_lib_ver = enchant_lib_ver.decode('utf-8')
-    logger.info("* pyEnchant %s (libenchant: %s)", enchant_mod_ver or "N/A", enchant_lib_ver or "N/A")
+    logger.info("* pyEnchant %s (libenchant: %s)", dv("pyenchant") or "N/A", enchant_lib_ver or "N/A")
 
-    logger.info("* pySpellChecker %s", afom("spellchecker", "__version__") or "N/A")
-    logger.info("* Symspellpy %s", afom("symspellpy", "__version__") or "N/A")
+    logger.info("* pySpellChecker %s", dv("pyspellchecker") or "N/A")
+    logger.info("* Symspellpy %s", dv("symspellpy") or "N/A")
 
     # Markdown. (Optional)
-    logger.info("* Markdown %s", afom("markdown", "__version__") or "N/A")
+    logger.info("* Markdown %s", dv("markdown") or "N/A")
 
     # Web rendering engine
-    from manuskript.ui.views.webView import webEngine
-    logger.info("Web rendering engine: %s", webEngine)
+    if "manuskript.ui.views.webView" in sys.modules:
+        from manuskript.ui.views.webView import webEngine
+        logger.info("Web rendering engine: %s", webEngine)
+    else:
+        logger.info("Web rendering engine: not loaded yet")
 
     # Do not collect version information for Pandoc; that would require
     # executing `pandov -v` and parsing the output, all of which is too slow.
@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 
 import faulthandler
+import multiprocessing
 import os
 import platform
 import sys
 import signal
 
+# Must be started before importing anything else, see --import-times
+if "--import-times" in sys.argv:
+    import manuskript.importTimes
+    manuskript.importTimes.start()
+
 import manuskript.logging
 from PyQt5.QtCore import QLocale, QTranslator, QSettings, Qt
 from PyQt5.QtGui import QIcon, QColor, QPalette
@@ -194,6 +200,12 @@ def prepare(arguments, tests=False):
         path = os.path.abspath(arguments.filename)
         MW._autoLoadProject = path
 
+    if arguments.import_times:
+        from manuskript import importTimes
+        importTimes.report(LOGGER)
+        # Modules imported when first used
+        app.aboutToQuit.connect(lambda: importTimes.report(LOGGER))
+
     return app, MW
 
 def launch(arguments, app, MW = None):
@@ -286,6 +298,8 @@ def process_commandline(argv):
                         action="store_true")
     parser.add_argument("-v", "--verbose", action="count", default=1, help="lower the threshold for messages logged to the terminal")
     parser.add_argument("-L", "--logfile", default=None, help="override the default log file location")
+    parser.add_argument("--import-times", help="log how long importing modules takes, as a debugging aid",
+                        action="store_true")
     parser.add_argument("filename", nargs="?", metavar="FILENAME", help="the manuskript project (.msk) to open",
                         type=lambda x: is_valid_project(parser, x))
 
@@ -307,6 +321,9 @@ def run():
     1. I've read somewhere it helps with potential segfault (see comment below)
     2. So that prepare can be used in tests, without running the whole thing
     """
+    # Worker processes of frozen (packaged) builds start here too.
+    multiprocessing.freeze_support()
+
     # Parse command-line arguments.
     arguments = process_commandline(sys.argv[1:])
     # Initialize logging. (Does not include Qt integration yet.)
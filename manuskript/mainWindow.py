@@ -29,9 +29,11 @@ from manuskript.ui.about import aboutDialog
 from manuskript.ui.collapsibleDockWidgets import collapsibleDockWidgets
 from manuskript.ui.importers.importer import importerDialog
 from manuskript.ui.exporters.exporter import exporterDialog
+from manuskript.exporter import exporters
 from manuskript.ui.helpLabel import helpLabel
 from manuskript.ui.mainWindow import Ui_MainWindow
 from manuskript.ui.tools.frequencyAnalyzer import frequencyAnalyzer
+from manuskript.ui.tools.spellcheckReport import spellcheckReport
 from manuskript.ui.tools.targets import TargetsDialog
 from manuskript.ui.views.outlineDelegates import outlineCharacterDelegate
 from manuskript.ui.views.plotDelegate import plotDelegate
@@ -1741,16 +1743,40 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.actShowHelp.setChecked(False)
 
         # Spellcheck
+        self.menuDict = QMenu(self.tr("Dictionary"))
+        self.menuDictGroup = QActionGroup(self)
+        self.actSpellcheckProject = QAction(self.tr("Spellcheck &Project..."), self)
+        self.actSpellcheckProject.triggered.connect(self.spellcheckReport)
+        self.spellcheckInstallActions = []
+        self.actSpellcheck.toggled.connect(self.toggleSpellcheck, F.AUC)
+        # self.dictChanged.connect(self.mainEditor.setDict, F.AUC)
+        # self.dictChanged.connect(self.redacMetadata.setDict, F.AUC)
+        # self.dictChanged.connect(self.outlineItemEditor.setDict, F.AUC)
+        self.updateSpellcheckMenu()
+        # Available libraries are probed in the background
+        Spellchecker.capabilities.changed.connect(self.spellcheckCapabilitiesChanged, F.AUC)
+
+        # So are the tools used by exporters
+        for E in exporters:
+            E.capabilities.probe()
+
+
+    ###############################################################################
+    # SPELLCHECK
+    ###############################################################################
+
+    def updateSpellcheckMenu(self):
+        for a in self.spellcheckInstallActions:
+            self.menuTools.removeAction(a)
+        self.spellcheckInstallActions = []
+        self.menuTools.removeAction(self.menuDict.menuAction())
+        self.menuTools.removeAction(self.actSpellcheckProject)
+
         if Spellchecker.isInstalled():
-            self.menuDict = QMenu(self.tr("Dictionary"))
-            self.menuDictGroup = QActionGroup(self)
+            self.actSpellcheck.setVisible(True)
             self.updateMenuDict()
             self.menuTools.addMenu(self.menuDict)
-
-            self.actSpellcheck.toggled.connect(self.toggleSpellcheck, F.AUC)
-            # self.dictChanged.connect(self.mainEditor.setDict, F.AUC)
-            # self.dictChanged.connect(self.redacMetadata.setDict, F.AUC)
-            # self.dictChanged.connect(self.outlineItemEditor.setDict, F.AUC)
+            self.menuTools.addAction(self.actSpellcheckProject)
 
         else:
             # No Spell check support
@@ -1763,11 +1789,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                     return lambda: self.openSpellcheckWebPage(l)
                 a.triggered.connect(gen_slot_cb(lib), F.AUC)
                 self.menuTools.addAction(a)
+                self.spellcheckInstallActions.append(a)
 
-
-    ###############################################################################
-    # SPELLCHECK
-    ###############################################################################
+    def spellcheckCapabilitiesChanged(self):
+        """Called when the probe found other libraries or dictionaries than
+        thought. Editors opened meanwhile might have no dictionary: it is
+        applied to them again."""
+        self.updateSpellcheckMenu()
+        if Spellchecker.isInstalled():
+            self.setDictionary()
+            self.toggleSpellcheck(settings.spellcheck)
 
     def updateMenuDict(self):
 
@@ -1775,6 +1806,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             return
 
         self.menuDict.clear()
+        for a in self.menuDictGroup.actions():
+            self.menuDictGroup.removeAction(a)
         dictionaries = Spellchecker.availableDictionaries()
 
         # Set first run dictionary
@@ -1878,6 +1911,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.fw.show()
         self.centerChildWindow(self.fw)
 
+    def spellcheckReport(self):
+        self.sw = spellcheckReport(self)
+        self.sw.show()
+        self.centerChildWindow(self.sw)
+
     def sessionTargets(self):
         self.td = TargetsDialog(self)
         self.td.show()
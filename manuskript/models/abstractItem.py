@@ -9,6 +9,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QFont
 from PyQt5.QtWidgets import QTextEdit, qApp
 from lxml import etree as ET
+import itertools
 import re
 
 from manuskript import enums
@@ -27,9 +28,13 @@ class abstractItem():
     # Regexp from https://stackoverflow.com/questions/8733233/filtering-out-certain-bytes-in-python
     valid_xml_re = re.compile(u'[^\u0020-\uD7FF\u0009\u000A\u000D\uE000-\uFFFD\U00010000-\U0010FFFF]+')
 
+    # Versions of the data of all items, see version
+    _versions = itertools.count()
+
     def __init__(self, model=None, title="", _type="abstract", xml=None, parent=None, ID=None):
 
         self._data = {}
+        self._version = next(self._versions)
         self.childItems = []
         self._parent = None
         self._model = model
@@ -111,6 +116,11 @@ class abstractItem():
     def ID(self):
         return self._data.get(self.enum.ID)
 
+    def version(self):
+        """Returns the version of the data of the item. It changes each time
+        data is set, and is never the same for two items."""
+        return self._version
+
     def columnCount(self):
         return len(self.enum)
 
@@ -263,6 +273,7 @@ class abstractItem():
     def setData(self, column, data, role=Qt.DisplayRole):
         # Setting data
         self._data[column] = data
+        self._version = next(self._versions)
 
         # The _model will be none during splitting
         if self._model and column == self.enum.ID:
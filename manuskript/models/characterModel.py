@@ -3,7 +3,7 @@
 from PyQt5.QtCore import QModelIndex, Qt, QAbstractItemModel, QVariant
 from PyQt5.QtGui import QIcon, QPixmap, QColor
 
-from manuskript.functions import randomColor, iconColor, mainWindow, search
+from manuskript.functions import randomColor, iconColor, mainWindow, searchLazy
 from manuskript.enums import Character as C, Model
 from manuskript.searchLabels import CharacterSearchLabels
 
@@ -369,9 +369,9 @@ class Character(searchableItem):
                 # For detailed info we will highlight the full row, so we pass the row index
                 # to the highlighter instead of the (startPos, endPos) of the match itself.
                 results += [self.wrapSearchOccurrence(column, i, 0, context) for
-                            (startPos, endPos, context) in search(searchRegex, data[i].description)]
+                            (startPos, endPos, context) in searchLazy(searchRegex, data[i].description)]
                 results += [self.wrapSearchOccurrence(column, i, 0, context) for
-                            (startPos, endPos, context) in search(searchRegex, data[i].value)]
+                            (startPos, endPos, context) in searchLazy(searchRegex, data[i].value)]
         else:
             results += super().searchOccurrences(searchRegex, column)
 
@@ -41,6 +41,19 @@ class outlineItem(abstractItem, searchableItem):
         if not self._data.get(self.enum.compile):
             self._data[self.enum.compile] = 2
 
+    #######################################################################
+    # Model
+    #######################################################################
+
+    def setModel(self, model):
+        if self._model and self._model is not model:
+            self._model.referenceIndex.removeItem(self)
+
+        abstractItem.setModel(self, model)
+
+        if model:
+            model.referenceIndex.updateItem(self)
+
     #######################################################################
     # Properties
     #######################################################################
@@ -171,6 +184,9 @@ class outlineItem(abstractItem, searchableItem):
         abstractItem.setData(self, column, data, role)
 
         # Stuff to do afterwards
+        if self._model and column in self._model.referenceIndex.columns:
+            self._model.referenceIndex.updateItem(self, [column])
+
         if column == E.text:
             wc = F.wordCount(data)
             cc = F.charCount(data, settings.countSpaces)
@@ -4,10 +4,13 @@
 from manuskript.models.abstractModel import abstractModel
 from manuskript.models.searchableModel import searchableModel
 from manuskript.models.outlineItem import outlineItem
+from manuskript.models.referenceIndex import referenceIndex
 
 class outlineModel(abstractModel, searchableModel):
     def __init__(self, parent):
         abstractModel.__init__(self, parent)
+        # Must exist before any item is attached to the model
+        self.referenceIndex = referenceIndex()
         self.rootItem = outlineItem(model=self, title="Root", ID="0")
 
 
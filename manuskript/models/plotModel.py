@@ -12,7 +12,7 @@ from manuskript.enums import Plot, PlotStep, Model
 from manuskript.functions import toInt, mainWindow
 from manuskript.models.searchResultModel import searchResultModel
 from manuskript.searchLabels import PlotSearchLabels, PLOT_STEP_COLUMNS_OFFSET
-from manuskript.functions import search
+from manuskript.functions import searchLazy
 from manuskript.models.searchableModel import searchableModel
 from manuskript.models.searchableItem import searchableItem
 
@@ -308,7 +308,7 @@ class plotItemSearchWrapper(searchableItem):
                     if character:
                         columnText = character.name()
 
-                        characterResults = search(searchRegex, columnText)
+                        characterResults = searchLazy(searchRegex, columnText)
                         if len(characterResults):
                             # We will highlight the full character row in the plot characters list, so we
                             # return the row index instead of the match start and end positions.
@@ -317,7 +317,7 @@ class plotItemSearchWrapper(searchableItem):
                                              self.translate(item_name),
                                              self.searchPath(column),
                                              [(i, 0)], context) for start, end, context in
-                                search(searchRegex, columnText)]
+                                characterResults]
             else:
                 results += super().searchOccurrences(searchRegex, column)
                 if column == Plot.name:
@@ -383,6 +383,6 @@ class plotItemSearchWrapper(searchableItem):
                                          self.translate(plotStepName),
                                          self.plotStepPath(plotName, plotStepName, plotColumn),
                                          *getSearchData(i, start, end, context)) for start, end, context in
-                            search(searchRegex, plotStepText)]
+                            searchLazy(searchRegex, plotStepText)]
 
         return results
\ No newline at end of file
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+import re
+import weakref
+
+from manuskript.enums import Outline
+
+
+class referenceIndex():
+    """
+    Bidirectional index of the references ({T:ID}, {C:ID}, {P:ID}, {W:ID})
+    contained in the outline items of a model.
+
+    For each indexed column, it maps every item to the references it contains,
+    and every reference to the items containing it. It is kept up to date by
+    outlineItem when the indexed columns change, or when items are added to or
+    removed from the model, so that looking up references is a dictionary
+    lookup instead of a search in the whole outline.
+
+    References are stored as (letter, ID) tuples, see `key`.
+    """
+
+    # Matches the start of a reference: '{L:ID:' or '{L:ID}'.
+    RegEx = re.compile(r"{(\w):(\d+)[:}]")
+
+    # Columns that are indexed
+    columns = [Outline.notes, Outline.text]
+
+    def __init__(self):
+        # item → {column: set of keys}
+        self._itemRefs = weakref.WeakKeyDictionary()
+        # (column, key) → set of items
+        self._refItems = {}
+
+    @classmethod
+    def key(cls, ref):
+        """Returns the key for reference ``ref`` (a string like '{C:3:}' or
+        '{C:3}'), or None if it is not a reference."""
+        match = cls.RegEx.match(ref)
+        if match:
+            return (match.group(1).upper(), match.group(2))
+        return None
+
+    @classmethod
+    def keysIn(cls, text):
+        "Returns the set of keys of all references in ``text``."
+        if not text:
+            return set()
+        return {(m.group(1).upper(), m.group(2)) for m in cls.RegEx.finditer(str(text))}
+
+    def updateItem(self, item, columns=None):
+        """Indexes (again) the references of ``item`` in ``columns``
+        (all indexed columns by default)."""
+        refs = self._itemRefs.setdefault(item, {})
+
+        for column in columns or self.columns:
+            old = refs.get(column, set())
+            new = self.keysIn(item.data(column))
+
+            for k in old - new:
+                items = self._refItems.get((column, k))
+                if items is not None:
+                    items.discard(item)
+                    if not items:
+                        del self._refItems[(column, k)]
+
+            for k in new - old:
+                self._refItems.setdefault((column, k), weakref.WeakSet()).add(item)
+
+            refs[column] = new
+
+    def removeItem(self, item):
+        "Removes ``item`` from the index."
+        refs = self._itemRefs.pop(item, {})
+        for column, keys in refs.items():
+            for k in keys:
+                items = self._refItems.get((column, k))
+                if items is not None:
+                    items.discard(item)
+                    if not items:
+                        del self._refItems[(column, k)]
+
+    def clear(self):
+        self._itemRefs.clear()
+        self._refItems.clear()
+
+    def itemContains(self, item, ref, columns=(Outline.notes,)):
+        "Returns True if ``item`` contains reference ``ref`` in ``columns``."
+        k = self.key(ref)
+        refs = self._itemRefs.get(item, {})
+        return any(k in refs.get(column, ()) for column in columns)
+
+    def itemsContaining(self, ref, columns=(Outline.notes,)):
+        "Returns the list of items containing reference ``ref`` in ``columns``."
+        k = self.key(ref)
+        items = {}
+        for column in columns:
+            items.update(dict.fromkeys(self._refItems.get((column, k), ())))
+        return list(items)
+
+    def referencesIn(self, item, columns=(Outline.notes,)):
+        "Returns the set of keys of the references contained in ``item``."
+        refs = self._itemRefs.get(item, {})
+        r = set()
+        for column in columns:
+            r |= refs.get(column, set())
+        return r
@@ -568,21 +568,31 @@ def findReferencesTo(ref, parent=None, recursive=True):
     """List of text items containing references ref, and returns IDs.
     Starts from item parent. If None, starts from root."""
     oM = mainWindow().mdlOutline
+    index = oM.referenceIndex
 
     if parent == None:
         parent = oM.rootItem
 
-    # Removes everything after the second ':': '{L:ID:random text}' → '{L:ID:'
-    ref = ref[:ref.index(":", ref.index(":") + 1)+1]
-
-    # Bare form '{L:ID}'
-    ref2 = ref[:-1] + "}"
-
-    # Since it's a simple search (no regex), we search for both.
-    lst = parent.findItemsContaining(ref, [Outline.notes], recursive=recursive)
-    lst += parent.findItemsContaining(ref2, [Outline.notes], recursive=recursive)
-
-    return lst
+    if not recursive:
+        return [parent.ID()] if index.itemContains(parent, ref) else []
+
+    def treePosition(item):
+        "Returns the list of rows from root to item, or None if not in parent."
+        rows = []
+        while item is not parent:
+            if not item.parent():
+                return None
+            rows.insert(0, item.row())
+            item = item.parent()
+        return rows
+
+    lst = []
+    for item in index.itemsContaining(ref):
+        pos = treePosition(item)
+        if pos is not None:
+            lst.append((pos, item.ID()))
+
+    return [ID for pos, ID in sorted(lst)]
 
 def listReferences(ref, title=safeTranslate(qApp, "references", "Referenced in:")):
     oM = mainWindow().mdlOutline
@@ -31,10 +31,13 @@ class searchResultModel():
         return self._pos
 
     def context(self):
+        # Context can be given as a callable, so that it is only built when needed
+        if callable(self._context):
+            self._context = self._context()
         return self._context
 
     def __repr__(self):
-        return "(%s, %s, %s, %s, %s, %s, %s)" % (self._type, self._id, self._column, self._title, self._path, self._pos, self._context)
+        return "(%s, %s, %s, %s, %s, %s, %s)" % (self._type, self._id, self._column, self._title, self._path, self._pos, self.context())
 
     def __eq__(self, other):
         return self.type() == other.type() and \
@@ -3,7 +3,7 @@
 
 
 from manuskript.models.searchResultModel import searchResultModel
-from manuskript.functions import search
+from manuskript.functions import searchLazy
 from PyQt5.QtCore import QCoreApplication
 
 
@@ -13,7 +13,7 @@ class searchableItem:
         self._searchColumnLabels = searchColumnLabels
 
     def searchOccurrences(self, searchRegex, column):
-        return [self.wrapSearchOccurrence(column, startPos, endPos, context) for (startPos, endPos, context) in search(searchRegex, self.searchData(column))]
+        return [self.wrapSearchOccurrence(column, startPos, endPos, context) for (startPos, endPos, context) in searchLazy(searchRegex, self.searchData(column))]
 
     def wrapSearchOccurrence(self, column, startPos, endPos, context):
         return searchResultModel(self.searchModel(), self.searchID(), column, self.searchTitle(column), self.searchPath(column), [(startPos, endPos)], context)
@@ -114,3 +114,41 @@ def test_references(MWSampleProject):
     for ref in refs:
         assert Ref.open(ref) == True
     assert Ref.open(Ref.EmptyRef.format("Z", 14, "")) == False
+
+
+def test_findReferencesTo(MWSampleProject):
+    """
+    Tests that the reference index follows changes in the outline.
+    """
+    from manuskript.models import references as Ref
+    from manuskript.models import outlineItem
+    from manuskript.enums import Outline
+    MW = MWSampleProject
+    mdlOutline = MW.mdlOutline
+    root = mdlOutline.rootItem
+
+    ref = Ref.characterReference("42")
+    assert Ref.findReferencesTo(ref) == []
+
+    folder = root.child(0)
+    text = outlineItem(title="Text", _type="md", parent=folder)
+    text.setData(Outline.notes, "See {C:42:Someone}.")
+    assert Ref.findReferencesTo(ref) == [text.ID()]
+    assert Ref.findReferencesTo(ref, folder) == [text.ID()]
+    assert Ref.findReferencesTo(ref, folder, recursive=False) == []
+    assert Ref.findReferencesTo(ref, text, recursive=False) == [text.ID()]
+
+    # Bare form, and lowercase letter
+    folder.setData(Outline.notes, "{c:42}")
+    assert Ref.findReferencesTo(ref) == [folder.ID(), text.ID()]
+    assert folder.ID() not in Ref.findReferencesTo(Ref.characterReference("4"))
+
+    # Text is indexed but not searched by default
+    text.setData(Outline.notes, "")
+    text.setData(Outline.text, "{C:42}")
+    assert Ref.findReferencesTo(ref) == [folder.ID()]
+    assert mdlOutline.referenceIndex.itemsContaining(ref, [Outline.text]) == [text]
+
+    # Removing items
+    mdlOutline.removeIndexes([folder.index()])
+    assert Ref.findReferencesTo(ref) == []
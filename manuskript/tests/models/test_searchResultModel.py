@@ -14,3 +14,17 @@ def test_searchResultModel_constructionOk():
     assert searchResult.pos() == (15, 18)
     assert searchResult.context() == "This is <b>Lucas</b>"
 
+
+
+def test_searchResultModel_lazyContext():
+    calls = []
+
+    def context():
+        calls.append(1)
+        return "This is <b>Lucas</b>"
+
+    searchResult = searchResultModel("Character", "3", Character.notes, "Lucas", "A > B > C", (15, 18), context)
+    assert calls == []
+    assert searchResult.context() == "This is <b>Lucas</b>"
+    assert searchResult.context() == "This is <b>Lucas</b>"
+    assert len(calls) == 1
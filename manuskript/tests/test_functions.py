@@ -74,6 +74,43 @@ def test_outlineItemColors():
     from PyQt5.QtGui import QColor
     assert r["Compile"].name(QColor.HexArgb) == "#00000000"
 
+def test_outlinePalette(MWSampleProject):
+
+    from PyQt5.QtGui import QColor
+    from manuskript.models import outlineItem
+    MW = MWSampleProject
+    character = MW.mdlCharacter.character(0)
+    item = outlineItem(title="Test")
+    item.setData(item.enum.POV, character.ID())
+
+    assert F.outlineItemColors(item)["POV"].name() == character.color().name()
+
+    # Cache is invalidated when the character changes
+    character.setColor(QColor("#123456"))
+    assert F.outlineItemColors(item)["POV"].name() == "#123456"
+
+    # And when the labels change
+    MW.mdlLabels.item(1).setIcon(F.iconFromColorString("#654321"))
+    assert F.outlinePalette.labelColor("1").name() == "#654321"
+
+    MW.mdlStatus.item(1).setText("Some status")
+    assert F.outlinePalette.statusName("1") == "Some status"
+    assert F.outlinePalette.statusName("") == ""
+
+    # Models replaced (another project is opened)
+    from types import SimpleNamespace
+    from PyQt5.QtGui import QStandardItemModel
+    palette = F.outlineItemPalette()
+    palette._checkModels(MW)
+    other = SimpleNamespace(mdlCharacter=QStandardItemModel(), mdlLabels=QStandardItemModel(),
+                            mdlStatus=QStandardItemModel())
+    palette._checkModels(other)
+    version = palette._version
+    MW.mdlStatus.item(1).setText("Other status")
+    assert palette._version == version
+    other.mdlStatus.appendRow([])
+    assert palette._version == version + 1
+
 def test_paths():
 
     assert F.appPath() != None
@@ -143,4 +180,36 @@ def test_search_multiple_strMatches_caseSensitive():
         (0, 4, "<b>TeXt</b>, TEXT and more text"),
         (6, 10, "TeXt, <b>TEXT</b> and more text"),
         (20, 24, "TeXt, TEXT and more <b>text</b>")
-    ]
\ No newline at end of file
+    ]
+
+def test_searchLazy_context():
+    results = F.searchLazy(re.compile("text"), "This is\nsome text\nOK")
+    assert [(start, end) for start, end, context in results] == [(13, 17)]
+    assert results[0][2]() == "[...] some <b>text</b> [...]"
+
+    assert F.searchLazy(re.compile("text"), None) == []
+
+
+def test_search_longContext():
+    text = "a" * 1000 + "text" + "b" * 1000
+    context = F.search(re.compile("text"), text)[0][2]
+    assert context == "[...] " + "a" * 298 + "<b>text</b>" + "b" * 298 + " [...]"
+
+
+def test_lazyModule():
+    import sys
+    sys.modules.pop("colorsys", None)
+
+    colorsys = F.lazyModule("colorsys")
+    assert "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+    assert "colorsys" in sys.modules
+
+    missing = F.lazyModule("manuskript_no_such_module", "colorsys")
+    assert missing and missing.__name__ == "colorsys"
+
+    rejected = F.lazyModule("colorsys", check=lambda m: False)
+    assert not rejected
+    import pytest
+    with pytest.raises(ImportError):
+        rejected.rgb_to_hsv
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the import times debugging aid."""
+
+import logging
+import sys
+
+
+def test_importTimes(tmpdir, monkeypatch, caplog):
+    from manuskript import importTimes
+
+    package = tmpdir.mkdir("timedpackage")
+    package.join("__init__.py").write("VALUE = 1\n")
+    package.join("sub.py").write("")
+    package.join("other.py").write("")
+    package.join("rel.py").write("from . import other\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    del importTimes._times[:]
+    importTimes.start()
+    try:
+        import timedpackage
+        from timedpackage import sub
+        from timedpackage import VALUE
+        import timedpackage.rel
+        from timedpackage import sub
+    finally:
+        importTimes.stop()
+        for name in list(sys.modules):
+            if name.startswith("timedpackage"):
+                del sys.modules[name]
+
+    assert [(t[0], t[1]) for t in importTimes._times] == [
+        (0, "timedpackage"),
+        # Submodules imported through `fromlist`
+        (0, "timedpackage.sub"),
+        # Relative imports
+        (1, "timedpackage.other"),
+        (0, "timedpackage.rel"),
+    ]
+
+    # Reports what was imported since the last report
+    logger = logging.getLogger("importTimesTest")
+    with caplog.at_level(logging.INFO, logger="importTimesTest"):
+        importTimes.report(logger)
+        assert "timedpackage.rel" in caplog.text
+        caplog.clear()
+        importTimes.report(logger)
+        assert caplog.text == ""
@@ -0,0 +1,449 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the spellchecker."""
+
+import gzip
+import json
+import os
+import re
+import time
+
+from PyQt5.QtWidgets import qApp
+
+from manuskript.functions.spellchecker import BasicDictionary, SpellcheckService
+from manuskript.functions.spellchecker import Spellchecker, VerdictCache
+from manuskript.functions.spellchecker import LanguageToolCache, LanguageToolDictionary
+from manuskript.functions.spellchecker import SpellcheckerCapabilities, SymSpellDictionary, ProjectSpellcheck
+from manuskript.functions.spellchecker import PySpellcheckerDictionary
+
+
+class WordListDictionary(BasicDictionary):
+    """Dictionary knowing a fixed list of words, without any library."""
+
+    def __init__(self, name, words):
+        self._lang = name
+        self._customDict = set()
+        self._words = set(words)
+        self.checked = []
+        self.lookups = 0
+
+    @staticmethod
+    def getLibraryName():
+        return "wordlist"
+
+    def isMisspelled(self, word):
+        self.lookups += 1
+        return word.lower() not in self._words
+
+    def checkText(self, text):
+        self.checked.append(text)
+        return BasicDictionary.checkText(self, text)
+
+    def _saveCustomDict(self):
+        pass
+
+    def _appendToJournal(self, operation, words):
+        pass
+
+
+def test_spellcheckService_check():
+    d = WordListDictionary("service_check", ["this", "is", "a", "text"])
+    service = SpellcheckService()
+
+    assert service.cachedMatches(d, "this is a txet ") is None
+    matches = service.check(d, "this is a txet ")
+    assert [(m.start, m.end) for m in matches] == [(10, 14)]
+
+    # Cached
+    assert service.check(d, "this is a txet ") is matches
+    assert service.cachedMatches(d, "this is a txet ") is matches
+    assert d.checked == ["this is a txet "]
+
+    # Invalidated
+    service.invalidate(d)
+    assert service.cachedMatches(d, "this is a txet ") is None
+
+    # Bounded
+    service.cacheLimit = 2
+    for t in ["a ", "b ", "c "]:
+        service.check(d, t)
+    assert service.cachedMatches(d, "a ") is None
+    assert service.cachedMatches(d, "c ") is not None
+
+
+def test_spellcheckService_request():
+    d = WordListDictionary("service_request", ["this", "is", "a", "text"])
+    service = SpellcheckService()
+    done = []
+    service.checked.connect(lambda dictionary, text: done.append(text))
+
+    service.request(d, "this is a txet ")
+    service.request(d, "this is a text ")
+
+    deadline = time.time() + 5
+    while len(done) < 2 and time.time() < deadline:
+        qApp.processEvents()
+        time.sleep(.01)
+
+    assert sorted(done) == ["this is a text ", "this is a txet "]
+    assert service.cachedMatches(d, "this is a text ") == []
+    assert len(service.cachedMatches(d, "this is a txet ")) == 1
+
+
+def test_verdictCache():
+    d = WordListDictionary("verdicts", ["the", "cat"])
+    Spellchecker.verdicts.resetStatistics()
+
+    matches = d.checkText("the cat the cat the dgo ")
+    assert [(m.start, m.end) for m in matches] == [(20, 23)]
+    assert d.lookups == 3
+    assert Spellchecker.verdicts.hitRatio() == .5
+
+    # Adding a word invalidates the verdicts
+    d.addWord("dgo")
+    assert Spellchecker.verdicts.get(d.normalizedName, "dgo") is None
+    assert d.checkText("the dgo ") == []
+    d.removeWord("dgo")
+    assert len(d.checkText("the dgo ")) == 1
+
+
+def test_verdictCache_bounded():
+    cache = VerdictCache(limit=2)
+    cache.set("d", "a", True)
+    cache.set("d", "b", False)
+    assert cache.get("d", "a") is True
+    cache.set("d", "c", True)
+    assert cache.get("d", "b") is None
+    assert cache.get("d", "a") is True
+    cache.invalidate("d")
+    assert cache.get("d", "c") is None
+
+
+class FakeSpellChecker:
+    """Stands for pyspellchecker's SpellChecker, and counts the calls made
+    to it at the same time."""
+
+    def __init__(self):
+        import threading
+        self.calls = 0
+        self.maxCalls = 0
+        self._count = threading.Lock()
+
+    def unknown(self, words):
+        with self._count:
+            self.calls += 1
+            self.maxCalls = max(self.maxCalls, self.calls)
+        time.sleep(.001)
+        with self._count:
+            self.calls -= 1
+        return [w for w in words if w != "word"]
+
+
+def test_dictionaryLock():
+    import threading
+    d = PySpellcheckerDictionary.__new__(PySpellcheckerDictionary)
+    d._lock = threading.Lock()
+    d._dict = FakeSpellChecker()
+
+    def check():
+        for i in range(20):
+            d.isMisspelled("word")
+
+    threads = [threading.Thread(target=check) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert d._dict.maxCalls == 1
+
+
+class FakeLanguageTool:
+    """Reports every word written in capitals as a misspelling."""
+
+    class Match:
+        def __init__(self, m):
+            self.offset = m.start()
+            self.errorLength = len(m.group())
+            self.errorlength = self.errorLength
+            self.ruleIssueType = self.locqualityissuetype = "misspelling"
+            self.replacements = [m.group().lower()]
+            self.message = self.msg = ""
+
+    def __init__(self):
+        self.requests = []
+
+    def check(self, text):
+        self.requests.append(text)
+        return [self.Match(m) for m in re.finditer(r"\b[A-Z]{2,}\b", text)]
+
+
+def fakeLanguageToolDictionary():
+    import threading
+    d = LanguageToolDictionary.__new__(LanguageToolDictionary)
+    d._lock = threading.Lock()
+    d._lang = "en"
+    d._customDict = set()
+    d.tool = FakeLanguageTool()
+    d._cache = LanguageToolCache(limit=4)
+    return d
+
+
+def test_languageTool_cache():
+    d = fakeLanguageToolDictionary()
+
+    assert [(m.start, m.end) for m in d.checkText("some TXET here")] == [(5, 9)]
+    d.checkText("some TXET here")
+    assert len(d.tool.requests) == 1
+
+    # Edits of the same length are not stale
+    assert [(m.start, m.end) for m in d.checkText("TXET some here")] == [(0, 4)]
+    assert len(d.tool.requests) == 2
+
+    # Bounded
+    for text in ["a", "b", "c", "d"]:
+        d.checkText(text)
+    assert not "some TXET here" in d._cache
+
+
+def test_languageTool_checkTexts():
+    d = fakeLanguageToolDictionary()
+    d.checkText("cached OK")
+
+    results = d.checkTexts(["one TWO", "cached OK", "", "THREE four FIVE"])
+    assert len(d.tool.requests) == 2
+    assert [[(m.start, m.end) for m in r] for r in results] == [
+        [(4, 7)], [(7, 9)], [], [(0, 5), (11, 15)]]
+
+
+def test_capabilities():
+    from PyQt5.QtCore import QSettings
+
+    capabilities = SpellcheckerCapabilities()
+    changed = []
+    capabilities.changed.connect(lambda: changed.append(True))
+    QSettings().remove(capabilities.settingsKey)
+    assert capabilities.loadResults() == {}
+
+    results = capabilities.detect()
+    assert list(results) == [impl.getLibraryName() for impl in Spellchecker.implementations]
+
+    capabilities.setResults(results)
+    assert changed == [True]
+    capabilities.setResults(capabilities.detect())
+    assert changed == [True]
+
+    # Saved with a version stamp
+    assert SpellcheckerCapabilities().loadResults() == results
+    SpellcheckerCapabilities.VERSION += 1
+    try:
+        assert SpellcheckerCapabilities().loadResults() == {}
+    finally:
+        SpellcheckerCapabilities.VERSION -= 1
+
+    # Probed in the background
+    capabilities = SpellcheckerCapabilities()
+    capabilities.probe()
+    capabilities._thread.join(5)
+    qApp.processEvents()
+    assert capabilities._results == results
+
+    # When nothing is known, quick probes are done right away
+    QSettings().remove(capabilities.settingsKey)
+    capabilities = SpellcheckerCapabilities()
+    capabilities._thread = "not started"  # Not probed in the background
+    quick = capabilities.results()
+    assert list(quick) == list(results)
+    for impl in Spellchecker.implementations:
+        if impl.slowProbe:
+            assert quick[impl.getLibraryName()]["installed"] is False
+        else:
+            assert quick[impl.getLibraryName()] == results[impl.getLibraryName()]
+
+    # Saved once probed, even if nothing changed
+    capabilities.setResults(quick)
+    assert SpellcheckerCapabilities().loadResults() == quick
+
+
+def test_symspell_words(tmpdir):
+    class Sym:
+        def __init__(self):
+            self.words = {}
+        def create_dictionary_entry(self, word, count):
+            self.words[word] = count
+
+    path = str(tmpdir.join("test.words"))
+    SymSpellDictionary.saveWords(path, {"the": 100, "été": 3})
+    sym = Sym()
+    SymSpellDictionary.loadWords(sym, path)
+    assert sym.words == {"the": 100, "été": 3}
+
+
+class PickledSym:
+    """Stands for symspellpy's SymSpell."""
+
+    builds = 0
+
+    def __init__(self):
+        self.words = {}
+
+    def create_dictionary_entry(self, word, count):
+        PickledSym.builds += 1
+        self.words[word] = count
+
+    def save_pickle(self, path, compressed):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.words))
+
+    def load_pickle(self, path, compressed):
+        with open(path, encoding="utf-8") as f:
+            self.words = json.loads(f.read())
+        return True
+
+
+def test_symspell_pickle(tmpdir):
+    class Dictionary(SymSpellDictionary):
+        @classmethod
+        def getResourcesPath(cls):
+            return str(tmpdir)
+
+    d = Dictionary.__new__(Dictionary)
+    d._lang = "test"
+    SymSpellDictionary.saveWords(d.getWordsDictionaryPath(), {"the": 100, "été": 3})
+
+    # Built from the words, then saved
+    sym = PickledSym()
+    d._loadDictionary(sym)
+    assert PickledSym.builds == 2
+    assert os.path.exists(d.getCachedDictionaryPath())
+
+    # Loaded
+    sym = PickledSym()
+    d._loadDictionary(sym)
+    assert PickledSym.builds == 2
+    assert sym.words == {"the": 100, "été": 3}
+    assert not [f for f in os.listdir(str(tmpdir)) if f.endswith(".tmp")]
+
+    # Built again when the words are newer
+    os.utime(d.getCachedDictionaryPath(), (0, 0))
+    d._loadDictionary(PickledSym())
+    assert PickledSym.builds == 4
+
+
+class LoadingDictionary(WordListDictionary):
+    """Dictionary that is loaded when `ready` is set."""
+
+    def __init__(self, name, words):
+        WordListDictionary.__init__(self, name, words)
+        import threading
+        self.ready = threading.Event()
+
+    def isReady(self):
+        return self.ready.is_set()
+
+    def waitUntilReady(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def isMisspelled(self, word):
+        return self.isReady() and WordListDictionary.isMisspelled(self, word)
+
+
+def test_spellcheckService_loadingDictionary():
+    d = LoadingDictionary("loading", ["this", "is", "a", "text"])
+    service = SpellcheckService()
+    done = []
+    service.checked.connect(lambda dictionary, text: done.append(text))
+
+    # Not cached while loading
+    assert service.check(d, "a txet ") == []
+    assert service.cachedMatches(d, "a txet ") is None
+    assert d.isMisspelledCached("txet") is False
+
+    # Checked in the background once loaded
+    service.request(d, "a txet ")
+    time.sleep(.05)
+    qApp.processEvents()
+    assert done == []
+
+    d.ready.set()
+    deadline = time.time() + 5
+    while not done and time.time() < deadline:
+        qApp.processEvents()
+        time.sleep(.01)
+    assert len(service.cachedMatches(d, "a txet ")) == 1
+
+
+def test_projectSpellcheck():
+    d = WordListDictionary("project", ["the", "cat", "sat"])
+    d._customDict = {"felix"}
+    texts = [(1, "the cat sat"), (2, "the dgo sat"), (3, ""), (4, "Felix the dgo the tac")]
+
+    check = ProjectSpellcheck(d, texts, workers=2, processes=False)
+    check.chunkSize = 10
+    assert len(check.chunks()) == 3
+
+    progress = []
+    check.progress.connect(lambda done, total: progress.append((done, total)))
+    check.start()
+    deadline = time.time() + 5
+    while not check.isFinished() and time.time() < deadline:
+        qApp.processEvents()
+        time.sleep(.01)
+
+    assert progress[-1] == (3, 3)
+    assert dict(check.misspelled) == {
+        "dgo": [(2, 4, 7), (4, 10, 13)],
+        "tac": [(4, 18, 21)]}
+
+
+class JournalDictionary(WordListDictionary):
+    """Dictionary saving its custom words in a given folder."""
+
+    def __init__(self, name, words, path):
+        WordListDictionary.__init__(self, name, words)
+        self._path = path
+        BasicDictionary.__init__(self, name)
+
+    def getResourcesPath(self):
+        return self._path
+
+    def getCustomDictionaryPath(self):
+        return os.path.join(self._path, "{}.json.gz".format(self._lang))
+
+    _saveCustomDict = BasicDictionary._saveCustomDict
+    _appendToJournal = BasicDictionary._appendToJournal
+
+
+def test_customDictionaryJournal(tmpdir):
+    path = str(tmpdir)
+    d = JournalDictionary("journal", ["some", "words"], path)
+
+    d.addWords(["Manuskript", "pandoc", "manuskript"])
+    d.removeWord("pandoc")
+    d.addWord("markdown")
+    assert d.isCustomWord("Manuskript")
+
+    journal = d.getCustomDictionaryJournalPath()
+    with open(journal, encoding="utf-8") as f:
+        assert f.read().split() == ["+manuskript", "+pandoc", "-pandoc", "+markdown"]
+    assert not os.path.exists(d.getCustomDictionaryPath())
+
+    # Changes are replayed, but not compacted
+    d = JournalDictionary("journal", ["some", "words"], path)
+    assert d._customDict == {"manuskript", "markdown"}
+    assert d._journalLength == 4
+    assert os.path.getsize(journal) > 0
+
+    # Compaction
+    d.JOURNAL_LIMIT = 6
+    d.addWords(["one", "two"])
+    assert os.path.getsize(journal) == 0
+    assert d._journalLength == 0
+    assert not [f for f in os.listdir(path) if f.endswith(".tmp")]
+    with gzip.open(d.getCustomDictionaryPath(), "rt", encoding="utf-8") as f:
+        assert set(json.loads(f.read())) == {"manuskript", "markdown", "one", "two"}
+
+    # Loaded from both
+    d.addWord("three")
+    d = JournalDictionary("journal", ["some", "words"], path)
+    assert d._customDict == {"manuskript", "markdown", "one", "two", "three"}
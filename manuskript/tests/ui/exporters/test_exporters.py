@@ -25,3 +25,523 @@ def test_loadExportWiget(MWSampleProject):
     E.close()
 
 #FIXME: test significant stuff
+
+def test_plainTextChunks(MWSampleProject, tmpdir):
+    """
+    Tests that the plain text output is compiled, exported and previewed in
+    chunks.
+    """
+    import time
+    import pytest
+    from PyQt5.QtWidgets import qApp
+    from manuskript.exporter.manuskript.plainText import plainText
+
+    MW = MWSampleProject
+    fmt = plainText()
+    w = fmt.settingsWidget()
+
+    chunks = list(fmt.outputChunks(w))
+    assert len(chunks) > 1
+    content = fmt.output(w)
+    assert "".join(chunks) == content
+
+    # Export
+    filename = str(tmpdir.join("export.txt"))
+    assert fmt.writeChunks(filename, iter(chunks))
+    with open(filename, encoding="utf8") as f:
+        assert f.read() == content
+    assert not fmt.writeChunks(str(tmpdir.join("empty.txt")), iter(["", ""]))
+    assert tmpdir.listdir() == [tmpdir.join("export.txt")]
+
+    def failing():
+        yield "Start"
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        fmt.writeChunks(filename, failing())
+    assert tmpdir.listdir() == [tmpdir.join("export.txt")]
+    with open(filename, encoding="utf8") as f:
+        assert f.read() == content
+
+    # Preview
+    view = fmt.previewWidget()
+    fmt.previewSlice = 0
+    fmt.appendChunks(view, iter(chunks))
+    assert fmt.isPreviewing()
+    deadline = time.time() + 10
+    while fmt.isPreviewing() and time.time() < deadline:
+        qApp.processEvents()
+    assert view.toPlainText() == content
+
+
+def test_pandocCommunicate():
+    """
+    Tests that chunks are streamed to a process without blocking on its
+    output.
+    """
+    import subprocess
+    import sys
+    from manuskript.exporter.pandoc import pandocExporter
+
+    p = subprocess.Popen(
+        [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE)
+    chunks = ("chunk {}\n".format(i) * 1000 for i in range(200))
+    stdout, stderr = pandocExporter.communicate(p, chunks)
+    assert p.returncode == 0
+    assert stderr == b""
+    assert stdout.decode("utf-8").count("CHUNK 199\n") == 1000
+
+
+def test_plainTextTransforms():
+    """
+    Tests that the transformations are compiled once, and do not change the
+    settings.
+    """
+    from manuskript.exporter.manuskript.plainText import plainText
+
+    fmt = plainText()
+    settings = {"Transform": {
+        "Dash": True,
+        "Ellipse": True,
+        "Spaces": True,
+        "DoubleQuotes": "«___»",
+        "SingleQuote": "‘___’",
+        "Custom": [
+            [True, "cat", "dog", False],
+            [False, "dog", "cow", False],
+            [True, r"(\d+)", r"<\1>", True],
+        ],
+    }}
+
+    text = "A   cat --- 'said' \"hi\"... 42  times."
+    expected = "A dog — ‘said’ «hi»… <42> times.\n"
+    assert fmt.processText(text, settings) == expected
+    transforms = fmt.transforms(settings)
+    assert fmt.processText(text, settings) == expected
+    assert fmt.transforms(settings) is transforms
+    assert len(settings["Transform"]["Custom"]) == 3
+
+    # Compiled again when settings change
+    settings["Transform"]["Spaces"] = False
+    assert fmt.processText("a  b", settings) == "a  b\n"
+
+
+def test_compileCache(MWSampleProject):
+    """
+    Tests that items are processed again only when they or the settings
+    change.
+    """
+    from manuskript.enums import Outline
+    from manuskript.exporter.manuskript.markdown import markdown
+    from manuskript.exporter.manuskript.plainText import plainText
+
+    MW = MWSampleProject
+    root = MW.mdlOutline.rootItem
+    fmt = markdown()
+    settings = fmt.settingsWidget().getSettings()
+
+    processed = []
+    processText = fmt.processText
+    fmt.processText = lambda text, settings: processed.append(text) or processText(text, settings)
+
+    plainText.clearCompileCache()
+    content = fmt.concatenate(root, settings)
+    count = len(processed)
+    assert count > 1
+    assert plainText.compileCacheSize == sum(
+        len(c) for chunks in plainText.compileCache.values() for c in chunks)
+
+    # Cached
+    assert fmt.concatenate(root, settings) == content
+    assert len(processed) == count
+
+    # Not shared with formats processing titles differently
+    assert plainText().concatenate(root, settings) != content
+
+    # One item changed
+    def texts(item):
+        for c in item.children():
+            if c.isText() and c.text():
+                yield c
+            yield from texts(c)
+
+    item = next(texts(root))
+    item.setData(Outline.text, "New text")
+    assert "New text" in fmt.concatenate(root, settings)
+    assert processed[count:] == ["New text"]
+
+    # Settings changed
+    settings["Transform"]["Dash"] = not settings["Transform"]["Dash"]
+    fmt.concatenate(root, settings)
+    assert len(processed) == 2 * count + 1
+
+    # Bounded
+    fmt.compileCacheLimit = 100
+    fmt.concatenate(root, {**settings, "Transform": {**settings["Transform"], "Spaces": not settings["Transform"]["Spaces"]}})
+    assert 0 < plainText.compileCacheSize <= 100
+
+
+def test_compileSnapshot(MWSampleProject):
+    """
+    Tests that editing the outline while the output is compiled doesn't
+    change it.
+    """
+    from manuskript.enums import Outline
+    from manuskript.exporter.manuskript.markdown import markdown
+    from manuskript.exporter.manuskript.plainText import plainText
+
+    MW = MWSampleProject
+    root = MW.mdlOutline.rootItem
+    fmt = markdown()
+    settings = fmt.settingsWidget().getSettings()
+
+    plainText.clearCompileCache()
+    content = fmt.concatenate(root, settings)
+
+    plainText.clearCompileCache()
+    chunks = fmt.compileChunks(root, settings)
+    output = next(chunks)
+
+    last = root.child(root.childCount() - 1)
+    last.setData(Outline.text, "New text")
+    last.setData(Outline.title, "New title")
+    removed = root.removeChild(0)
+    root.appendChild(removed)
+
+    output += "".join(chunks)
+    assert output == content
+
+
+def test_HTMLConversionCache(MWSampleProject, monkeypatch):
+    """
+    Tests that the HTML conversion is kept by the settings widget of the
+    export dialog, and only while the markdown doesn't change.
+    """
+    import sys
+    from types import SimpleNamespace
+    from manuskript.exporter.manuskript.HTML import HTML
+
+    converted = []
+    # The module, hidden by the class of the same name in the package
+    monkeypatch.setattr(sys.modules[HTML.__module__], "MD", SimpleNamespace(
+        markdown=lambda md: converted.append(md) or "<p>{}</p>".format(md)))
+
+    fmt = HTML()
+    w = fmt.settingsWidget()
+    html = fmt.output(w)
+    assert fmt.output(w) == html
+    assert len(converted) == 1
+    assert not hasattr(fmt, "_converted")
+
+    # Other dialog
+    assert fmt.output(fmt.settingsWidget()) == html
+    assert len(converted) == 2
+
+    # Other markdown
+    assert fmt.convert("*a*", w) == "<p>*a*</p>"
+    assert w.converted == ("*a*", "<p>*a*</p>")
+    assert len(converted) == 3
+
+
+def test_parallelCompile(MWSampleProject):
+    """
+    Tests that texts processed in worker processes are assembled in outline
+    order.
+    """
+    from manuskript.exporter.manuskript.markdown import markdown
+    from manuskript.exporter.manuskript.plainText import plainText
+
+    MW = MWSampleProject
+    root = MW.mdlOutline.rootItem
+    fmt = markdown()
+    settings = fmt.settingsWidget().getSettings()
+    settings["Transform"]["Custom"] = [[True, r"(\w+)ing\b", r"\1ING", True]]
+
+    def jobs():
+        return fmt.parallelJobs(fmt.compileList(root, settings), settings, fmt.settingsKey(settings))
+
+    settings["Performance"]["Workers"] = 1
+    plainText.clearCompileCache()
+    assert jobs() == []
+    content = fmt.concatenate(root, settings)
+
+    key = fmt.settingsKey(settings)
+    transforms = fmt.transforms(settings)
+    settings["Performance"]["Workers"] = 2
+    # Doesn't change the output, so neither the cache nor the transformations
+    assert fmt.settingsKey(settings) == key
+    assert fmt.transforms(settings) is transforms
+    fmt.parallelThreshold = 0
+    fmt.parallelBatchSize = 1000
+    plainText.clearCompileCache()
+    j = jobs()
+    assert len(j) > 1
+    results = [r for r in fmt.processTextsInParallel(j, settings) if r is not None]
+    assert [k for k, text in results] == [k for k, text in j]
+
+    # Processed texts are used, and the caller can go on while they are
+    processed = []
+    processText = fmt.processText
+    fmt.processText = lambda text, settings: processed.append(text) or processText(text, settings)
+    plainText.clearCompileCache()
+    chunks = list(fmt.compileChunks(root, settings))
+    assert "".join(chunks) == content
+    assert "" in chunks
+    assert processed == []
+
+    # Cached texts are not processed again
+    assert jobs() == []
+
+
+def waitFor(jobs, timeout=10):
+    import time
+    from PyQt5.QtWidgets import qApp
+
+    deadline = time.time() + timeout
+    while any(job.isRunning() for job in jobs) and time.time() < deadline:
+        qApp.processEvents()
+        time.sleep(.01)
+
+
+def test_pandocProcess():
+    """
+    Tests that a conversion runs in the background, and can be cancelled
+    or time out.
+    """
+    import re
+    import sys
+    from manuskript.exporter.pandoc.process import pandocProcess
+
+    def job(script, src="", timeout=10000):
+        j = pandocProcess(sys.executable, ["-c", script], src, name="Test")
+        j.timeout = timeout
+        j.outputs = []
+        j.lines = []
+        j.finished.connect(j.outputs.append)
+        j.progress.connect(j.lines.append)
+        j.start()
+        return j
+
+    convert = "import sys; t = sys.stdin.read(); sys.stderr.write('Read\\nDone\\n'); sys.stdout.write(t.upper())"
+    chunks = ("chunk {}\n".format(i) * 1000 for i in range(200))
+    converted = job(convert, chunks)
+    # Several at once
+    other = job(convert, "text")
+    failed = job("import sys; sys.exit(3)")
+    sleeping = [job("import time; time.sleep(30)", timeout=t) for t in [10000, 100]]
+    sleeping[0].cancel()
+
+    def broken():
+        yield "text"
+        re.compile("(")
+    error = job("import sys; sys.stdin.read()", broken())
+
+    waitFor([converted, other, failed, error] + sleeping)
+
+    assert converted.outputs[0].count("CHUNK 199\n") == 1000
+    assert converted.lines == ["Read", "Done"]
+    assert other.outputs == ["TEXT"]
+    assert failed.outputs == [None] and failed.returnCode() == 3
+    assert sleeping[0].outputs == [None] and sleeping[0].cancelled and not sleeping[0].error
+    assert sleeping[1].outputs == [None] and sleeping[1].error.startswith("Timed out")
+    assert error.outputs == [None] and "regular expression" in error.error
+    assert pandocProcess.running == set()
+
+
+def test_pandocWarnings():
+    """
+    Tests that the warnings of a successful conversion are reported, but
+    not its progress.
+    """
+    import sys
+    from manuskript.exporter.pandoc import pandocExporter
+    from manuskript.exporter.pandoc.process import pandocProcess
+
+    script = "import sys; sys.stderr.write('[INFO] Running\\n[WARNING] Missing image\\n{}')"
+    reports = []
+    exporter = pandocExporter()
+    exporter.reportErrors = lambda returncode, args, stderr: reports.append((returncode, stderr))
+
+    for end in ["", "[INFO] Done\\n"]:
+        job = pandocProcess(sys.executable, ["-c", script.format(end)], "", name="Test")
+        job.start()
+        waitFor([job])
+        exporter.processFinished(job)
+    assert reports == [(0, "[WARNING] Missing image\n")] * 2
+
+    job = pandocProcess(sys.executable, ["-c", "import sys; sys.stderr.write('[INFO] Running\\n')"], "")
+    job.start()
+    waitFor([job])
+    exporter.processFinished(job)
+    assert len(reports) == 2
+
+
+def test_pandocHTMLPreview(MWSampleProject):
+    """
+    Tests that the HTML preview shows the source it streams to pandoc,
+    without compiling it again.
+    """
+    import sys
+    from PyQt5.QtCore import QSettings
+    from PyQt5.QtWidgets import qApp
+    from manuskript.exporter.manuskript.markdown import markdown
+    from manuskript.exporter.pandoc import pandocExporter
+    from manuskript.exporter.pandoc.HTML import HTML
+
+    class echoExporter(pandocExporter):
+        "Runs python, echoing its input, instead of pandoc."
+        name = "PreviewTest"
+        cmd = sys.executable
+
+        def detect(self):
+            return {"valid": 2, "command": self.cmd}
+
+    E = echoExporter()
+    E.capabilities.results()
+    E.capabilities._thread.join()
+    qApp.processEvents()
+    assert E.isValid() == 2
+
+    fmt = HTML(E)
+    fmt.pandocArgs = lambda w: ["-c", "import sys; sys.stdout.write(sys.stdin.read())"]
+    compiled = []
+    srcChunks = fmt.srcChunks
+    fmt.srcChunks = lambda w: compiled.append(True) or srcChunks(w)
+    fmt.src = None
+
+    w = fmt.settingsWidget()
+    preview = fmt.previewWidget()
+    job = fmt.preview(w, preview)
+    waitFor([job])
+    src = "".join(markdown.outputChunks(fmt, w))
+    assert src
+    assert preview.widget(0).toPlainText() == src
+    assert preview.widget(1).toPlainText() == src
+    assert compiled == [True]
+
+    QSettings().remove("Exporters/PreviewTest_capabilities")
+
+
+def test_exporterJobs(MWSampleProject):
+    """
+    Tests that the export dialog shows jobs until they are finished.
+    """
+    import sys
+    from manuskript.exporter.pandoc.process import pandocProcess
+    from manuskript.ui.exporters.exporter import jobWidget
+
+    MW = MWSampleProject
+    MW.doCompile()
+    E = MW.dialog
+
+    job = pandocProcess(sys.executable, ["-c", "import time; time.sleep(30)"], "", name="Test")
+    job.start()
+    E.addJob(job)
+    widgets = E.jobs.findChildren(jobWidget)
+    assert len(widgets) == 1 and widgets[0].job is job
+
+    widgets[0].btnCancel.click()
+    waitFor([job])
+    assert job.cancelled
+    assert widgets[0].isHidden()
+    E.close()
+
+
+def test_exporterCapabilities():
+    """
+    Tests that the capabilities of exporters are probed once, saved, and
+    probed again when the custom path changes.
+    """
+    from PyQt5.QtCore import QSettings
+    from PyQt5.QtWidgets import qApp
+    from manuskript.exporter.basic import basicExporter, exporterCapabilities
+
+    class testExporter(basicExporter):
+        name = "CapabilitiesTest"
+        cmd = "no-such-command-for-manuskript"
+        detected = 0
+
+        def detect(self):
+            testExporter.detected += 1
+            r = basicExporter.detect(self)
+            r["version"] = "test {}".format(self.customPath)
+            return r
+
+    QSettings().remove("Exporters/CapabilitiesTest_customPath")
+    QSettings().remove("Exporters/CapabilitiesTest_capabilities")
+    E = testExporter()
+    assert E.capabilities is testExporter().capabilities
+
+    # Unknown until probed, without waiting for it
+    changed = []
+    E.capabilities.changed.connect(lambda: changed.append(True))
+    assert not E.capabilities.isKnown()
+    assert E.isValid() == 0
+    assert E.version() == ""
+    E.capabilities._thread.join()
+    qApp.processEvents()
+    assert changed == [True]
+    assert E.capabilities.isKnown()
+    assert E.version() == "test "
+    assert testExporter.detected == 1
+
+    # Saved
+    caps = exporterCapabilities(E)
+    assert caps.loadResults() == {"valid": 0, "command": None, "version": "test "}
+    exporterCapabilities.VERSION += 1
+    try:
+        assert caps.loadResults() == {}
+    finally:
+        exporterCapabilities.VERSION -= 1
+
+    # Probed again when the custom path changes
+    changed.clear()
+    E.setCustomPath(qApp.applicationFilePath())
+    assert not E.capabilities.isKnown()
+    E.capabilities._thread.join()
+    qApp.processEvents()
+    assert E.isValid() == 1
+    assert E.version() == "test " + qApp.applicationFilePath()
+    assert testExporter.detected == 2
+    assert changed == [True]
+    E.setCustomPath(qApp.applicationFilePath())
+    assert testExporter.detected == 2
+
+    QSettings().remove("Exporters/CapabilitiesTest_customPath")
+    QSettings().remove("Exporters/CapabilitiesTest_capabilities")
+
+
+def test_pandocDetect():
+    """
+    Tests that a failing step of the pandoc probe keeps what was found.
+    """
+    import subprocess
+    from manuskript.exporter.pandoc import pandocExporter
+
+    class testPandoc(pandocExporter):
+        def path(self):
+            return "/usr/bin/pandoc"
+
+    outputs = {"--version": "pandoc 2.5\nMore", "--list-output-formats": "html\nlatex"}
+
+    def runCommand(command, args, timeout=None):
+        out = outputs[args[0]]
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    E = testPandoc()
+    E.runCommand = runCommand
+    r = E.detect()
+    assert (r["valid"], r["version"], r["outputFormats"]) == (2, "pandoc 2.5", ["html", "latex"])
+
+    outputs["--list-output-formats"] = subprocess.TimeoutExpired("pandoc", 30)
+    r = E.detect()
+    assert (r["valid"], r["version"], r["outputFormats"]) == (2, "pandoc 2.5", [])
+
+    outputs["--version"] = OSError("Exec format error")
+    outputs["--list-output-formats"] = subprocess.CalledProcessError(2, "pandoc")
+    r = E.detect()
+    assert (r["valid"], r["version"], r["outputFormats"]) == (2, "", [])
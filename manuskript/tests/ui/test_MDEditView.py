@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the markdown editor."""
+
+
+def test_linkSpans(MW):
+    from PyQt5.QtGui import QTextCursor
+    from manuskript.ui.views.MDEditView import MDEditView
+    from manuskript.ui.views.MDEditCompleter import MDEditCompleter
+    from manuskript.models import references as Ref
+
+    def allSpans(editor):
+        "Parses all the blocks again."
+        spans = []
+        block = editor.document().firstBlock()
+        while block.isValid():
+            spans.append(editor.blockSpans(block.text()))
+            block = block.next()
+        return spans
+
+    def positions(spans):
+        return [[(s[0], s[1]) for s in block] for block in spans]
+
+    editor = MDEditView()
+    editor.setPlainText("Some [link](http://a) here.\n\nNothing.\n\n<http://b> and ![i](c.png)")
+    assert positions(editor._linkSpans) == [[(5, 21)], [], [], [], [(15, 26), (0, 10), (16, 26)]]
+
+    # Edits only update the changed blocks
+    cursor = QTextCursor(editor.document())
+    cursor.setPosition(0)
+    cursor.insertText("[new](link)\nline\n")
+    cursor.movePosition(QTextCursor.End)
+    cursor.insertText(" [end](x)")
+    cursor.setPosition(5)
+    cursor.setPosition(30, QTextCursor.KeepAnchor)
+    cursor.removeSelectedText()
+    assert positions(editor._linkSpans) == positions(allSpans(editor))
+
+    editor.setPlainText("")
+    assert editor._linkSpans == [[]]
+
+    # Rects are computed for the block under the mouse
+    editor.setPlainText("Some text.\n\nA [link](http://a) here.")
+    editor.resize(400, 300)
+    editor.show()
+    cursor.setPosition(editor.document().findBlockByNumber(2).position() + 5)
+    things = editor.clickThingsAt(editor.cursorRect(cursor).center())
+    assert [(t.regex, t.texts[2]) for t in things] == [(editor.inlineLinkRegex, "http://a")]
+    assert editor.clickThingsAt(editor.cursorRect(QTextCursor(editor.document())).center()) == []
+    editor.hide()
+
+    # References
+    editor = MDEditCompleter()
+    editor.setPlainText("See {C:1:Someone} and [a](b).")
+    spans = editor._linkSpans[0]
+    assert [(s[0], s[1]) for s in spans] == [(22, 28), (4, 17)]
+    assert spans[1][2] is Ref.RegEx
+
+
+def test_imageTooltip(MW, tmpdir, monkeypatch):
+    import os
+    import time
+    from PyQt5.QtCore import QPoint, Qt
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import qApp
+    from manuskript import functions as F
+    from manuskript.ui.views.MDEditView import ImageTooltip
+
+    path = os.path.join(str(tmpdir), "image.png")
+    image = QImage(2000, 1000, QImage.Format_RGB32)
+    image.fill(Qt.red)
+    assert image.save(path)
+
+    # Thumbnails are scaled down, and saved on disk
+    folder = str(tmpdir.mkdir("thumbnails"))
+    thumbnail, error = ImageTooltip.loadThumbnail(path, folder)
+    assert (thumbnail.width(), thumbnail.height(), error) == (800, 400, "")
+    assert os.listdir(folder) == [os.path.basename(ImageTooltip.thumbnailPath(path, folder))]
+    thumbnail, error = ImageTooltip.loadThumbnail(path, folder)
+    assert thumbnail.width() == 800
+
+    missing, error = ImageTooltip.loadThumbnail(path + ".missing", folder)
+    assert missing is None and error
+
+    # Shown in a tooltip once decoded in the background
+    class Editor:
+        tooltips = []
+
+        def doTooltip(self, pos, message):
+            self.tooltips.append(message)
+
+    monkeypatch.setattr(F, "writablePath", lambda suffix=None: folder)
+    monkeypatch.setattr(ImageTooltip, "cache", type(ImageTooltip.cache)())
+    monkeypatch.setattr(ImageTooltip, "cacheSize", 0)
+    editor = Editor()
+    ImageTooltip.fromUrl(path, QPoint(), editor)
+    start = time.time()
+    while path in ImageTooltip.processing and time.time() - start < 10:
+        qApp.processEvents()
+    assert path not in ImageTooltip.processing
+    assert ImageTooltip.cache[path][0] is True
+    assert editor.tooltips[-1].startswith("<p><img src='data:image/png;base64,")
+
+    # Bounded by the size of the pixels
+    monkeypatch.setattr(ImageTooltip, "cacheLimit", 800 * 400 * 4 * 2)
+    for i in range(3):
+        ImageTooltip.cacheEntry(str(i), True, thumbnail)
+    assert list(ImageTooltip.cache) == ["1", "2"]
+    assert ImageTooltip.cacheSize == 800 * 400 * 4 * 2
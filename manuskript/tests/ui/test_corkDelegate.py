@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the cork delegate."""
+
+
+def test_cardKey(MWSampleProject):
+    """
+    Tests that the cached card of an item is drawn again when a parent
+    stops being compiled.
+    """
+    from PyQt5.QtGui import QPixmap, QPainter
+    from PyQt5.QtWidgets import QStyleOptionViewItem
+    from manuskript.enums import Outline
+    from manuskript.ui.views.corkDelegate import corkDelegate
+
+    MW = MWSampleProject
+    model = MW.mdlOutline
+    folder = next(c for c in model.rootItem.children() if c.isFolder() and c.childCount())
+    index = model.indexFromItem(folder.child(0))
+
+    delegate = corkDelegate()
+    delegate.watchModel(model)
+    pixmap = QPixmap(10, 10)
+    p = QPainter(pixmap)
+    option = QStyleOptionViewItem()
+
+    key = delegate.cardKey(p, option, index)
+    assert delegate.cardKey(p, option, index) == key
+    folder.setData(Outline.compile, 0)
+    assert delegate.cardKey(p, option, index) != key
+    p.end()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the markdown highlighter."""
+
+
+def test_tokenCache(MW):
+    from manuskript.ui.views.MDEditView import MDEditView
+    from manuskript.ui.highlighters import MarkdownHighlighter
+
+    # Without an index, the editor starts with a basic highlighter
+    editor = MDEditView()
+    editor.highlighter.setDocument(None)
+    highlighter = editor.highlighter = MarkdownHighlighter(editor)
+
+    tokenized = []
+    tokenize = highlighter.tokenizer.tokenize
+
+    def countingTokenize(text, *args):
+        tokenized.append(text)
+        return tokenize(text, *args)
+
+    highlighter.tokenizer.tokenize = countingTokenize
+    MarkdownHighlighter.tokenCache.clear()
+
+    editor.setPlainText("# Title\n\nSome *text* unique to the token cache test.")
+    assert "Some *text* unique to the token cache test." in tokenized
+
+    # Once the states of the blocks are known, highlighting again only
+    # applies the cached tokens
+    highlighter.rehighlight()
+    del tokenized[:]
+    highlighter.rehighlight()
+    assert tokenized == []
+
+    # Bounded
+    limit = MarkdownHighlighter.tokenCacheLimit
+    MarkdownHighlighter.tokenCacheLimit = 2
+    try:
+        editor.setPlainText("a\nb\nc")
+        assert len(MarkdownHighlighter.tokenCache) <= 2
+    finally:
+        MarkdownHighlighter.tokenCacheLimit = limit
+
+
+def test_progressiveHighlighting(MW):
+    from PyQt5.QtWidgets import qApp
+    from manuskript.ui.views.MDEditView import MDEditView
+    from manuskript.ui.highlighters import MarkdownHighlighter
+
+    def blockStates(editor):
+        states = []
+        block = editor.document().firstBlock()
+        while block.isValid():
+            states.append(block.userState())
+            block = block.next()
+        return states
+
+    def highlighter(editor):
+        editor.highlighter.setDocument(None)
+        editor.highlighter = MarkdownHighlighter(editor)
+        return editor.highlighter
+
+    paragraphs = ["Paragraph {} with *some* text.".format(i) for i in range(300)]
+    paragraphs[150:150] = ["```", "# Not a title", "```", "# Title {}"]
+    text = "\n\n".join(paragraphs)
+
+    # Highlighted at once
+    editor = MDEditView()
+    highlighter(editor)
+    editor.setPlainText(text)
+    expected = blockStates(editor)
+
+    threshold = MarkdownHighlighter.progressiveThreshold
+    MarkdownHighlighter.progressiveThreshold = 1000
+    try:
+        editor = MDEditView()
+        h = highlighter(editor)
+        h.setVisibleBlocks(0, 10)
+        editor.setPlainText(text)
+
+        # Only the visible blocks are highlighted so far
+        states = blockStates(editor)
+        assert states[:11] == expected[:11]
+        assert states[400] == -1
+        assert h.isHighlightingProgressively()
+
+        # Blocks becoming visible are highlighted
+        h.setVisibleBlocks(500, 510)
+        assert blockStates(editor)[505] != -1
+
+        while h.isHighlightingProgressively():
+            qApp.processEvents()
+        assert blockStates(editor) == expected
+    finally:
+        MarkdownHighlighter.progressiveThreshold = threshold
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the markdown tokenizer."""
+
+import random
+
+import pytest
+
+from manuskript.ui.highlighters import MarkdownTokenizer
+from manuskript.ui.highlighters import MarkdownState as MS
+from manuskript.ui.highlighters import MarkdownTokenType as MTT
+
+
+def tokenize(text, previousState=MS.MarkdownStateUnknown, nextState=MS.MarkdownStateUnknown,
+             scanner=True):
+    tokenizer = MarkdownTokenizer()
+    tokenizer.useInlineScanner = scanner
+    tokenizer.clear()
+    tokenizer.tokenize(text, MS.MarkdownStateUnknown, previousState, nextState)
+    return [(t.type, t.position, t.length, t.openingMarkupLength, t.closingMarkupLength)
+            for t in tokenizer.getTokens()]
+
+
+def test_dummyOut():
+    tokenizer = MarkdownTokenizer()
+    assert tokenizer.dummyOut("abcdef", 1, 3) == "a$$def"
+    assert tokenizer.dummyOut("abcdef", 3, 3) == "abcdef"
+    assert tokenizer.dummyOutSpans("abcdef", [(0, 1), (2, 4), (3, 5)]) == "$b$$$f"
+    assert tokenizer.dummyOutSpans("abcdef", []) == "abcdef"
+
+
+def test_inlineTokens():
+    assert tokenize("**a** and *b*") == [
+        (MTT.TokenStrong, 0, 5, 2, 2),
+        (MTT.TokenEmphasis, 10, 3, 1, 1),
+    ]
+
+    # Matched text is not picked up again
+    assert tokenize("`*a*` [*b*](c)") == [
+        (MTT.TokenVerbatim, 0, 5, 1, 1),
+        (MTT.TokenInlineLink, 6, 8, 0, 0),
+    ]
+
+    # Masked mentions are still preceded by a non word character
+    assert [t[1:3] for t in tokenize("@a@b") if t[0] == MTT.TokenMention] == [(0, 2), (2, 2)]
+
+    # Table pipes
+    assert [t[1] for t in tokenize("| *a* | b |", MS.MarkdownStatePipeTableRow)
+            if t[0] == MTT.TokenTablePipe] == [0, 6, 10]
+
+
+def test_longParagraph():
+    sentence = "She said *hello* to **him**. "
+    tokens = tokenize(sentence * 2000)
+    assert len(tokens) == 4000
+    assert tokens[-1] == (MTT.TokenStrong, len(sentence) * 1999 + 20, 7, 2, 2)
+
+
+# Pieces of markdown from which texts are built to compare the inline scanner
+# with the cascade of QRegExp searches.
+PIECES = list("*_~^[]()!<>&#;@{}+-=:/\\` ab1é") + [
+    "**", "__", "~~", "{++", "++}", "{--", "--}", "{~~", "~>", "{>>", "<<}",
+    "{==", "==}", "<!--", "-->", "&amp;", "&#12;", "http:", "a@b", "  "]
+
+SAMPLES = [
+    "**bold** and *em* _x_ __y__ ~~del~~ ^sup^ ~sub~ `code` ``a`b`` [link](http://x)",
+    "![img](a.png) [ref] <http://auto> <a@b.c> &amp; &#123; <b>tag</b> @mention-x/y",
+    "{++add++} {--del--} {~~a~>b~~} {>>c<<} {==h==} <!-- c --> <!-- open",
+    "\\*not\\* *yes* ^a\\ b^ ~a\\ b~ **a*** ***a***",
+    "[def]: http://x *a*",
+    "| a | b *c* |",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+@pytest.mark.parametrize("previousState", [MS.MarkdownStateUnknown, MS.MarkdownStatePipeTableRow])
+def test_inlineScanner(text, previousState):
+    assert tokenize(text, previousState, scanner=True) == \
+        tokenize(text, previousState, scanner=False)
+
+
+def test_inlineScannerRandom():
+    rand = random.Random(0)
+    for i in range(2000):
+        text = "".join(rand.choice(PIECES) for j in range(rand.randint(1, 40)))
+        assert tokenize(text, scanner=True) == tokenize(text, scanner=False), text
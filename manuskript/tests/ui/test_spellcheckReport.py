@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the spellcheck report."""
+
+import re
+import time
+
+
+def test_spellcheckReport(MWSampleProject, monkeypatch):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import qApp
+    from manuskript.enums import Outline
+    from manuskript.functions import Spellchecker
+    from manuskript.tests.test_spellchecker import WordListDictionary
+    from manuskript.ui.tools.spellcheckReport import spellcheckReport
+
+    MW = MWSampleProject
+
+    class theDictionary(WordListDictionary):
+        "Only knows that 'the' is misspelled."
+        supportsProcesses = False
+
+        def isMisspelled(self, word):
+            return word.lower() == "the"
+
+    dictionary = theDictionary("the", [])
+    monkeypatch.setattr(Spellchecker, "getDictionary", lambda name: dictionary)
+
+    def check(report):
+        report.btnCheck.click()
+        deadline = time.time() + 5
+        while not report.spellcheck.isFinished() and time.time() < deadline:
+            qApp.processEvents()
+            time.sleep(.01)
+        qApp.processEvents()
+        words = {}
+        for i in range(report.tree.topLevelItemCount()):
+            item = report.tree.topLevelItem(i)
+            assert int(item.text(1)) == item.childCount()
+            words[item.text(0)] = item
+        return words
+
+    def count(report, word):
+        return sum(len(re.findall(r"\b{}\b".format(word), text))
+                   for key, text in report.texts())
+
+    report = spellcheckReport(MW)
+    assert not report.progressBar.isVisible()
+
+    words = check(report)
+    assert sorted(words) == ["The", "the"]
+    assert report.lblStatus.text() == "2 misspelled words."
+    assert report.btnCheck.isEnabled()
+    # Most frequent first
+    assert report.tree.topLevelItem(0).text(0) == "the"
+    assert words["the"].childCount() == count(report, "the")
+    assert words["The"].childCount() == count(report, "The")
+    textOnly = words["the"].childCount()
+
+    # Other columns
+    report.chkNotes.setChecked(True)
+    report.chkSummaries.setChecked(True)
+    assert report.columns() == [Outline.text, Outline.notes,
+                                Outline.summarySentence, Outline.summaryFull]
+    words = check(report)
+    assert words["the"].childCount() == count(report, "the") > textOnly
+
+    # Clicking an occurrence opens it in the editor
+    occurrence = words["the"].child(0)
+    ID, column, start, end = occurrence.data(0, Qt.UserRole)
+    report.tree.itemClicked.emit(occurrence, 0)
+    editor = MW.mainEditor.currentEditor()
+    assert editor.currentIndex.internalPointer().ID() == ID
+
+    report.close()
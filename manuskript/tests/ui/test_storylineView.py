@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""Tests for the storyline view."""
+
+
+def test_lazyToolTip(MWSampleProject):
+    """
+    Tests that the tooltips of tracked items follow their changes.
+    """
+    from manuskript.models import references
+    from manuskript.ui.views.storylineView import TrackedRect, PlotLine
+
+    MW = MWSampleProject
+    character = MW.mdlCharacter.getCharactersByImportance()[0][0]
+    ref = references.characterReference(character.ID())
+
+    r = TrackedRect(ref)
+    line = PlotLine(0, 0, 0, 0)
+    line.setToolTipRef(ref)
+    assert r.toolTip() == ""
+
+    for item in [r, line]:
+        item.loadToolTip()
+        assert character.name() in item.toolTip()
+
+    character.setName("Someone else")
+    for item in [r, line]:
+        item.loadToolTip()
+        assert "Someone else" in item.toolTip()
+
+
+def test_renderVisible(MWSampleProject):
+    """
+    Tests that folders and texts are only drawn around the part of the
+    storyline that is shown.
+    """
+    from PyQt5.QtWidgets import qApp
+    from manuskript.ui.views.storylineView import storylineView
+
+    MW = MWSampleProject
+    view = storylineView()
+    view.setModels(MW.mdlOutline, MW.mdlCharacter, MW.mdlPlots)
+    view.sldTxtSize.setValue(view.sldTxtSize.maximum())
+    view.resize(400, 300)
+    view.show()
+    qApp.processEvents()
+
+    view.refresh()
+    layout = view._layout
+    assert 1 < len(view._outlineRects) < len(layout["rects"])
+    assert view.scene.sceneRect().width() == layout["size"][0]
+
+    # Scrolled to the end
+    last = list(layout["rects"])[-1]
+    assert last not in view._outlineRects
+    bar = view.view.horizontalScrollBar()
+    bar.setValue(bar.maximum())
+    assert last in view._outlineRects
+    assert list(layout["rects"])[1] not in view._outlineRects
+
+    # Nothing changed
+    rects = dict(view._outlineRects)
+    view.refresh()
+    assert view._outlineRects == rects
+    view.close()
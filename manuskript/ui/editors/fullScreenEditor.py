@@ -55,15 +55,9 @@ class fullScreenEditor(QWidget):
         # self.topPanel.layout().addStretch(1)
 
         # Spell checking
+        self.btnSpellCheck = None
         if Spellchecker.isInstalled():
-            self.btnSpellCheck = QPushButton(self)
-            self.btnSpellCheck.setFlat(True)
-            self.btnSpellCheck.setIcon(QIcon.fromTheme("tools-check-spelling"))
-            self.btnSpellCheck.setCheckable(True)
-            self.btnSpellCheck.setChecked(self.editor.spellcheck)
-            self.btnSpellCheck.toggled.connect(self.editor.toggleSpellcheck)
-        else:
-            self.btnSpellCheck = None
+            self.createSpellcheckButton()
 
         # Navigation Buttons
         self.btnPrevious = QPushButton(self)
@@ -91,6 +85,8 @@ class fullScreenEditor(QWidget):
         # Top panel Layout
         if self.btnSpellCheck:
             self.topPanel.layout().addWidget(self.btnSpellCheck)
+        # Spellchecking libraries are probed in the background
+        Spellchecker.capabilities.changed.connect(self.updateSpellcheck)
         self.topPanel.layout().addSpacing(15)
         self.topPanel.layout().addWidget(self.btnPrevious)
         self.topPanel.layout().addWidget(self.btnNext)
@@ -189,6 +185,29 @@ class fullScreenEditor(QWidget):
         self.exited.emit()
         self.close()
 
+    def createSpellcheckButton(self):
+        self.btnSpellCheck = QPushButton(self)
+        self.btnSpellCheck.setFlat(True)
+        self.btnSpellCheck.setIcon(QIcon.fromTheme("tools-check-spelling"))
+        self.btnSpellCheck.setCheckable(True)
+        self.btnSpellCheck.setChecked(self.editor.spellcheck)
+        self.btnSpellCheck.toggled.connect(self.editor.toggleSpellcheck)
+
+    def updateSpellcheck(self):
+        """Called when spellchecking libraries are found, maybe after the
+        editor was opened without any dictionary."""
+        if not Spellchecker.isInstalled():
+            return
+
+        if not self.btnSpellCheck:
+            self.createSpellcheckButton()
+            self.topPanel.layout().insertWidget(0, self.btnSpellCheck)
+            self.topPanel.addWidgetSetting(self.tr("Spellcheck"), 'top-spellcheck', (self.btnSpellCheck, ))
+
+        self.editor.setDict(settings.dict)
+        self.editor.toggleSpellcheck(settings.spellcheck)
+        self.btnSpellCheck.setChecked(self.editor.spellcheck)
+
     def setLocked(self, val):
         self._locked = val
         self.btnClose.setVisible(not val)
@@ -5,7 +5,7 @@ import os
 
 from PyQt5.QtCore import Qt, QPoint
 from PyQt5.QtGui import QBrush, QColor, QIcon
-from PyQt5.QtWidgets import QWidget, QStyle
+from PyQt5.QtWidgets import QWidget, QStyle, QHBoxLayout, QVBoxLayout, QLabel, QProgressBar, QPushButton
 
 from manuskript import exporter
 from manuskript.functions import writablePath, openURL
@@ -35,6 +35,16 @@ class exporterDialog(QWidget, Ui_exporter):
         self.btnPreview.clicked.connect(self.preview)
         self.btnExport.clicked.connect(self.export)
 
+        # Jobs running in the background
+        self.jobs = QWidget(self)
+        self.jobs.setLayout(QVBoxLayout())
+        self.jobs.layout().setContentsMargins(0, 0, 0, 0)
+        self.verticalLayout.addWidget(self.jobs)
+
+        # Exporters are probed in the background
+        for E in exporter.exporters:
+            E.capabilities.changed.connect(self.capabilitiesChanged)
+
         #FIXME: load last export format
 
     def populateExportList(self):
@@ -64,6 +74,21 @@ class exporterDialog(QWidget, Ui_exporter):
                 name = f.name if f.implemented else self.tr("{} (not implemented yet)").format(f.name)
                 self.cmbExporters.addItem(QIcon.fromTheme(f.icon), name, E.name)
 
+    def capabilitiesChanged(self):
+        "Lists the exporters again once probed, keeping the selected format."
+        current = (self.cmbExporters.currentText(), self.cmbExporters.currentData())
+        self.cmbExporters.blockSignals(True)
+        self.populateExportList()
+        index = -1
+        for i in range(self.cmbExporters.count()):
+            if (self.cmbExporters.itemText(i), self.cmbExporters.itemData(i)) == current:
+                index = i
+                self.cmbExporters.setCurrentIndex(i)
+                break
+        self.cmbExporters.blockSignals(False)
+        if index < 0:
+            self.cmbExporters.setCurrentIndex(1)
+
     def updateUi(self, index):
 
         # We check if we have an URL to open
@@ -98,13 +123,19 @@ class exporterDialog(QWidget, Ui_exporter):
         E, F = self.getSelectedExporter()
         if not E or not F or not F.implemented:
             return
-        F.preview(self.settingsWidget, self.previewWidget)
+        self.addJob(F.preview(self.settingsWidget, self.previewWidget))
 
     def export(self):
         E, F = self.getSelectedExporter()
         if not E or not F or not F.implemented:
             return
-        F.export(self.settingsWidget)
+        self.addJob(F.export(self.settingsWidget))
+
+    def addJob(self, job):
+        """Shows the progress of `job`, if the format returned one (see
+        pandocProcess), until it is finished."""
+        if job is not None and job.isRunning():
+            self.jobs.layout().addWidget(jobWidget(job, self.jobs))
 
     ###################################################################################################################
     # UI
@@ -154,3 +185,38 @@ class exporterDialog(QWidget, Ui_exporter):
 
         l.addWidget(widget)
         widget.setParent(group)
+
+
+class jobWidget(QWidget):
+    """Shows the progress of a job running in the background (see
+    pandocProcess), with a button to cancel it."""
+
+    def __init__(self, job, parent=None):
+        QWidget.__init__(self, parent)
+        self.job = job
+
+        l = QHBoxLayout(self)
+        l.setContentsMargins(0, 0, 0, 0)
+        self.progressBar = QProgressBar()
+        self.progressBar.setRange(0, 0)  # Busy
+        self.progressBar.setMaximumWidth(100)
+        l.addWidget(self.progressBar)
+        self.lblProgress = QLabel()
+        self.lblProgress.setTextFormat(Qt.PlainText)
+        l.addWidget(self.lblProgress, 1)
+        self.btnCancel = QPushButton(self.tr("Cancel"))
+        l.addWidget(self.btnCancel)
+
+        self.setProgress(self.tr("Running…"))
+        job.progress.connect(self.setProgress)
+        job.finished.connect(self.jobFinished)
+        self.btnCancel.clicked.connect(job.cancel)
+
+    def setProgress(self, text):
+        self.lblProgress.setText(self.lblProgress.fontMetrics().elidedText(
+            "{}: {}".format(self.job.name, text), Qt.ElideRight, max(self.lblProgress.width(), 200)))
+        self.lblProgress.setToolTip(text)
+
+    def jobFinished(self, output):
+        self.hide()
+        self.deleteLater()
@@ -47,6 +47,15 @@ class exportersManager(QWidget, Ui_ExportersManager):
         self.btnSetPath.clicked.connect(self.setAppPath)
         self.txtPath.editingFinished.connect(self.updateAppPath)
 
+        # Capabilities are probed in the background
+        for E in exporter.exporters:
+            E.capabilities.changed.connect(self.capabilitiesChanged)
+
+    def capabilitiesChanged(self):
+        if self.currentExporter:
+            self.updateUi(self.currentExporter.name)
+            self.exportersMightHaveChanged.emit()
+
     def updateUi(self, name):
         E = exporter.getExporterByName(name)
         self.currentExporter = E
@@ -76,8 +85,15 @@ class exportersManager(QWidget, Ui_ExportersManager):
         # Updates path & version
         self.grpPath.setVisible(E.name != "Manuskript")  # We hide if exporter is manuskript
 
+        # Still being probed
+        if not E.isValid() and not E.capabilities.isKnown():
+            self.lblStatus.setText(self.tr("Looking for it…"))
+            self.lblStatus.setStyleSheet("color: gray;")
+            self.lblHelpText.setVisible(False)
+            self.lblVersion.setVisible(False)
+            self.lblVersionName.setVisible(False)
         # Installed
-        if E.isValid() == 2:
+        elif E.isValid() == 2:
             self.lblStatus.setText(self.tr("Installed"))
             self.lblStatus.setStyleSheet("color: darkGreen;")
             self.lblHelpText.setVisible(False)
@@ -5,10 +5,11 @@ import os
 
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QIcon, QFontMetrics, QFont
-from PyQt5.QtWidgets import QWidget, QTableWidgetItem, QListWidgetItem, QTreeView
+from PyQt5.QtWidgets import QWidget, QTableWidgetItem, QListWidgetItem, QTreeView, QHBoxLayout, QLabel, QSpinBox
 
 from manuskript.functions import mainWindow, writablePath
 from manuskript.ui.exporters.manuskript.plainTextSettings_ui import Ui_exporterSettings
+from manuskript.ui.collapsibleGroupBox2 import collapsibleGroupBox2
 from manuskript.ui import style as S
 
 
@@ -110,6 +111,17 @@ class exporterSettings(QWidget, Ui_exporterSettings):
         self.btnTransRemove.clicked.connect(self.transRemoveTableRow)
         self.tableWidgetAdjustToContent(self.tblReplacements)
 
+        # Worker processes
+        self.grpTransWorkers = collapsibleGroupBox2(self.transformations, title=self.tr("Performance:"))
+        l = QHBoxLayout(self.grpTransWorkers)
+        lbl = QLabel(self.tr("Processes used to transform long texts (0: one per processor):"))
+        lbl.setWordWrap(True)
+        l.addWidget(lbl, 8)
+        self.spnTransWorkers = QSpinBox()
+        self.spnTransWorkers.setRange(0, 64)
+        l.addWidget(self.spnTransWorkers, 2)
+        self.verticalLayout_6.insertWidget(self.verticalLayout_6.count() - 1, self.grpTransWorkers)
+
         #################################################################
         # Preview
 
@@ -213,6 +225,10 @@ class exporterSettings(QWidget, Ui_exporterSettings):
         for i in s["Custom"]:
             self.transAddTableRow(i[0], i[1], i[2], i[3])
 
+        # Performance, kept out of "Transform" since it doesn't change the output
+        s = settings.get("Performance", {})
+        self.spnTransWorkers.setValue(s.get("Workers", 0))
+
         # Preview
         s = settings["Preview"]
         f = QFont()
@@ -287,6 +303,11 @@ class exporterSettings(QWidget, Ui_exporterSettings):
             s["Custom"].append(self.getTableRowValues(self.tblReplacements, i))
         self.settings["Transform"] = s
 
+        # Performance
+        s = self.settings.get("Performance", {})
+        s["Workers"] = self.spnTransWorkers.value()
+        self.settings["Performance"] = s
+
         # Preview
         s = self.settings.get("Preview", {})
         f = self.cmbPreviewFont.currentFont()
@@ -11,6 +11,7 @@ import manuskript.models.references as Ref
 import manuskript.ui.style as S
 from manuskript import settings
 from manuskript import functions as F
+from manuskript.functions import Spellchecker
 
 import logging
 LOGGER = logging.getLogger(__name__)
@@ -28,6 +29,10 @@ class BasicHighlighter(QSyntaxHighlighter):
         self.linkColor = QColor(S.link)
         self.spellingErrorColor = QColor(Qt.red)
 
+        # Text → numbers of the blocks waiting for it to be spellchecked
+        self._pendingSpellcheck = {}
+        Spellchecker.service().checked.connect(self.spellcheckDone)
+
         # Matches during checking can be separated by their type (all of them listed here):
         # https://languagetool.org/development/api/org/languagetool/rules/ITSIssueType.html
         #
@@ -177,12 +182,26 @@ class BasicHighlighter(QSyntaxHighlighter):
             # So that it doesn't spellcheck while typing, but still spellchecks at
             # end of lines. See github's issue #166.
             textedText = text
-            if self.currentBlock().position() + len(text) != \
-               self.editor.textCursor().position():
+            block = self.currentBlock()
+            cursorPosition = self.editor.textCursor().position()
+            if block.position() + len(text) != cursorPosition:
                 textedText = text + " "
 
-            # The text should only be checked once as a whole
-            for match in self.editor._dict.checkText(textedText):
+            # The text should only be checked once as a whole. Blocks are
+            # checked in the background, except the one being edited, and
+            # rehighlighted when the matches are ready (see spellcheckDone).
+            service = Spellchecker.service()
+            matches = service.cachedMatches(self.editor._dict, textedText)
+            if matches is None:
+                if block.contains(cursorPosition) and self.editor._dict.isReady():
+                    matches = service.check(self.editor._dict, textedText)
+                else:
+                    self._pendingSpellcheck.setdefault(textedText, set()).add(
+                        block.blockNumber())
+                    service.request(self.editor._dict, textedText)
+                    matches = []
+
+            for match in matches:
                 if match.locqualityissuetype in self._errorColors:
                     highlight_color = self._errorColors[match.locqualityissuetype]
 
@@ -191,3 +210,15 @@ class BasicHighlighter(QSyntaxHighlighter):
                     # SpellCheckUnderline fails with some fonts
                     format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
                     self.setFormat(match.start, match.end - match.start, format)
+
+    def spellcheckDone(self, dictionary, text):
+        """Rehighlights the blocks waiting for the spellchecking of ``text``."""
+        blocks = self._pendingSpellcheck.pop(text, None)
+        document = self.document()
+        if not blocks or not document or dictionary is not self.editor._dict:
+            return
+
+        for number in blocks:
+            block = document.findBlockByNumber(number)
+            if block.isValid() and block.text() in (text, text[:-1]):
+                self.rehighlightBlock(block)
@@ -7,9 +7,11 @@ regexp, but not yet perfect.
 """
 
 import re
-from PyQt5.QtCore import Qt, pyqtSignal, qWarning, QRegExp
+import time
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, pyqtSignal, qWarning, QRegExp, QTimer
 from PyQt5.QtGui import (QSyntaxHighlighter, QTextBlock, QColor, QFont,
-                         QTextCharFormat, QBrush, QPalette)
+                         QTextCharFormat, QBrush, QPalette, QTextCursor)
 from PyQt5.QtWidgets import qApp, QStyle
 
 from manuskript.ui.highlighters import BasicHighlighter
@@ -36,9 +38,33 @@ class MarkdownHighlighter(BasicHighlighter):
     headingFound = pyqtSignal(int, str, QTextBlock)
     headingRemoved = pyqtSignal(int)
 
+    # Tokens, state and backtrack request of the blocks already tokenized,
+    # by text, states and tokenizer settings. Shared by all highlighters,
+    # since the tokens only depend on that.
+    tokenCache = OrderedDict()
+    # Maximum number of cached blocks
+    tokenCacheLimit = 4096
+
+    # Documents with more characters are highlighted progressively: visible
+    # blocks first, the others in order, in slices of about progressiveSlice
+    # seconds when the application is idle.
+    progressiveThreshold = 100000
+    progressiveSlice = 0.02
+
     def __init__(self, editor):
         BasicHighlighter.__init__(self, editor)
 
+        # Progressive highlighting: the blocks before the sweep have been
+        # highlighted in order, so their states are right.
+        self._sweep = QTextCursor(self.document())
+        self._sweep.setKeepPositionOnInsert(True)
+        # Block being highlighted by the sweep
+        self._sweepBlock = None
+        self._visibleBlocks = (0, 100)
+        self._progressTimer = QTimer(self)
+        self._progressTimer.setInterval(0)
+        self._progressTimer.timeout.connect(self.highlightNextBlocks)
+
         #default values
         self.editor = editor
         self.tokenizer = MarkdownTokenizer()
@@ -134,6 +160,118 @@ class MarkdownHighlighter(BasicHighlighter):
 
         return False
 
+    ###########################################################################
+    # PROGRESSIVE HIGHLIGHTING
+    ###########################################################################
+
+    def isProgressive(self):
+        "Returns True if the document is long enough to be highlighted progressively."
+        return self.document().characterCount() > self.progressiveThreshold
+
+    def isHighlightingProgressively(self):
+        "Returns True if some blocks are still waiting to be highlighted."
+        return self._progressTimer.isActive()
+
+    def isDeferred(self, block):
+        """
+        Returns True if the highlighting of block must wait until the blocks
+        before it have been highlighted: it is after the sweep, not visible
+        and doesn't contain the text cursor.
+        """
+        if block.position() < self._sweep.position() or \
+                block == self._sweepBlock or not self.isProgressive():
+            return False
+
+        first, last = self._visibleBlocks
+        if first <= block.blockNumber() <= last:
+            return False
+
+        return not block.contains(self.editor.textCursor().position())
+
+    def highlightBlock(self, text):
+        if self.isDeferred(self.currentBlock()):
+            # Leaving the state as it is stops QSyntaxHighlighter from going
+            # on with the next block.
+            self._progressTimer.start()
+            return
+
+        BasicHighlighter.highlightBlock(self, text)
+
+    def rehighlight(self):
+        if self.isProgressive():
+            # Only the visible blocks are highlighted now
+            self._sweep.setPosition(0)
+        BasicHighlighter.rehighlight(self)
+
+    def setVisibleBlocks(self, first, last):
+        """
+        Sets the numbers of the first and last blocks visible in the editor,
+        and highlights those which were waiting.
+        """
+        if (first, last) == self._visibleBlocks:
+            return
+
+        self._visibleBlocks = (first, last)
+        block = self.document().findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            if block.position() >= self._sweep.position():
+                self.rehighlightBlock(block)
+            block = block.next()
+
+    def highlightNextBlocks(self):
+        """
+        Highlights the blocks after the sweep, in order, for about
+        progressiveSlice seconds. Each block is highlighted knowing the
+        state of the previous one, so the states end up the same as if the
+        whole document had been highlighted at once.
+        """
+        start = time.perf_counter()
+        block = self.document().findBlock(self._sweep.position())
+
+        # Only the formats change, not the text: the editor doesn't need to
+        # know about each block.
+        blocked = self.editor.blockSignals(True)
+        try:
+            while block.isValid() and \
+                    time.perf_counter() - start < self.progressiveSlice:
+                self._sweepBlock = block
+                self.rehighlightBlock(block)
+                self._sweepBlock = None
+
+                block = block.next()
+                if block.isValid():
+                    self._sweep.setPosition(block.position())
+        finally:
+            self.editor.blockSignals(blocked)
+
+        if not block.isValid():
+            self._sweep.movePosition(QTextCursor.End)
+            self._progressTimer.stop()
+
+    def tokenize(self, text, lastState, previousState, nextState):
+        """
+        Returns the tokens of text, the state of its block, and whether the
+        previous block must be highlighted again. They are cached, so that
+        highlighting the same block again (when scrolling, toggling focus
+        mode or rehighlighting) only applies the formats.
+        """
+        key = (text, lastState, previousState, nextState,
+               self.tokenizer.useInlineScanner)
+        result = self.tokenCache.get(key)
+        if result is not None:
+            self.tokenCache.move_to_end(key)
+            return result
+
+        self.tokenizer.clear()
+        self.tokenizer.tokenize(text, lastState, previousState, nextState)
+        result = (self.tokenizer.getTokens(), self.tokenizer.getState(),
+                  self.tokenizer.backtrackRequested())
+
+        self.tokenCache[key] = result
+        while len(self.tokenCache) > self.tokenCacheLimit:
+            self.tokenCache.popitem(last=False)
+        return result
+
     def doHighlightBlock(self, text):
         """
         Note:  Never set the QTextBlockFormat for a QTextBlock from within
@@ -167,7 +305,6 @@ class MarkdownHighlighter(BasicHighlighter):
                 self.setFormat(0, len(text), fmt)
 
         if self.tokenizer != None:
-            self.tokenizer.clear()
             block = self.currentBlock()
             nextState = MS.MarkdownStateUnknown
             previousState = self.previousBlockState()
@@ -175,10 +312,10 @@ class MarkdownHighlighter(BasicHighlighter):
             if block.next().isValid():
                 nextState = block.next().userState()
 
-            self.tokenizer.tokenize(text, lastState, previousState, nextState)
-            self.setCurrentBlockState(self.tokenizer.getState())
+            tokens, state, backtrack = self.tokenize(text, lastState, previousState, nextState)
+            self.setCurrentBlockState(state)
 
-            self.inBlockquote = self.tokenizer.getState() == MS.MarkdownStateBlockquote
+            self.inBlockquote = state == MS.MarkdownStateBlockquote
 
             # STATE FORMATTING
             # FIXME: generic
@@ -205,8 +342,6 @@ class MarkdownHighlighter(BasicHighlighter):
                 #fmt.setForeground(Qt.lightGray)
                 #self.setFormat(0, len(text), fmt)
 
-            tokens = self.tokenizer.getTokens()
-
             for token in tokens:
                 if token.type == MTT.TokenUnknown:
                     qWarning("Highlighter found unknown token type in text block.")
@@ -226,7 +361,7 @@ class MarkdownHighlighter(BasicHighlighter):
 
                 self.applyFormattingForToken(token, text)
 
-            if self.tokenizer.backtrackRequested():
+            if backtrack:
                 previous = self.currentBlock().previous()
                 self.highlightBlockAtPosition.emit(previous.position())
 
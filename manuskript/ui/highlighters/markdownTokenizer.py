@@ -126,6 +126,38 @@ class MarkdownTokenizer(HighlightTokenizer):
     CMHighlightRegex = QRegExp("(\\{==.*==\\})")
     CMHighlightRegex.setMinimal(True)
 
+    # Python equivalents of the inline regexes above (the quantifiers of the
+    # minimal ones are lazy), used by the inline scanner. Each comes with the
+    # characters one of which must be in the text for the regex to match,
+    # and the arguments to give to tokenizeMatches.
+    inlineScannerElements = [
+        (MTT.TokenImage, re.compile(r"!\[.*?\]\(.+?\)"), "!", 0, 0, False, True),
+        (MTT.TokenInlineLink, re.compile(r"\[.+?\]\(.+?\)"), "[", 0, 0, False, True),
+        (MTT.TokenReferenceLink, re.compile(r"\[.+?\]"), "[", 0, 0, False, True),
+        (MTT.TokenHtmlEntity, re.compile(r"&[a-zA-Z]+;|&#x?[0-9]+;"), "&", 0, 0, False, False),
+        (MTT.TokenAutomaticLink, re.compile(r"<[a-zA-Z]+?:.+?>|<.+?@.+?>"), "<", 0, 0, False, True),
+        (MTT.TokenStrong, re.compile(r"\*\*(?=\S).*?\S\*\*(?!\*)|__(?=\S).*?\S__(?!_)"), "*_", 2, 2, True, False),
+        (MTT.TokenEmphasis, re.compile(r"\*(?![\s*]).*?[^\s*]\*|_(?![\s_]).*?[^\s_]_"), "*_", 1, 1, True, False),
+        (MTT.TokenMention, re.compile(r"\B@\w+(?:\-\w+)*(?:/\w+(?:\-\w+)*)?"), "@", 0, 0, False, True),
+        (MTT.TokenCMAddition, re.compile(r"\{\+\+.*?\+\+\}"), "{", 3, 3, True, False),
+        (MTT.TokenCMDeletion, re.compile(r"\{--.*?--\}"), "{", 3, 3, True, False),
+        (MTT.TokenCMSubstitution, re.compile(r"\{~~.*?~>.*?~~\}"), "{", 3, 3, True, False),
+        (MTT.TokenCMComment, re.compile(r"\{>>.*?<<\}"), "{", 3, 3, True, False),
+        (MTT.TokenCMHighlight, re.compile(r"\{==.*?==\}"), "{", 3, 3, True, False),
+        (MTT.TokenStrikethrough, re.compile(r"~~[^\s]+?.*?[^\s]+?~~"), "~", 2, 2, True, False),
+        (MTT.TokenHtmlTag, re.compile(r"<[^<>]+?>"), "<", 0, 0, False, False),
+        (MTT.TokenSubScript, re.compile(r"~(?:[^\s]|\\\s)+?~"), "~", 1, 1, True, False),
+        (MTT.TokenSuperScript, re.compile(r"\^(?:[^\s]|\\\\\s)+?\^"), "^", 1, 1, True, False),
+    ]
+    inlineMarkupRegex = re.compile("[{}]".format(re.escape(
+        "".join(sorted(set("".join(e[2] for e in inlineScannerElements)))))))
+
+    # Whether inline elements are tokenized with the scanner, which looks
+    # for the markup characters in a single pass and then only runs the
+    # compiled regexes that can match, or with the cascade of QRegExp
+    # searches. Both produce the same tokens.
+    useInlineScanner = True
+
     def __init__(self):
         HighlightTokenizer.__init__(self)
 
@@ -603,13 +635,17 @@ class MarkdownTokenizer(HighlightTokenizer):
 
             firstBracketIndex = escapedText.find("[")
             if firstBracketIndex >= 0:
-                i = firstBracketIndex
-                escapedText = escapedText[:i] + self.DUMMY_CHAR + escapedText[i+1:]
+                escapedText = self.dummyOut(escapedText, firstBracketIndex, firstBracketIndex + 1)
 
         escapedText = self.tokenizeVerbatim(escapedText)
         escapedText = self.tokenizeHtmlComments(escapedText)
         escapedText = self.tokenizeTableHeaderRow(escapedText)
         escapedText = self.tokenizeTableRow(escapedText)
+
+        if self.useInlineScanner:
+            self.scanInline(escapedText)
+            return True
+
         escapedText = self.tokenizeMatches(MTT.TokenImage, escapedText, self.imageRegex, 0, 0, False, True)
         escapedText = self.tokenizeMatches(MTT.TokenInlineLink, escapedText, self.inlineLinkRegex, 0, 0, False, True)
         escapedText = self.tokenizeMatches(MTT.TokenReferenceLink, escapedText, self.referenceLinkRegex, 0, 0, False, True)
@@ -630,6 +666,22 @@ class MarkdownTokenizer(HighlightTokenizer):
 
         return True
 
+    def scanInline(self, text):
+        """
+        Tokenizes the inline elements of text like the cascade of searches in
+        tokenizeInline, but finds the markup characters in the text first, in
+        a single pass, and only runs the regexes of the elements that they
+        can start.
+        """
+        markup = set(self.inlineMarkupRegex.findall(text))
+        if not markup:
+            return text
+
+        for tokenType, regex, chars, *args in self.inlineScannerElements:
+            if not markup.isdisjoint(chars):
+                text = self.tokenizeMatches(tokenType, text, regex, *args)
+        return text
+
     def tokenizeVerbatim(self, text):
         index = self.verbatimRegex.indexIn(text)
 
@@ -658,8 +710,7 @@ class MarkdownTokenizer(HighlightTokenizer):
                 # character so that searches for other Markdown elements
                 # don't find anything within this token's range in the string.
 
-                for i in range(index, index + token.length):
-                    text = text[:i] + self.DUMMY_CHAR + text[i+1:]
+                text = self.dummyOut(text, index, index + token.length)
 
                 index += token.length
 
@@ -678,8 +729,7 @@ class MarkdownTokenizer(HighlightTokenizer):
         # it should have already been tokenized in tokenizeMultilineComment().
         if previousState == MS.MarkdownStateComment:
             commentEnd = text.find("-->")
-            for i in range(commentEnd + 3):
-                text = text[:i] + self.DUMMY_CHAR + text[i+1:]
+            text = self.dummyOut(text, 0, commentEnd + 3)
 
         # Now check for inline comments (non-multiline).
         commentStart = self.htmlInlineCommentRegex.indexIn(text)
@@ -695,8 +745,7 @@ class MarkdownTokenizer(HighlightTokenizer):
             # Replace comment segment with dummy characters so that it doesn't
             # get tokenized again.
 
-            for i in range(commentStart, commentStart + commentLength):
-                text = text[:i] + self.DUMMY_CHAR + text[i+1:]
+            text = self.dummyOut(text, commentStart, commentStart + commentLength)
 
             commentStart = self.htmlInlineCommentRegex.indexIn(text, commentStart + commentLength)
 
@@ -713,8 +762,7 @@ class MarkdownTokenizer(HighlightTokenizer):
             # Replace comment segment with dummy characters so that it doesn't
             # get tokenized again.
 
-            for i in range(commentStart, len(text)):
-                text = text[:i] + self.DUMMY_CHAR + text[i+1:]
+            text = self.dummyOut(text, commentStart, len(text))
         return text
 
     def tokenizeTableHeaderRow(self, text):
@@ -744,13 +792,6 @@ class MarkdownTokenizer(HighlightTokenizer):
             headerStart = 0
             for i in range(len(text)):
                 if text[i] == "|":
-                    # Replace pipe with space so that it doesn't get formatted
-                    # again with, for example, strong or emphasis formatting.
-                    # Note that we use a space rather than DUMMY_CHAR for this,
-                    # to prevent formatting such as strong and emphasis from
-                    # picking it up.
-                    text = text[:i] + " " + text[i+1:]
-
                     token = Token()
 
                     if i > 0:
@@ -772,6 +813,13 @@ class MarkdownTokenizer(HighlightTokenizer):
                 token.length = len(text) - headerStart
                 self.addToken(token)
 
+            # Replace pipes with spaces so that they don't get formatted
+            # again with, for example, strong or emphasis formatting.
+            # Note that we use a space rather than DUMMY_CHAR for this,
+            # to prevent formatting such as strong and emphasis from
+            # picking it up.
+            text = text.replace("|", " ")
+
         return text
 
     def tokenizeTableDivider(self, text):
@@ -815,20 +863,19 @@ class MarkdownTokenizer(HighlightTokenizer):
 
             for i in range(len(text)):
                 if text[i] == "|":
-                    # Replace pipe with space so that it doesn't get formatted
-                    # again with, for example, strong or emphasis formatting.
-                    # Note that we use a space rather than DUMMY_CHAR for this,
-                    # to prevent formatting such as strong and emphasis from
-                    # picking it up.
-
-                    text = text[:i] + " " + text[i+1:]
-
                     token = Token()
                     token.type = MTT.TokenTablePipe
                     token.position = i
                     token.length = 1
                     self.addToken(token)
 
+            # Replace pipes with spaces so that they don't get formatted
+            # again with, for example, strong or emphasis formatting.
+            # Note that we use a space rather than DUMMY_CHAR for this,
+            # to prevent formatting such as strong and emphasis from
+            # picking it up.
+            text = text.replace("|", " ")
+
         return text
 
     def tokenizeMatches(self, tokenType, text, regex,
@@ -855,10 +902,21 @@ class MarkdownTokenizer(HighlightTokenizer):
         be replaced with dummy characters--again, for ease in parsing the
         same line for other regular expression matches.
         """
-        index = regex.indexIn(text)
+        # Searches only go forward from the end of the previous match, so the
+        # replacements can be done all at once at the end, unless the regex
+        # looks at the character before the match (word boundaries).
+        if isinstance(regex, QRegExp):
+            search = self.searchQRegExp
+            pattern = regex.pattern()
+        else:
+            search = self.searchRegex
+            pattern = regex.pattern
+        deferred = "\\b" not in pattern.lower()
+        spans = []
+
+        index, length = search(regex, text, 0)
 
         while index >= 0:
-            length = regex.matchedLength()
             token = Token()
             token.type = tokenType
             token.position = index
@@ -871,19 +929,68 @@ class MarkdownTokenizer(HighlightTokenizer):
                 token.closingMarkupLength = markupEndCount
 
             if replaceAllChars:
-                for i in range(index, index + length):
-                    text = text[:i] + self.DUMMY_CHAR + text[i+1:]
+                spans.append((index, index + length))
 
             elif replaceMarkupChars:
-                for i in range(index, index + markupStartCount):
-                    text = text[:i] + self.DUMMY_CHAR + text[i+1:]
-                for i in range(index + length - markupEndCount, index + length):
-                    text = text[:i] + self.DUMMY_CHAR + text[i+1:]
+                spans.append((index, index + markupStartCount))
+                spans.append((index + length - markupEndCount, index + length))
+
+            if not deferred:
+                text = self.dummyOutSpans(text, spans)
+                spans = []
 
             self.addToken(token)
-            index = regex.indexIn(text, index + length)
+            index, length = search(regex, text, index + length)
 
-        return text
+        return self.dummyOutSpans(text, spans)
+
+    @staticmethod
+    def searchQRegExp(regex, text, start):
+        "Returns the position and length of the first match of a QRegExp."
+        index = regex.indexIn(text, start)
+        return index, regex.matchedLength()
+
+    @staticmethod
+    def searchRegex(regex, text, start):
+        "Returns the position and length of the first match of a compiled regex."
+        match = regex.search(text, start)
+        if match is None:
+            return -1, -1
+        return match.start(), match.end() - match.start()
+
+    def dummyOut(self, text, start, end):
+        """
+        Returns a copy of text where the characters from start to end are
+        replaced with the dummy character, so that they aren't picked up by
+        subsequent parsings of the same line.
+
+        The text is rebuilt once for the whole range, rather than once per
+        character, which would make tokenizing long paragraphs quadratic.
+        """
+        if end <= start:
+            return text
+        return text[:start] + self.DUMMY_CHAR * (end - start) + text[end:]
+
+    def dummyOutSpans(self, text, spans):
+        """
+        Returns a copy of text where the characters of every (start, end)
+        span in spans, sorted by position, are replaced with the dummy
+        character. The text is rebuilt only once for all spans.
+        """
+        if not spans:
+            return text
+
+        pieces = []
+        last = 0
+        for start, end in spans:
+            start = max(start, last)
+            if end <= start:
+                continue
+            pieces.append(text[last:start])
+            pieces.append(self.DUMMY_CHAR * (end - start))
+            last = end
+        pieces.append(text[last:])
+        return "".join(pieces)
 
     def dummyOutEscapeCharacters(self, text):
         """
@@ -55,6 +55,8 @@ class importerDialog(QWidget, Ui_importer):
         self.btnPreview.clicked.connect(self.preview)
         self.btnImport.clicked.connect(self.doImport)
         self.cmbImporters.currentTextChanged.connect(self.updateSettings)
+        # Pandoc is probed in the background
+        pandocExporter().capabilities.changed.connect(self.capabilitiesChanged)
 
         self.setFileName("")
         self.updateSettings()
@@ -98,6 +100,19 @@ class importerDialog(QWidget, Ui_importer):
 
         self.cmbImporters.setCurrentIndex(1)
 
+    def capabilitiesChanged(self):
+        "Lists the formats again once pandoc is probed, keeping the selected one."
+        current = self.cmbImporters.currentData()
+        self.cmbImporters.blockSignals(True)
+        self.cmbImporters.clear()
+        self.populateImportList()
+        index = self.cmbImporters.findData(current)
+        if index >= 0:
+            self.cmbImporters.setCurrentIndex(index)
+        self.cmbImporters.blockSignals(False)
+        if index < 0:
+            self.updateSettings()
+
     def currentFormat(self):
         formatIdentifier = self.cmbImporters.currentData()
 
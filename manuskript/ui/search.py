@@ -2,9 +2,9 @@
 # --!-- coding: utf8 --!--
 import re
 
-from PyQt5.QtCore import Qt, QRect, QEvent, QCoreApplication
+from PyQt5.QtCore import Qt, QRect, QEvent, QCoreApplication, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QPalette, QFontMetrics, QKeySequence
-from PyQt5.QtWidgets import QWidget, qApp, QListWidgetItem, QStyledItemDelegate, QStyle, QLabel, QToolTip, QShortcut
+from PyQt5.QtWidgets import QWidget, qApp, QStyledItemDelegate, QStyle, QLabel, QToolTip, QShortcut
 
 
 from manuskript.functions import mainWindow
@@ -33,10 +33,12 @@ class search(QWidget, Ui_search):
         self.btnOptions.setMenu(self.searchMenu)
         self.searchMenu.triggered.connect(self.onSearchMenuChange)
 
+        self.resultModel = searchResultListModel(self)
+        self.result.setModel(self.resultModel)
         self.delegate = listResultDelegate(self)
         self.result.setItemDelegate(self.delegate)
         self.result.setMouseTracking(True)
-        self.result.itemClicked.connect(self.openItem)
+        self.result.clicked.connect(self.openItem)
 
         self.result.setStyleSheet(style.searchResultSS())
         self.searchTextInput.setStyleSheet(style.lineEditSS())
@@ -57,22 +59,24 @@ class search(QWidget, Ui_search):
         _translate("MainWindow", "Status")
 
     def nextSearchResult(self):
-        if self.result.currentRow() < self.result.count() - 1:
-            self.result.setCurrentRow(self.result.currentRow() + 1)
+        row = self.result.currentIndex().row()
+        if row < self.resultModel.rowCount() - 1:
+            self.selectSearchResult(row + 1)
         else:
-            self.result.setCurrentRow(0)
-
-        if 0 < self.result.currentRow() < self.result.count():
-            self.openItem(self.result.currentItem())
+            self.selectSearchResult(0)
 
     def previousSearchResult(self):
-        if self.result.currentRow() > 0:
-            self.result.setCurrentRow(self.result.currentRow() - 1)
+        row = self.result.currentIndex().row()
+        if row > 0:
+            self.selectSearchResult(row - 1)
         else:
-            self.result.setCurrentRow(self.result.count() - 1)
+            self.selectSearchResult(self.resultModel.rowCount() - 1)
 
-        if 0 < self.result.currentRow() < self.result.count():
-            self.openItem(self.result.currentItem())
+    def selectSearchResult(self, row):
+        index = self.resultModel.index(row)
+        if index.isValid():
+            self.result.setCurrentIndex(index)
+            self.openItem(index)
 
     def onSearchMenuChange(self):
         search_string = self.searchTextInput.text()
@@ -117,8 +121,7 @@ class search(QWidget, Ui_search):
         return re.compile(searchText, flags)
 
     def search(self):
-        self.result.clear()
-        self.result.setCurrentRow(0)
+        self.resultModel.setResults(list())
 
         searchText = self.searchTextInput.text()
         if len(searchText) > 0:
@@ -152,20 +155,51 @@ class search(QWidget, Ui_search):
 
     def generateResultsLists(self, results):
         self.noResultsLabel.setVisible(len(results) == 0)
-        for result in results:
-            item = QListWidgetItem(result.title(), self.result)
-            item.setData(Qt.UserRole, result)
-            item.setData(Qt.UserRole + 1, ' > '.join(result.path()))
-            item.setData(Qt.UserRole + 2, result.context())
-            self.result.addItem(item)
+        self.resultModel.setResults(results)
 
-    def openItem(self, item):
-        self.searchResultHighlighter.highlightSearchResult(item.data(Qt.UserRole))
+    def openItem(self, index):
+        self.searchResultHighlighter.highlightSearchResult(index.data(Qt.UserRole))
 
     def leaveEvent(self, event):
         self.delegate.mouseLeave()
 
 
+class searchResultListModel(QAbstractListModel):
+    """
+    Read-only list model over search results. Only the rows that the view
+    actually asks for are converted to displayable data, and contexts are
+    only built when requested (i.e. when a result is hovered).
+    """
+    def __init__(self, parent=None):
+        QAbstractListModel.__init__(self, parent)
+        self._results = []
+
+    def setResults(self, results):
+        self.beginResetModel()
+        self._results = results
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._results)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._results):
+            return None
+
+        result = self._results[index.row()]
+        if role == Qt.DisplayRole:
+            return result.title()
+        elif role == Qt.UserRole:
+            return result
+        elif role == Qt.UserRole + 1:
+            return ' > '.join(result.path())
+        elif role == Qt.UserRole + 2:
+            return result.context()
+        return None
+
+
 class listResultDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         QStyledItemDelegate.__init__(self, parent)
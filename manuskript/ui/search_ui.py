@@ -34,8 +34,10 @@ class Ui_search(object):
         self.btnOptions.setObjectName("btnOptions")
         self.horizontalLayout.addWidget(self.btnOptions)
         self.verticalLayout.addLayout(self.horizontalLayout)
-        self.result = QtWidgets.QListWidget(search)
+        self.result = QtWidgets.QListView(search)
         self.result.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.result.setLayoutMode(QtWidgets.QListView.Batched)
+        self.result.setUniformItemSizes(True)
         self.result.setObjectName("result")
         self.verticalLayout.addWidget(self.result)
 
@@ -297,7 +297,7 @@ def dockSS():
 
 def searchResultSS():
     return """
-        QListWidget{{
+        QListView{{
             background: {window};
         }}
         """.format(
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QTreeWidgetItem, QHeaderView
+
+from manuskript import settings
+from manuskript.enums import Outline
+from manuskript.functions import Spellchecker, searchResultContextGetter
+from manuskript.functions.spellchecker import ProjectSpellcheck
+from manuskript.ui.highlighters.searchResultHighlighters.searchResultHighlighter import searchResultHighlighter
+from manuskript.ui.tools.spellcheckReport_ui import Ui_SpellcheckReport
+
+
+class spellcheckReport(QWidget, Ui_SpellcheckReport):
+    """
+    Checks the spelling of the whole project at once, and lists the misspelled
+    words with their occurrences. Clicking an occurrence opens it, like a
+    search result.
+    """
+
+    def __init__(self, mainWindow):
+        QWidget.__init__(self)
+        self.setupUi(self)
+        self.mw = mainWindow
+
+        self.progressBar.hide()
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.tree.header().setStretchLastSection(False)
+
+        self.btnCheck.clicked.connect(self.check)
+        self.tree.itemClicked.connect(self.openOccurrence)
+
+        self.searchResultHighlighter = searchResultHighlighter()
+        self.spellcheck = None
+
+    def columns(self):
+        columns = [Outline.text]
+        if self.chkNotes.isChecked():
+            columns.append(Outline.notes)
+        if self.chkSummaries.isChecked():
+            columns += [Outline.summarySentence, Outline.summaryFull]
+        return columns
+
+    def texts(self):
+        "Returns the list of ((ID, column), text) to check."
+        columns = self.columns()
+
+        def listTexts(item):
+            texts = []
+            for column in columns:
+                text = item.data(column)
+                if text:
+                    texts.append(((item.ID(), column), str(text)))
+            for c in item.children():
+                texts += listTexts(c)
+            return texts
+
+        return listTexts(self.mw.mdlOutline.rootItem)
+
+    def check(self):
+        dictionary = Spellchecker.getDictionary(settings.dict)
+        if not dictionary:
+            self.lblStatus.setText(self.tr("No dictionary is available."))
+            return
+
+        if self.spellcheck:
+            self.spellcheck.cancel()
+
+        self.tree.clear()
+        self.lblStatus.setText(self.tr("Checking..."))
+        self.btnCheck.setEnabled(False)
+        self.progressBar.setValue(0)
+        self.progressBar.show()
+
+        self.spellcheck = ProjectSpellcheck(dictionary, self.texts(), parent=self)
+        self.spellcheck.progress.connect(self.updateProgress)
+        self.spellcheck.finished.connect(self.showResults)
+        self.spellcheck.start()
+
+    def updateProgress(self, done, total):
+        self.progressBar.setMaximum(total)
+        self.progressBar.setValue(done)
+
+    def showResults(self):
+        self.progressBar.hide()
+        self.btnCheck.setEnabled(True)
+
+        misspelled = self.spellcheck.misspelled
+        words = sorted(misspelled, key=lambda w: (-len(misspelled[w]), w.lower()))
+
+        for word in words:
+            occurrences = misspelled[word]
+            wordItem = QTreeWidgetItem([word, str(len(occurrences))])
+            for (ID, column), start, end in occurrences:
+                item = self.mw.mdlOutline.getItemByID(ID)
+                if not item:
+                    continue
+                child = QTreeWidgetItem([" > ".join(item.searchPath(column)[1:])])
+                child.setData(0, Qt.UserRole, (ID, column, start, end))
+                wordItem.addChild(child)
+            self.tree.addTopLevelItem(wordItem)
+
+        self.lblStatus.setText(self.tr("{} misspelled words.").format(len(words)))
+
+    def openOccurrence(self, treeItem, column):
+        occurrence = treeItem.data(0, Qt.UserRole)
+        if not occurrence:
+            return
+
+        ID, column, start, end = occurrence
+        item = self.mw.mdlOutline.getItemByID(ID)
+        if not item:
+            return
+
+        text = str(item.data(column))
+        result = item.wrapSearchOccurrence(column, start, end,
+                                           searchResultContextGetter(text, start, end))
+        self.searchResultHighlighter.highlightSearchResult(result)
+
+    def closeEvent(self, event):
+        if self.spellcheck:
+            self.spellcheck.cancel()
+        QWidget.closeEvent(self, event)
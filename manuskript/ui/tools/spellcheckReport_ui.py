@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'manuskript/ui/tools/spellcheckReport_ui.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.7
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_SpellcheckReport(object):
+    def setupUi(self, SpellcheckReport):
+        SpellcheckReport.setObjectName("SpellcheckReport")
+        SpellcheckReport.resize(500, 600)
+        self.verticalLayout = QtWidgets.QVBoxLayout(SpellcheckReport)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.label = QtWidgets.QLabel(SpellcheckReport)
+        self.label.setObjectName("label")
+        self.horizontalLayout.addWidget(self.label)
+        self.chkNotes = QtWidgets.QCheckBox(SpellcheckReport)
+        self.chkNotes.setObjectName("chkNotes")
+        self.horizontalLayout.addWidget(self.chkNotes)
+        self.chkSummaries = QtWidgets.QCheckBox(SpellcheckReport)
+        self.chkSummaries.setObjectName("chkSummaries")
+        self.horizontalLayout.addWidget(self.chkSummaries)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout.addItem(spacerItem)
+        self.btnCheck = QtWidgets.QPushButton(SpellcheckReport)
+        self.btnCheck.setObjectName("btnCheck")
+        self.horizontalLayout.addWidget(self.btnCheck)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+        self.progressBar = QtWidgets.QProgressBar(SpellcheckReport)
+        self.progressBar.setObjectName("progressBar")
+        self.verticalLayout.addWidget(self.progressBar)
+        self.tree = QtWidgets.QTreeWidget(SpellcheckReport)
+        self.tree.setObjectName("tree")
+        self.verticalLayout.addWidget(self.tree)
+        self.lblStatus = QtWidgets.QLabel(SpellcheckReport)
+        self.lblStatus.setText("")
+        self.lblStatus.setObjectName("lblStatus")
+        self.verticalLayout.addWidget(self.lblStatus)
+
+        self.retranslateUi(SpellcheckReport)
+        QtCore.QMetaObject.connectSlotsByName(SpellcheckReport)
+
+    def retranslateUi(self, SpellcheckReport):
+        _translate = QtCore.QCoreApplication.translate
+        SpellcheckReport.setWindowTitle(_translate("SpellcheckReport", "Spellcheck Project"))
+        self.label.setText(_translate("SpellcheckReport", "Also check:"))
+        self.chkNotes.setText(_translate("SpellcheckReport", "Notes"))
+        self.chkSummaries.setText(_translate("SpellcheckReport", "Summaries"))
+        self.btnCheck.setText(_translate("SpellcheckReport", "Check"))
+        self.tree.headerItem().setText(0, _translate("SpellcheckReport", "Word"))
+        self.tree.headerItem().setText(1, _translate("SpellcheckReport", "Occurrences"))
@@ -3,7 +3,7 @@
 import re
 
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QTextCursor, QFont, QFontMetrics
+from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import QAction, qApp, QToolTip, QTextEdit
 
 from manuskript.ui.editors.completer import completer
@@ -19,12 +19,8 @@ class MDEditCompleter(MDEditView):
 
         self.completer = None
         self.setMouseTracking(True)
-        self.refRects = []
         self._noFocusMode = True
 
-        self.textChanged.connect(self.getRefRects)
-        self.document().documentLayoutChanged.connect(self.getRefRects)
-
     def setCurrentModelIndex(self, index):
         MDEditView.setCurrentModelIndex(self, index)
         if self._index and not self.completer:
@@ -105,6 +101,20 @@ class MDEditCompleter(MDEditView):
             self.completer.setGeometry(cr)
             self.completer.popup(self.textUnderCursor(select=True))
 
+    def blockSpans(self, text):
+        """
+        Returns the clickable things of the text of a block, including the
+        references.
+        """
+        spans = MDEditView.blockSpans(self, text)
+        for m in re.finditer(Ref.RegEx, text):
+            spans.append((m.start(), m.end(), Ref.RegEx, [m.group(0)]))
+        return spans
+
+    def refsAt(self, pos):
+        "Returns the clickable things at pos which are references."
+        return [r for r in self.clickThingsAt(pos) if r.regex is Ref.RegEx]
+
     def mouseMoveEvent(self, event):
         """
         When mouse moves, we show tooltip when appropriate.
@@ -113,7 +123,7 @@ class MDEditCompleter(MDEditView):
         MDEditView.mouseMoveEvent(self, event)
         self.endTooltipMoveEvent()
 
-        onRef = [r for r in self.refRects if r.contains(event.pos())]
+        onRef = self.refsAt(event.pos())
 
         if not onRef:
             qApp.restoreOverrideCursor()
@@ -130,7 +140,7 @@ class MDEditCompleter(MDEditView):
 
     def mouseReleaseEvent(self, event):
         MDEditView.mouseReleaseEvent(self, event)
-        onRef = [r for r in self.refRects if r.contains(event.pos())]
+        onRef = self.refsAt(event.pos())
         if onRef:
             cursor = self.cursorForPosition(event.pos())
             ref = self.refUnderCursor(cursor)
@@ -138,29 +148,11 @@ class MDEditCompleter(MDEditView):
                 Ref.open(ref)
                 qApp.restoreOverrideCursor()
 
-    def resizeEvent(self, event):
-        MDEditView.resizeEvent(self, event)
-        self.getRefRects()
-
-    def getRefRects(self):
-        cursor = self.textCursor()
-        f = self.font()
-        f.setFixedPitch(True)
-        f.setWeight(QFont.DemiBold)
-        fm = QFontMetrics(f)
-        refs = []
-        for txt in re.finditer(Ref.RegEx, self.toPlainText()):
-            cursor.setPosition(txt.start())
-            r = self.cursorRect(cursor)
-            r.setWidth(fm.width(txt.group(0)))
-            refs.append(r)
-        self.refRects = refs
-
     def paintEvent(self, event):
         QTextEdit.paintEvent(self, event)
 
         # Debug: paint rects
         # painter = QPainter(self.viewport())
         # painter.setPen(Qt.gray)
-        # for r in self.refRects:
-        # painter.drawRect(r)
+        # for r in self.clickRects:
+        # painter.drawRect(r.rect)
@@ -45,10 +45,11 @@ class MDEditView(textEditView):
         self.verticalScrollBar().rangeChanged.connect(
             self.scrollBarRangeChanged)
 
-        # Clickable things
+        # Clickable things: spans of each block, and those under the mouse
+        self._linkSpans = []
         self.clickRects = []
-        self.textChanged.connect(self.getClickRects)
-        self.document().documentLayoutChanged.connect(self.getClickRects)
+        self.document().contentsChange.connect(self.updateLinkSpans)
+        self.updateLinkSpans(0, 0, self.document().characterCount())
         self.setMouseTracking(True)
 
     ###########################################################################
@@ -455,57 +456,116 @@ class MDEditView(textEditView):
 
     def resizeEvent(self, event):
         textEditView.resizeEvent(self, event)
-        self.getClickRects()
+        self.updateVisibleBlocks()
 
     def scrollContentsBy(self, dx, dy):
         textEditView.scrollContentsBy(self, dx, dy)
-        self.getClickRects()
+        self.updateVisibleBlocks()
 
-    def getClickRects(self):
+    def updateVisibleBlocks(self):
         """
-        Parses the whole texte to catch clickable things: links and images.
-        Stores the result so that it can be used elsewhere.
+        Tells the highlighter which blocks are visible, so that they are
+        highlighted first in long documents.
         """
-        cursor = self.textCursor()
-        refs = []
-        text = self.toPlainText()
-        for rx in [
-                self.imageRegex,
-                self.automaticLinkRegex,
-                self.inlineLinkRegex,
-            ]:
+        if not isinstance(self.highlighter, MarkdownHighlighter):
+            return
+
+        rect = self.viewport().rect()
+        first = self.cursorForPosition(rect.topLeft()).blockNumber()
+        last = self.cursorForPosition(rect.bottomRight()).blockNumber()
+        self.highlighter.setVisibleBlocks(first, last)
+
+    def linkRegexes(self):
+        return [self.imageRegex, self.automaticLinkRegex, self.inlineLinkRegex]
+
+    def blockSpans(self, text):
+        """
+        Returns the clickable things (links and images) in the text of a
+        block, as (start, end, regex, captured texts) tuples.
+        """
+        spans = []
+        for rx in self.linkRegexes():
             pos = 0
             while rx.indexIn(text, pos) != -1:
-                cursor.setPosition(rx.pos())
-                r1 = self.cursorRect(cursor)
                 pos = rx.pos() + rx.matchedLength()
-                cursor.setPosition(pos)
-                r2 = self.cursorRect(cursor)
-                if r1.top() == r2.top():
-                    ct = ClickThing(
-                            QRect(r1.topLeft(), r2.bottomRight()),
-                            rx,
-                            rx.capturedTexts())
-                    refs.append(ct)
-                else:
-                    r1.setRight(self.viewport().geometry().right())
-                    refs.append(ClickThing(r1, rx, rx.capturedTexts()))
-                    r2.setLeft(self.viewport().geometry().left())
-                    refs.append(ClickThing(r2, rx, rx.capturedTexts()))
-                    # We check for middle lines
-                    cursor.setPosition(rx.pos())
-                    cursor.movePosition(cursor.Down)
-                    while self.cursorRect(cursor).top() != r2.top():
-                        r3 = self.cursorRect(cursor)
-                        r3.setLeft(self.viewport().geometry().left())
-                        r3.setRight(self.viewport().geometry().right())
-                        refs.append(ClickThing(r3, rx, rx.capturedTexts()))
-                        if not cursor.movePosition(cursor.Down):
-                            # Super-rare failure. Leaving log message for future investigation.
-                            LOGGER.debug("Failed to move cursor down while calculating clickables. Aborting.")
-                            break
-
-        self.clickRects = refs
+                spans.append((rx.pos(), pos, rx, rx.capturedTexts()))
+        return spans
+
+    def updateLinkSpans(self, position, charsRemoved, charsAdded):
+        """
+        Updates the clickable things of the blocks changed in the document,
+        so that the whole text doesn't have to be parsed again.
+        """
+        doc = self.document()
+        block = doc.findBlock(position)
+        last = doc.findBlock(min(position + charsAdded, doc.characterCount() - 1))
+        if not block.isValid() or not last.isValid():
+            return
+
+        # Blocks after the change have moved by that many blocks
+        moved = doc.blockCount() - len(self._linkSpans)
+
+        spans = []
+        while block.isValid() and block.blockNumber() <= last.blockNumber():
+            spans.append(self.blockSpans(block.text()))
+            block = block.next()
+
+        first = last.blockNumber() - len(spans) + 1
+        self._linkSpans[first:last.blockNumber() - moved + 1] = spans
+
+        if len(self._linkSpans) != doc.blockCount():
+            # Should not happen, but better parse everything than be wrong
+            LOGGER.debug("Clickable things out of sync with the document, parsing it again.")
+            self._linkSpans = []
+            self.updateLinkSpans(0, 0, doc.characterCount())
+
+    def spanRects(self, start, end):
+        """
+        Returns the rects, in viewport coordinates, covered by the text from
+        position start to end, which can be wrapped on several lines.
+        """
+        cursor = self.textCursor()
+        cursor.setPosition(start)
+        r1 = self.cursorRect(cursor)
+        cursor.setPosition(end)
+        r2 = self.cursorRect(cursor)
+
+        if r1.top() == r2.top():
+            return [QRect(r1.topLeft(), r2.bottomRight())]
+
+        r1.setRight(self.viewport().geometry().right())
+        r2.setLeft(self.viewport().geometry().left())
+        rects = [r1, r2]
+
+        # We check for middle lines
+        cursor.setPosition(start)
+        cursor.movePosition(cursor.Down)
+        while self.cursorRect(cursor).top() != r2.top():
+            r3 = self.cursorRect(cursor)
+            r3.setLeft(self.viewport().geometry().left())
+            r3.setRight(self.viewport().geometry().right())
+            rects.append(r3)
+            if not cursor.movePosition(cursor.Down):
+                # Super-rare failure. Leaving log message for future investigation.
+                LOGGER.debug("Failed to move cursor down while calculating clickables. Aborting.")
+                break
+        return rects
+
+    def clickThingsAt(self, pos):
+        """
+        Returns the clickable things at pos, in viewport coordinates. Only
+        the rects of the block under pos are computed.
+        """
+        block = self.cursorForPosition(pos).block()
+        if not block.isValid() or block.blockNumber() >= len(self._linkSpans):
+            return []
+
+        things = []
+        for start, end, rx, texts in self._linkSpans[block.blockNumber()]:
+            for rect in self.spanRects(block.position() + start, block.position() + end):
+                if rect.contains(pos):
+                    things.append(ClickThing(rect, rx, texts))
+        return things
 
     def mouseMoveEvent(self, event):
         """
@@ -515,7 +575,8 @@ class MDEditView(textEditView):
         textEditView.mouseMoveEvent(self, event)
         self.endTooltipMoveEvent()
 
-        onRect = [r for r in self.clickRects if r.rect.contains(event.pos())]
+        self.clickRects = self.clickThingsAt(event.pos())
+        onRect = [r for r in self.clickRects if r.regex in self.linkRegexes()]
 
         if not onRect:
             qApp.restoreOverrideCursor()
@@ -545,7 +606,8 @@ class MDEditView(textEditView):
 
     def mouseReleaseEvent(self, event):
         textEditView.mouseReleaseEvent(self, event)
-        onRect = [r for r in self.clickRects if r.rect.contains(event.pos())]
+        onRect = [r for r in self.clickThingsAt(event.pos())
+                  if r.regex in self.linkRegexes()]
         if onRect and event.modifiers() & Qt.ControlModifier:
             ct = onRect[0]
 
@@ -586,16 +648,77 @@ class ClickThing:
         self.texts = texts
 
 from PyQt5.QtNetwork import QNetworkRequest, QNetworkAccessManager, QNetworkReply
-from PyQt5.QtCore import QIODevice, QUrl, QBuffer
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QIODevice, QUrl, QBuffer, QSize, QObject, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+
+class ImageTooltipLoader(QObject):
+    """
+    Decodes images into thumbnails in background threads, and sends them
+    back to the GUI thread.
+    """
+
+    # url, thumbnail (QImage) or None, error message
+    _loaded = pyqtSignal(str, object, str)
+
+    def __init__(self):
+        QObject.__init__(self)
+        self._loaded.connect(self._deliver)
+
+    def load(self, url, path=None, data=None):
+        """
+        Decodes the local image at path, or the downloaded data, in a
+        background thread.
+        """
+        folder = F.writablePath("thumbnails")
+        thread = threading.Thread(target=self._run, args=(url, path, data, folder),
+                                  daemon=True)
+        thread.start()
+
+    def _run(self, url, path, data, folder):
+        try:
+            if path is not None:
+                image, error = ImageTooltip.loadThumbnail(path, folder)
+            else:
+                buffer = QBuffer()
+                buffer.setData(data)
+                image, error = ImageTooltip.decodeThumbnail(buffer)
+        except Exception as e:
+            LOGGER.exception("Failed to load the image %s.", url)
+            image, error = None, str(e)
+        self._loaded.emit(url, image, error)
+
+    def _deliver(self, url, image, error):
+        ImageTooltip.loaded(url, image, error)
+
 
 class ImageTooltip:
     """
     This class handles the retrieving and caching of images in order to display these in tooltips.
+
+    Images are scaled down to thumbnails of at most thumbnailSize. The last
+    ones are kept in memory, up to cacheLimit bytes of pixels, and those of
+    local images are also saved in a folder, so that they are decoded only
+    once as long as the image doesn't change.
     """
 
-    cache = {}
+    # url → (True, thumbnail) or (False, error message), last used last
+    cache = OrderedDict()
+    cacheSize = 0
+    cacheLimit = 32 * 1024 * 1024
+    thumbnailSize = QSize(800, 600)
+    # Maximum number of thumbnails saved on disk
+    diskCacheLimit = 500
+    # Time after which a download is abandoned, in milliseconds
+    timeout = 30000
+
     manager = QNetworkAccessManager()
+    loader = ImageTooltipLoader()
+    # url → position of the tooltip, for the images being retrieved
     processing = {}
 
     supportedSchemes = ("", "file", "http", "https")
@@ -609,78 +732,158 @@ class ImageTooltip:
         if ImageTooltip.showTooltip(url, pos):
             return # the url already exists in the cache
 
-        try:
-            ImageTooltip.manager.finished.connect(ImageTooltip.finished, F.AUC)
-        except:
-            pass # already connected
-
         qurl = QUrl.fromUserInput(url)
         if (qurl == QUrl()):
-            ImageTooltip.cache[url] = (False, ImageTooltip.manager.tr("The image path or URL is incomplete or malformed."))
+            ImageTooltip.cacheEntry(url, False, ImageTooltip.manager.tr("The image path or URL is incomplete or malformed."))
             ImageTooltip.showTooltip(url, pos)
             return # empty QUrl means it failed completely
         elif (qurl.scheme() not in ImageTooltip.supportedSchemes):
             # QUrl.fromUserInput() can occasionally deduce an incorrect scheme,
-            # which produces an error message regarding an unknown scheme. (Yay!)
-            # But it also breaks all possible methods to try and associate the
-            # reply with the original request in finished(), since reply.request()
-            # is completely and utterly butchered for all tracking needs. :'(
-            # (The QNetworkRequest, .url() and .originatingObject() can all change.)
+            # which produces an error message regarding an unknown scheme.
 
             # Test case (Linux): ![image](C:\test_root.jpg)
-            ImageTooltip.cache[url] = (False, ImageTooltip.manager.tr("The protocol \"{}\" is not supported.").format(qurl.scheme()))
+            ImageTooltip.cacheEntry(url, False, ImageTooltip.manager.tr("The protocol \"{}\" is not supported.").format(qurl.scheme()))
             ImageTooltip.showTooltip(url, pos)
-            return # no more request/reply chaos, please!
-        elif (qurl in ImageTooltip.processing):
+            return
+        elif (url in ImageTooltip.processing):
+            ImageTooltip.processing[url] = pos
             return # one download is more than enough
 
-        # Request the image for later processing.
-        request = QNetworkRequest(qurl)
-        ImageTooltip.processing[qurl] = (pos, url)
-        reply = ImageTooltip.manager.get(request)
+        ImageTooltip.processing[url] = pos
 
-        # On Linux the finished() signal is not triggered when the url resembles
-        # 'file://X:/...'. But because it completes instantly, we can manually
-        # trigger the code to keep our processing dictionary neat & clean.
-        if reply.error() == 302:  # QNetworkReply.ProtocolInvalidOperationError
-            ImageTooltip.finished(reply)
+        if qurl.isLocalFile():
+            # Decoded in the background, without the network manager
+            ImageTooltip.loader.load(url, path=qurl.toLocalFile())
+            return
+
+        # Request the image for later processing. Each reply is tracked on
+        # its own, so that processing entries are always removed.
+        reply = ImageTooltip.manager.get(QNetworkRequest(qurl))
+        reply.finished.connect(lambda: ImageTooltip.finished(url, reply))
+        QTimer.singleShot(ImageTooltip.timeout, lambda: ImageTooltip.abort(url, reply))
+
+        # Some invalid requests complete at once, without signal.
+        if reply.isFinished():
+            ImageTooltip.finished(url, reply)
 
-    def finished(reply):
+    def abort(url, reply):
         """
-        After retrieving an image, we add it to the cache.
+        Abandons the download of url if it is still going on.
         """
-        cache = ImageTooltip.cache
-        url_key = reply.request().url()
-        pos, url = None, None
-
-        if url_key in ImageTooltip.processing:
-            # Obtain the information associated with this request.
-            pos, url = ImageTooltip.processing[url_key]
-            del ImageTooltip.processing[url_key]
-        elif len(ImageTooltip.processing) == 0:
-            # We are not processing anything. Maybe it is a spurious signal,
-            # or maybe the 'reply.error() == 302' workaround in fromUrl() has
-            # been fixed in Qt. Whatever the reason, we can assume this request
-            # has already been handled, and needs no more work from us.
-            return
-        else:
-            # Somehow we lost track. Log what we can to hopefully figure it out.
-            LOGGER.warning("Unable to match fetched data for tooltip to original request.")
-            LOGGER.warning("- Completed request: %s", url_key)
-            LOGGER.warning("- Status upon finishing: %s, %s", reply.error(), reply.errorString())
-            LOGGER.warning("- Currently processing: %s", ImageTooltip.processing)
+        if url in ImageTooltip.processing:
+            try:
+                reply.abort()
+            except RuntimeError:
+                pass  # Already finished and deleted
+
+    def finished(url, reply):
+        """
+        After retrieving an image, we decode it in the background.
+        """
+        reply.deleteLater()
+        if url not in ImageTooltip.processing:
+            # Already handled (aborted after finishing, for example)
             return
 
-        # Update cache with retrieved data.
         if reply.error() != QNetworkReply.NoError:
-            cache[url] = (False, reply.errorString())
+            ImageTooltip.loaded(url, None, reply.errorString())
         else:
-            px = QPixmap()
-            px.loadFromData(reply.readAll())
-            px = px.scaled(800, 600, Qt.KeepAspectRatio)
-            cache[url] = (True, px)
+            ImageTooltip.loader.load(url, data=bytes(reply.readAll()))
 
-        ImageTooltip.showTooltip(url, pos)
+    def loaded(url, image, error):
+        """
+        Adds the thumbnail of an image, or the error, to the cache and shows
+        the tooltip.
+        """
+        pos = ImageTooltip.processing.pop(url, None)
+        if image is not None:
+            ImageTooltip.cacheEntry(url, True, image)
+        else:
+            ImageTooltip.cacheEntry(url, False, error)
+
+        if pos is not None:
+            ImageTooltip.showTooltip(url, pos)
+
+    def cacheEntry(url, found, value):
+        """
+        Caches a thumbnail or an error message for url, and removes the least
+        recently used thumbnails if the cache is too big.
+        """
+        cache = ImageTooltip.cache
+        if url in cache:
+            ImageTooltip.cacheSize -= ImageTooltip.entrySize(cache.pop(url))
+
+        cache[url] = (found, value)
+        ImageTooltip.cacheSize += ImageTooltip.entrySize(cache[url])
+
+        while ImageTooltip.cacheSize > ImageTooltip.cacheLimit and len(cache) > 1:
+            url, entry = cache.popitem(last=False)
+            ImageTooltip.cacheSize -= ImageTooltip.entrySize(entry)
+
+    def entrySize(entry):
+        found, value = entry
+        if found:
+            return value.bytesPerLine() * value.height()
+        return len(value)
+
+    def decodeThumbnail(device):
+        """
+        Reads the image in device, scaled down to thumbnailSize while it is
+        decoded. Returns the image and an error message.
+        """
+        reader = QImageReader(device)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > ImageTooltip.thumbnailSize.width() or
+                               size.height() > ImageTooltip.thumbnailSize.height()):
+            reader.setScaledSize(size.scaled(ImageTooltip.thumbnailSize, Qt.KeepAspectRatio))
+
+        image = reader.read()
+        if image.isNull():
+            return None, reader.errorString()
+        return image, ""
+
+    def thumbnailPath(path, folder):
+        """
+        Returns the path of the thumbnail of the image at path in folder,
+        which changes with the image modification time and size.
+        """
+        stat = os.stat(path)
+        key = "{}|{}|{}".format(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        return os.path.join(folder, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def loadThumbnail(path, folder):
+        """
+        Returns the thumbnail of the local image at path and an error message,
+        from the thumbnails saved in folder if possible.
+        """
+        try:
+            thumbnailPath = ImageTooltip.thumbnailPath(path, folder)
+        except OSError as e:
+            return None, e.strerror
+
+        image = QImage()
+        if os.path.exists(thumbnailPath) and image.load(thumbnailPath, "PNG"):
+            return image, ""
+
+        image, error = ImageTooltip.decodeThumbnail(path)
+        if image is not None:
+            if image.save(thumbnailPath + ".tmp", "PNG"):
+                os.replace(thumbnailPath + ".tmp", thumbnailPath)
+                ImageTooltip.pruneThumbnails(folder)
+        return image, error
+
+    def pruneThumbnails(folder):
+        "Removes the oldest thumbnails in folder if there are too many."
+        try:
+            files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".png")]
+            if len(files) <= ImageTooltip.diskCacheLimit:
+                return
+            files.sort(key=os.path.getmtime)
+            for f in files[:len(files) - ImageTooltip.diskCacheLimit]:
+                os.remove(f)
+        except OSError:
+            pass  # Another thread got there first
 
     def showTooltip(url, pos):
         """
@@ -689,6 +892,7 @@ class ImageTooltip:
         cache = ImageTooltip.cache
 
         if url in cache:
+            cache.move_to_end(url)
             if not cache[url][0]:  # error, image was not found
                 ImageTooltip.tooltipError(cache[url][1], pos)
             else:
@@ -706,10 +910,9 @@ class ImageTooltip:
         """
         Display a tooltip with an image at the given position.
         """
-        px = image
         buffer = QBuffer()
         buffer.open(QIODevice.WriteOnly)
-        px.save(buffer, "PNG", quality=100)
+        image.save(buffer, "PNG", quality=100)
         image = bytes(buffer.data().toBase64()).decode()
         tt = "<p><img src='data:image/png;base64,{}'></p>".format(image)
         ImageTooltip.editor.doTooltip(pos, tt)
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
+from collections import OrderedDict
+
 from PyQt5.QtCore import QSize, Qt, QRect, QPoint, QPointF
 from PyQt5.QtGui import QMouseEvent, QFont, QPalette, QRegion, QFontMetrics, QColor, QIcon, QPolygonF
+from PyQt5.QtGui import QPixmap, QPainter
 from PyQt5.QtWidgets import QStyledItemDelegate, QLineEdit, QPlainTextEdit, QFrame, qApp, QStyle
+from PyQt5.QtWidgets import QStyleOptionViewItem
 
 from manuskript import settings
 from manuskript.enums import Outline
@@ -10,10 +14,15 @@ from manuskript.functions import colorifyPixmap
 from manuskript.functions import mainWindow
 from manuskript.functions import mixColors
 from manuskript.functions import outlineItemColors
+from manuskript.functions import outlinePalette
 from manuskript.ui import style as S
 
 
 class corkDelegate(QStyledItemDelegate):
+
+    # Maximum memory used by cached cards, in bytes
+    cacheLimit = 64 * 1024 * 1024
+
     def __init__(self, parent=None):
         QStyledItemDelegate.__init__(self, parent)
         self.factor = settings.corkSizeFactor / 100.
@@ -23,11 +32,106 @@ class corkDelegate(QStyledItemDelegate):
 
         self.bgColors = {}
 
+        # Cards are rendered once in a pixmap, and redrawn only when something
+        # they depend on changes. Each item has a version, incremented when
+        # its data change in the model.
+        self._model = None
+        self._versions = {}
+        self._cache = OrderedDict()  # ID → (key, pixmap)
+        self._cacheSize = 0
+
     def newStyle(self):
         return settings.corkStyle == "new"
 
     def setCorkSizeFactor(self, v):
         self.factor = v / 100.
+        self.clearCache()
+
+    ###############################################################################
+    # CARD CACHE
+    ###############################################################################
+
+    def clearCache(self, *args):
+        self._cache.clear()
+        self._cacheSize = 0
+
+    def watchModel(self, model):
+        "Follows changes in ``model`` to know which cached cards are outdated."
+        if model is self._model:
+            return
+
+        if self._model is not None:
+            try:
+                self._model.dataChanged.disconnect(self.itemsChanged)
+                self._model.rowsInserted.disconnect(self.childrenChanged)
+                self._model.rowsRemoved.disconnect(self.childrenChanged)
+                self._model.modelReset.disconnect(self.clearCache)
+            except (TypeError, RuntimeError):
+                pass
+
+        self._model = model
+        self._versions = {}
+        self.clearCache()
+        model.dataChanged.connect(self.itemsChanged)
+        model.rowsInserted.connect(self.childrenChanged)
+        model.rowsRemoved.connect(self.childrenChanged)
+        model.modelReset.connect(self.clearCache)
+
+    def bumpVersion(self, index):
+        if index.isValid():
+            ID = index.internalPointer().ID()
+            self._versions[ID] = self._versions.get(ID, 0) + 1
+
+    def itemsChanged(self, topLeft, bottomRight):
+        parent = topLeft.parent()
+        for row in range(topLeft.row(), bottomRight.row() + 1):
+            self.bumpVersion(self._model.index(row, 0, parent))
+
+    def childrenChanged(self, parent, first, last):
+        # Folders are drawn differently depending on their children
+        self.bumpVersion(parent)
+
+    def cardKey(self, p, option, index):
+        "Returns a tuple of everything the card of ``index`` depends on."
+        item = index.internalPointer()
+        state = option.state & (QStyle.State_Selected | QStyle.State_Enabled | QStyle.State_Active)
+        return (
+            self._versions.get(item.ID(), 0),
+            # Inherited from the parents (see outlineItemColors)
+            item.compile(),
+            outlinePalette.version(),
+            self.factor,
+            settings.corkStyle,
+            tuple(sorted(settings.viewSettings["Cork"].items())),
+            S.text, S.window,
+            option.rect.size(),
+            int(state),
+            option.font.key(),
+            p.font().key(),
+            p.device().devicePixelRatioF(),
+        )
+
+    def cachedCard(self, ID, key):
+        if ID in self._cache:
+            cachedKey, pixmap = self._cache[ID]
+            if cachedKey == key:
+                self._cache.move_to_end(ID)
+                return pixmap
+        return None
+
+    def cacheCard(self, ID, key, pixmap):
+        if ID in self._cache:
+            self._cacheSize -= self.pixmapSize(self._cache.pop(ID)[1])
+        self._cache[ID] = (key, pixmap)
+        self._cacheSize += self.pixmapSize(pixmap)
+
+        while self._cacheSize > self.cacheLimit and len(self._cache) > 1:
+            ID, (key, pixmap) = self._cache.popitem(last=False)
+            self._cacheSize -= self.pixmapSize(pixmap)
+
+    @staticmethod
+    def pixmapSize(pixmap):
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
 
     def sizeHint(self, option, index):
         if self.newStyle():
@@ -45,11 +149,11 @@ class corkDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
         # When the user performs a global search and selects an Outline result (title or summary), the
         # associated chapter is selected in cork view, triggering a call to this method with the results
-        # list widget set in self.sender(). In this case we store the searched column so we know which
+        # list view set in self.sender(). In this case we store the searched column so we know which
         # editor should be created.
         searchedColumn = None
-        if self.sender() is not None and self.sender().objectName() == 'result' and self.sender().currentItem():
-            searchedColumn = self.sender().currentItem().data(Qt.UserRole).column()
+        if self.sender() is not None and self.sender().objectName() == 'result' and self.sender().currentIndex().isValid():
+            searchedColumn = self.sender().currentIndex().data(Qt.UserRole).column()
 
         self.updateRects(option, index)
 
@@ -104,6 +208,7 @@ class corkDelegate(QStyledItemDelegate):
             return edt
 
     def updateEditorGeometry(self, editor, option, index):
+        self.updateRects(option, index)
 
         if self.editing == Outline.summarySentence:
             # One line summary
@@ -208,10 +313,44 @@ class corkDelegate(QStyledItemDelegate):
             self.titleRect.setBottomRight(self.labelRect.bottomRight() - QPoint(self.margin, self.margin))
 
     def paint(self, p, option, index):
+        if not index.isValid():
+            return
+
+        self.watchModel(index.model())
+
+        ID = index.internalPointer().ID()
+        key = self.cardKey(p, option, index)
+        pixmap = self.cachedCard(ID, key)
+
+        if pixmap is None:
+            pixmap = self.renderCard(p, option, index)
+            self.cacheCard(ID, key, pixmap)
+
+        p.drawPixmap(option.rect.topLeft(), pixmap)
+
+    def renderCard(self, p, option, index):
+        "Paints the card of ``index`` in a pixmap of the size of ``option.rect``."
+        dpr = p.device().devicePixelRatioF()
+        pixmap = QPixmap(option.rect.size() * dpr)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        opt = QStyleOptionViewItem(option)
+        opt.rect = QRect(QPoint(0, 0), option.rect.size())
+
+        painter = QPainter(pixmap)
+        painter.setRenderHints(p.renderHints())
+        painter.setFont(p.font())
+        painter.setPen(p.pen())
+        painter.setBrush(p.brush())
+
         if self.newStyle():
-            self.paint_v2(p, option, index)
+            self.paint_v2(painter, opt, index)
         else:
-            self.paint_v1(p, option, index)
+            self.paint_v1(painter, opt, index)
+
+        painter.end()
+        return pixmap
 
     def paint_v2(self, p, option, index):
         # QStyledItemDelegate.paint(self, p, option, index)
@@ -370,8 +509,8 @@ class corkDelegate(QStyledItemDelegate):
         # Draw status
         status = item.data(Outline.status)
         if status:
-            it = mainWindow().mdlStatus.item(int(status), 0)
-            if it != None:
+            statusName = outlinePalette.statusName(status)
+            if statusName:
                 p.save()
                 p.setClipRegion(QRegion(self.cardRect))
                 f = p.font()
@@ -380,7 +519,7 @@ class corkDelegate(QStyledItemDelegate):
                 p.setFont(f)
                 p.setPen(QColor(Qt.red).lighter(170))
                 _rotate(-35, rect=self.cardRect)
-                p.drawText(self.cardRect, Qt.AlignCenter, it.text())
+                p.drawText(self.cardRect, Qt.AlignCenter, statusName)
                 p.restore()
 
                 # Draw Summary
@@ -567,8 +706,8 @@ class corkDelegate(QStyledItemDelegate):
         mainRect = self.mainRect
         status = item.data(Outline.status)
         if status:
-            it = mainWindow().mdlStatus.item(int(status), 0)
-            if it != None:
+            statusName = outlinePalette.statusName(status)
+            if statusName:
                 p.save()
                 p.setClipRegion(QRegion(mainRect))
                 f = p.font()
@@ -577,7 +716,7 @@ class corkDelegate(QStyledItemDelegate):
                 p.setFont(f)
                 p.setPen(QColor(Qt.red).lighter(175))
                 _rotate(-35)
-                p.drawText(mainRect, Qt.AlignCenter, it.text())
+                p.drawText(mainRect, Qt.AlignCenter, statusName)
                 p.restore()
 
                 # Draw Summary
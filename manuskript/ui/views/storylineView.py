@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 # --!-- coding: utf8 --!--
+import re
+
 from PyQt5.QtCore import Qt, QTimer, QRectF
 from PyQt5.QtGui import QBrush, QPen, QFontMetrics, QFontMetricsF, QColor
 from PyQt5.QtWidgets import QWidget, QGraphicsScene, QGraphicsSimpleTextItem, QMenu, QAction, QGraphicsRectItem, \
-    QGraphicsLineItem, QGraphicsEllipseItem
+    QGraphicsLineItem, QGraphicsEllipseItem, QGraphicsItem
 
 from manuskript.enums import Outline
 from manuskript.models import references
@@ -17,8 +19,11 @@ class storylineView(QWidget, Ui_storylineView):
         self.setupUi(self)
         
         self._mdlPlots = None
+        self._mdlOutline = None
+        self._mdlCharacter = None
         self.scene = QGraphicsScene()
         self.view.setScene(self.scene)
+        self.clear()
 
         self.reloadTimer = QTimer()
         self.reloadTimer.timeout.connect(self.refresh)
@@ -28,6 +33,10 @@ class storylineView(QWidget, Ui_storylineView):
         self.btnRefresh.clicked.connect(self.refresh)
         self.sldTxtSize.sliderMoved.connect(self.reloadTimer.start)
 
+        # Items are only created around what is shown, see renderLayout
+        self.view.horizontalScrollBar().valueChanged.connect(self.updateVisible)
+        self.view.horizontalScrollBar().rangeChanged.connect(self.updateVisible)
+
         self.generateMenu()
 
     def generateMenu(self):
@@ -50,19 +59,25 @@ class storylineView(QWidget, Ui_storylineView):
         self.btnSettings.setMenu(m)
 
     def setModels(self, mdlOutline, mdlCharacter, mdlPlots):
+        self.clear()
         self._mdlPlots = mdlPlots
         # self._mdlPlots.dataChanged.connect(self.refresh)
         # self._mdlPlots.rowsInserted.connect(self.refresh)
 
         self._mdlOutline = mdlOutline
         self._mdlOutline.dataChanged.connect(self.updateMaybe)
+        self._mdlOutline.rowsInserted.connect(self.reloadTimer.start)
+        self._mdlOutline.rowsRemoved.connect(self.reloadTimer.start)
+        self._mdlOutline.rowsMoved.connect(self.reloadTimer.start)
 
         self._mdlCharacter = mdlCharacter
         self._mdlCharacter.dataChanged.connect(self.reloadTimer.start)
 
     def updateMaybe(self, topLeft, bottomRight):
-        if topLeft.column() <= Outline.notes <= bottomRight.column():
-            self.reloadTimer.start
+        if topLeft.column() <= Outline.notes <= bottomRight.column() or \
+                topLeft.column() <= Outline.POV <= bottomRight.column() or \
+                topLeft.column() <= Outline.title <= bottomRight.column():
+            self.reloadTimer.start()
 
     def plotReferences(self):
         "Returns a list of plot references"
@@ -92,22 +107,29 @@ class storylineView(QWidget, Ui_storylineView):
 
         return r
 
-    def refresh(self):
-        if not self._mdlPlots or not self._mdlOutline or not self._mdlCharacter:
-            return
-
-        if not self.isVisible():
-            return
-
+    def clear(self):
+        "Removes every item from the scene, so that next refresh starts from scratch."
+        self.scene.clear()
+        self._outlineRects = {}
+        self._rows = {}
+        self._circles = {}
+        self._layout = None
+        self._rendered = None
+
+    def computeLayout(self):
+        """
+        Computes the geometry of everything that is drawn, without touching the
+        scene. Returns a dict of descriptors (tuples) keyed by a stable identity
+        (outline item ID, reference, ...), so that it can be compared to the
+        previous layout. "spans" holds the horizontal extent of each folder and
+        text in the scene, to draw only those in view.
+        """
         LINE_HEIGHT = 18
         SPACING = 3
         TEXT_WIDTH = self.sldTxtSize.value()
         CIRCLE_WIDTH = 10
         LEVEL_HEIGHT = 12
 
-        s = self.scene
-        s.clear()
-
         # Get Max Level (max depth)
         root = self._mdlOutline.rootItem
         def maxLevel(item, level=0, max=0):
@@ -130,39 +152,34 @@ class storylineView(QWidget, Ui_storylineView):
         if self.actCharacters.isChecked():
             trackedItems += self.charactersReferences()
 
+        # Type and ID of each reference, computed once
+        tracked = []
+        for ref in trackedItems:
+            match = re.fullmatch(references.RegEx, ref)
+            tracked.append((ref, match.group(1), match.group(2)))
+
         ROWS_HEIGHT = len(trackedItems) * (LINE_HEIGHT + SPACING )
 
-        fm = QFontMetrics(s.font())
+        titles = {ref: references.title(ref) or "" for ref in trackedItems}
+        fm = QFontMetrics(self.scene.font())
         max_name = 0
         for ref in trackedItems:
-            name = references.title(ref)
-            max_name = max(fm.width(name), max_name)
+            max_name = max(fm.width(titles[ref]), max_name)
 
         TITLE_WIDTH = max_name + 2 * SPACING
 
-        # Add Folders and Texts
-        outline = OutlineRect(0, 0, 0, ROWS_HEIGHT + SPACING + MAX_LEVEL * LEVEL_HEIGHT)
-        s.addItem(outline)
-        outline.setPos(TITLE_WIDTH + SPACING, 0)
+        layout = {
+            "rects": {},
+            "spans": {},
+            "rows": {},
+            "circles": {},
+        }
 
-        refCircles = [] # a list of all references, to be added later on the lines
-
-        # A Function to add a rect with centered elided text
-        def addRectText(x, w, parent, text="", level=0, tooltip=""):
-            deltaH = LEVEL_HEIGHT if level else 0
-            r = OutlineRect(0, 0, w, parent.rect().height()-deltaH, parent, title=text)
-            r.setPos(x, deltaH)
-
-            txt = QGraphicsSimpleTextItem(text, r)
-            f = txt.font()
-            f.setPointSize(8)
-            fm = QFontMetricsF(f)
-            elidedText = fm.elidedText(text, Qt.ElideMiddle, w)
-            txt.setFont(f)
-            txt.setText(elidedText)
-            txt.setPos(r.boundingRect().center() - txt.boundingRect().center())
-            txt.setY(0)
-            return r
+        # Folders and Texts, stored in pre-order (parents before children)
+        # as ID → (parent ID, x, y, width, height, text)
+        OUTLINE_HEIGHT = ROWS_HEIGHT + SPACING + MAX_LEVEL * LEVEL_HEIGHT
+        OUTLINE_X = TITLE_WIDTH + SPACING
+        layout["rects"][root.ID()] = (None, OUTLINE_X, 0, 0, OUTLINE_HEIGHT, "")
 
         # A function to returns an item's width, by counting its children
         def itemWidth(item):
@@ -174,29 +191,30 @@ class storylineView(QWidget, Ui_storylineView):
             else:
                 return TEXT_WIDTH
 
-        def listItems(item, rect, level=0):
+        index = self._mdlOutline.referenceIndex
+
+        def listItems(item, x=0, height=OUTLINE_HEIGHT, level=0):
             delta = 0
+            deltaH = LEVEL_HEIGHT if level else 0
             for child in item.children():
                 w = itemWidth(child)
+                layout["spans"][child.ID()] = (OUTLINE_X + x + delta, OUTLINE_X + x + delta + w)
 
                 if child.isFolder():
-                    parent = addRectText(delta, w, rect, child.title(), level, tooltip=child.title())
-                    parent.setToolTip(references.tooltip(references.textReference(child.ID())))
-                    listItems(child, parent, level + 1)
+                    layout["rects"][child.ID()] = (item.ID(), delta, deltaH, w, height - deltaH, child.title())
+                    listItems(child, x + delta, height - deltaH, level + 1)
 
                 else:
-                    rectChild = addRectText(delta, TEXT_WIDTH, rect, "", level, tooltip=child.title())
-                    rectChild.setToolTip(references.tooltip(references.textReference(child.ID())))
-                    
+                    layout["rects"][child.ID()] = (item.ID(), delta, deltaH, TEXT_WIDTH, height - deltaH, "")
+
                     # Find tracked references in that scene (or parent folders)
-                    for ref in trackedItems:
+                    for ref, _type, ID in tracked:
 
                         result = []
 
                         # Tests if POV
                         scenePOV = False  # Will hold true of character is POV of the current text, not containing folder
-                        if references.type(ref) == references.CharacterLetter:
-                            ID = references.ID(ref)
+                        if _type == references.CharacterLetter:
                             c = child
                             while c:
                                 if c.POV() == ID:
@@ -205,30 +223,23 @@ class storylineView(QWidget, Ui_storylineView):
                                 c = c.parent()
 
                         # Search in notes/references
-                        c = child
-                        while c:
-                            result += references.findReferencesTo(ref, c, recursive=False)
-                            c = c.parent()
+                        if not result:
+                            c = child
+                            while c:
+                                if index.itemContains(c, ref):
+                                    result.append(c.ID())
+                                    break
+                                c = c.parent()
 
                         if result:
-                            ref2 = result[0]
-                            
-                            # Create a RefCircle with the reference
-                            c = RefCircle(TEXT_WIDTH / 2, - CIRCLE_WIDTH / 2, CIRCLE_WIDTH, ID=ref2, important=scenePOV)
-                            
-                            # Store it, with the position of that item, to display it on the line later on
-                            refCircles.append((ref, c, rect.mapToItem(outline, rectChild.pos())))
+                            layout["circles"][(ref, child.ID())] = (x + delta, result[0], scenePOV)
 
                 delta += w
 
-        listItems(root, outline)
+        listItems(root)
 
         OUTLINE_WIDTH = itemWidth(root)
-
-        # Add Tracked items
-        i = 0
-        itemsRect = s.addRect(0, 0, 0, 0)
-        itemsRect.setPos(0, MAX_LEVEL * LEVEL_HEIGHT + SPACING)
+        layout["spans"][root.ID()] = (OUTLINE_X, OUTLINE_X + OUTLINE_WIDTH)
 
         # Set of colors for plots (as long as they don't have their own colors)
         colors = [
@@ -237,65 +248,255 @@ class storylineView(QWidget, Ui_storylineView):
             "#4C0000", "#4C2200", "#3D0022",
         ]
 
-        for ref in trackedItems:
-            if references.type(ref) == references.CharacterLetter:
-                color = self._mdlCharacter.getCharacterByID(references.ID(ref)).color()
+        # Tracked items, as ref → (y, title width, title, color, line length)
+        TOP = MAX_LEVEL * LEVEL_HEIGHT + SPACING
+        for i, (ref, _type, ID) in enumerate(tracked):
+            if _type == references.CharacterLetter:
+                color = self._mdlCharacter.getCharacterByID(ID).color().name()
             else:
-                color = QColor(colors[i % len(colors)])
-
-            # Rect
-            r = QGraphicsRectItem(0, 0, TITLE_WIDTH, LINE_HEIGHT, itemsRect)
-            r.setPen(QPen(Qt.NoPen))
-            r.setBrush(QBrush(color))
-            r.setPos(0, i * LINE_HEIGHT + i * SPACING)
-            r.setToolTip(references.tooltip(ref))
-            i += 1
-
-            # Text
-            name = references.title(ref)
-            txt = QGraphicsSimpleTextItem(name, r)
-            txt.setPos(r.boundingRect().center() - txt.boundingRect().center())
-
-            # Line
-            line = PlotLine(0, 0,
-                            OUTLINE_WIDTH + SPACING, 0)
-            line.setPos(TITLE_WIDTH, r.mapToScene(r.rect().center()).y())
-            s.addItem(line)
-            line.setPen(QPen(color, 5))
-            line.setToolTip(references.tooltip(ref))
-
-            # We add the circles / references to text, on the line
-            for ref2, circle, pos in refCircles:
-                if ref2 == ref:
-                    circle.setParentItem(line)
-                    circle.setPos(pos.x(), 0)
-
-        # self.view.fitInView(0, 0, TOTAL_WIDTH, i * LINE_HEIGHT, Qt.KeepAspectRatioByExpanding) # KeepAspectRatio
-        self.view.setSceneRect(0, 0, 0, 0)
-
-
-class OutlineRect(QGraphicsRectItem):
+                color = colors[i % len(colors)]
+
+            layout["rows"][ref] = (TOP + i * (LINE_HEIGHT + SPACING), TITLE_WIDTH, LINE_HEIGHT,
+                                   titles[ref], color, OUTLINE_WIDTH + SPACING)
+
+        layout["circleWidth"] = CIRCLE_WIDTH
+        layout["textWidth"] = TEXT_WIDTH
+        layout["size"] = (OUTLINE_X + OUTLINE_WIDTH + SPACING, OUTLINE_HEIGHT)
+        return layout
+
+    def refresh(self):
+        """
+        Updates the scene. Only the items whose geometry or content changed
+        since last refresh are touched.
+        """
+        if not self._mdlPlots or not self._mdlOutline or not self._mdlCharacter:
+            return
+
+        if not self.isVisible():
+            return
+
+        layout = self.computeLayout()
+        # So that the view scrolls over the whole layout, even where no item
+        # is created yet
+        self.scene.setSceneRect(0, 0, *layout["size"])
+        visible = self.visibleRange()
+        if layout == self._layout and self.isRendered(visible):
+            return
+
+        self.renderLayout(layout, visible)
+
+    def updateVisible(self):
+        "Creates the items that are scrolled into view."
+        if self._layout is None or not self.isVisible():
+            return
+
+        visible = self.visibleRange()
+        if not self.isRendered(visible):
+            self.renderLayout(self._layout, visible)
+
+    def visibleRange(self):
+        "Returns the horizontal range of the scene that is shown."
+        r = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        return (r.left(), r.right())
+
+    def isRendered(self, visible):
+        "Returns True if the items in the range `visible` are all created."
+        return self._rendered is not None and \
+            self._rendered[0] <= visible[0] and visible[1] <= self._rendered[1]
+
+    def renderLayout(self, layout, visible):
+        """
+        Updates the scene to `layout`. Folders, texts and their circles are
+        only created when they are in the range `visible` (or within one width
+        of it on each side) and removed once they are out of it, so that the
+        scene stays small however long the book is.
+        """
+        if self._layout and (layout["circleWidth"], layout["textWidth"]) != \
+                (self._layout["circleWidth"], self._layout["textWidth"]):
+            # Everything depends on those
+            self.clear()
+
+        margin = visible[1] - visible[0]
+        left, right = visible[0] - margin, visible[1] + margin
+        spans = layout["spans"]
+
+        def shown(ID):
+            span = spans.get(ID)
+            return span is None or (span[1] >= left and span[0] <= right)
+
+        s = self.scene
+
+        # Folders and texts
+        rects = layout["rects"]
+        for ID, desc in rects.items():
+            if not shown(ID):
+                continue
+
+            parentID, x, y, w, h, text = desc
+            r = self._outlineRects.get(ID)
+            if r is None:
+                r = OutlineRect(0, 0, w, h, title=text)
+                r.setToolTipRef(references.textReference(ID) if parentID is not None else None)
+                self._outlineRects[ID] = r
+            elif self._layout and self._layout["rects"].get(ID) == desc:
+                continue
+
+            parent = self._outlineRects.get(parentID)
+            if r.parentItem() is not parent:
+                r.setParentItem(parent)
+            if r.scene() is not s:
+                s.addItem(r)
+            r.setRect(0, 0, w, h)
+            r.setPos(x, y)
+            r.setText(text)
+
+        self.removeItems([self._outlineRects.pop(ID)
+                          for ID in list(self._outlineRects) if ID not in rects or not shown(ID)])
+
+        # Tracked items
+        rows = layout["rows"]
+        for ref, desc in rows.items():
+            y, titleWidth, lineHeight, name, color, lineLength = desc
+            if ref in self._rows and self._layout and self._layout["rows"].get(ref) == desc:
+                continue
+
+            if ref not in self._rows:
+                r = TrackedRect(ref)
+                line = PlotLine(0, 0, 0, 0)
+                line.setToolTipRef(ref)
+                s.addItem(r)
+                s.addItem(line)
+                self._rows[ref] = (r, line)
+
+            r, line = self._rows[ref]
+            r.setRect(0, 0, titleWidth, lineHeight)
+            r.setBrush(QBrush(QColor(color)))
+            r.setPos(0, y)
+            r.setText(name)
+
+            line.setLine(0, 0, lineLength, 0)
+            line.setPos(titleWidth, y + lineHeight / 2)
+            line.setPen(QPen(QColor(color), 5))
+
+        # Circles first, since they are children of the lines
+        circles = layout["circles"]
+        self.removeItems([self._circles.pop(key)
+                          for key in list(self._circles) if key not in circles or not shown(key[1])])
+        self.removeItems([item for ref in list(self._rows) if ref not in rows
+                          for item in self._rows.pop(ref)])
+
+        # We add the circles / references to text, on the lines
+        textWidth = layout["textWidth"]
+        circleWidth = layout["circleWidth"]
+        for key, desc in circles.items():
+            if not shown(key[1]):
+                continue
+
+            x, ID, important = desc
+            c = self._circles.get(key)
+            if c is not None and self._layout["circles"].get(key) == desc:
+                continue
+
+            if c is not None:
+                self.removeItems([c])
+            c = RefCircle(textWidth / 2, - circleWidth / 2, circleWidth, ID=ID, important=important)
+            c.setParentItem(self._rows[key[0]][1])
+            c.setPos(x, 0)
+            self._circles[key] = c
+
+        self._layout = layout
+        self._rendered = (left, right)
+
+    def removeItems(self, items):
+        # We hold a reference to all items until they are all removed, since
+        # some might be children of others (and removed with them).
+        for item in items:
+            if item.scene() is self.scene:
+                self.scene.removeItem(item)
+
+
+class lazyToolTip():
+    """
+    Mixin for graphic items whose tooltip describes a reference. The tooltip is
+    computed each time the item is hovered, so that it is never outdated.
+    """
+    _toolTipRef = None
+
+    def toolTipRef(self):
+        return self._toolTipRef
+
+    def setToolTipRef(self, ref):
+        self._toolTipRef = ref
+        self.setToolTip("")
+
+    def loadToolTip(self):
+        if self._toolTipRef:
+            self.setToolTip(references.tooltip(self._toolTipRef))
+
+
+class TrackedRect(lazyToolTip, QGraphicsRectItem):
+    "The title of a tracked item (plot or character), on the left."
+    def __init__(self, ref, parent=None):
+        QGraphicsRectItem.__init__(self, 0, 0, 0, 0, parent)
+        self.setPen(QPen(Qt.NoPen))
+        self.setAcceptHoverEvents(True)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.setToolTipRef(ref)
+        self._text = QGraphicsSimpleTextItem(self)
+
+    def setText(self, text):
+        self._text.setText(text)
+        self._text.setPos(self.boundingRect().center() - self._text.boundingRect().center())
+
+    def hoverEnterEvent(self, event):
+        self.loadToolTip()
+
+
+class OutlineRect(lazyToolTip, QGraphicsRectItem):
     def __init__(self, x, y, w, h, parent=None, title=None):
         QGraphicsRectItem.__init__(self, x, y, w, h, parent)
         self.setBrush(Qt.white)
         self.setAcceptHoverEvents(True)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
         self._title = title
+        self._text = None
+
+    def setText(self, text):
+        "Sets a centered elided text at the top of the rect."
+        self._title = text
+        if not text:
+            if self._text:
+                self._text.setText("")
+            return
+
+        if not self._text:
+            self._text = QGraphicsSimpleTextItem(self)
+            f = self._text.font()
+            f.setPointSize(8)
+            self._text.setFont(f)
+
+        fm = QFontMetricsF(self._text.font())
+        self._text.setText(fm.elidedText(text, Qt.ElideMiddle, self.rect().width()))
+        self._text.setPos(self.boundingRect().center() - self._text.boundingRect().center())
+        self._text.setY(0)
 
     def hoverEnterEvent(self, event):
+        self.loadToolTip()
         self.setBrush(Qt.lightGray)
 
     def hoverLeaveEvent(self, event):
         self.setBrush(Qt.white)
 
 
-class RefCircle(QGraphicsEllipseItem):
+class RefCircle(lazyToolTip, QGraphicsEllipseItem):
     def __init__(self, x, y, diameter, parent=None, ID=None, important=False):
         QGraphicsEllipseItem.__init__(self, x, y, diameter, diameter, parent)
         self.setBrush(Qt.white)
         self._ref = references.textReference(ID)
-        self.setToolTip(references.tooltip(self._ref))
+        self.setToolTipRef(self._ref)
         self.setPen(QPen(Qt.black, 2))
         self.setAcceptHoverEvents(True)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
         if important:
             self.setBrush(Qt.black)
 
@@ -309,18 +510,21 @@ class RefCircle(QGraphicsEllipseItem):
         references.open(self._ref)
 
     def hoverEnterEvent(self, event):
+        self.loadToolTip()
         self.multiplyDiameter(2)
 
     def hoverLeaveEvent(self, event):
         self.multiplyDiameter(.5)
 
 
-class PlotLine(QGraphicsLineItem):
+class PlotLine(lazyToolTip, QGraphicsLineItem):
     def __init__(self, x1, y1, x2, y2, parent=None):
         QGraphicsLineItem.__init__(self, x1, y1, x2, y2, parent)
         self.setAcceptHoverEvents(True)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
     def hoverEnterEvent(self, QGraphicsSceneHoverEvent):
+        self.loadToolTip()
         p = self.pen()
         p.setWidth(10)
         self.setPen(p)
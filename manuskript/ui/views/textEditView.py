@@ -645,6 +645,13 @@ class textEditView(QTextEdit):
 
                     popup_menu.insertAction(popup_menu.actions()[0], addAction)
 
+                    # Adds: add all unknown words to dictionary
+                    addAllAction = QAction(self.tr("Add all &unknown words of this text to dictionary"), popup_menu)
+                    addAllAction.setIcon(QIcon.fromTheme("list-add"))
+                    addAllAction.triggered.connect(self.addAllWordsToDict)
+
+                    popup_menu.insertAction(popup_menu.actions()[1], addAllAction)
+
                     # Only add the spelling suggests to the menu if there are
                     # suggestions.
                     if match.replacements and len(match.replacements) > 0:
@@ -715,11 +722,21 @@ class textEditView(QTextEdit):
     def addWordToDict(self):
         word = self.sender().data()
         self._dict.addWord(word)
+        Spellchecker.service().invalidate(self._dict)
+        self.highlighter.rehighlight()
+
+    def addAllWordsToDict(self):
+        text = self.toPlainText() + " "
+        words = [match.getWord(text) for match in self._dict.checkText(text)
+                 if match.locqualityissuetype == 'misspelling']
+        self._dict.addWords(words)
+        Spellchecker.service().invalidate(self._dict)
         self.highlighter.rehighlight()
 
     def rmWordFromDict(self):
         word = self.sender().data()
         self._dict.removeWord(word)
+        Spellchecker.service().invalidate(self._dict)
         self.highlighter.rehighlight()
 
     ###############################################################################
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""
+Benchmarks the compilation of the plain text exporter.
+
+Usage: python3 util/benchmark_export.py [repeat]
+
+Compiles synthetic outlines of growing size, with every transformation
+enabled, and prints the best time out of `repeat` runs for each of them, in
+total and per item. The time per item should stay about the same as the
+outline grows. The last columns are the time to compile the outline with
+worker processes (one per processor), and to compile it again from the
+compile cache.
+"""
+
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+
+from PyQt5.QtWidgets import QApplication
+
+# One paragraph of dialogue with some text to transform
+PARAGRAPH = "“Did you  really say that?” she asked... \"Yes\" --- he said, 'twice'.  Again... "
+
+SETTINGS = {
+    "Content": {
+        "More": False,
+        "IgnoreCompile": False,
+        "FolderTitle": True,
+        "TextTitle": True,
+        "TextText": True,
+    },
+    "Separator": {"FF": "\n", "TT": "\n", "FT": "\n", "TF": "\n"},
+    "Transform": {
+        "Dash": True,
+        "Ellipse": True,
+        "Spaces": True,
+        "DoubleQuotes": "“___”",
+        "SingleQuote": "‘___’",
+        "Custom": [
+            [True, "said", "told", False],
+            [True, r"\b(\w+)ly\b", r"\1", True],
+        ],
+    },
+    "Performance": {"Workers": 0},
+}
+
+
+def outline(count):
+    "Returns the root of an outline of `count` texts, in folders of ten."
+    from manuskript.models import outlineItem
+
+    root = outlineItem(title="Root")
+    folder = None
+    for i in range(count):
+        if i % 10 == 0:
+            folder = outlineItem(title="Chapter {}".format(i // 10), parent=root)
+        item = outlineItem(title="Scene {}".format(i), _type="md", parent=folder)
+        item._data[item.enum.text] = PARAGRAPH * 20
+    return root
+
+
+def timeCompile(exporter, root, settings, repeat, cached):
+    "Returns the best time to compile `root` and the size of the output."
+    best = None
+    for i in range(repeat):
+        if not cached:
+            exporter.clearCompileCache()
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in exporter.compileChunks(root, settings))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+
+def benchmark(count, repeat):
+    from manuskript.exporter.manuskript.plainText import plainText
+
+    root = outline(count)
+    exporter = plainText()
+    exporter.compileCacheLimit = float("inf")
+    exporter.parallelThreshold = 0
+    serial = {**SETTINGS, "Performance": {"Workers": 1}}
+    best, size = timeCompile(exporter, root, serial, repeat, cached=False)
+    parallel, size = timeCompile(exporter, root, SETTINGS, repeat, cached=False)
+    cached, size = timeCompile(exporter, root, SETTINGS, repeat, cached=True)
+
+    print("{:>8} items {:>12} chars {:>10.1f} ms {:>10.1f} µs/item {:>10.1f} ms {:>10.1f} ms".format(
+        count, size, best * 1000, best * 1000000 / count, parallel * 1000, cached * 1000))
+
+
+def main(argv) -> int:
+    repeat = int(argv[1]) if len(argv) > 1 else 3
+
+    app = QApplication([])
+    print("{:>44}{:>33}{:>14}".format("serial", "parallel", "cached"))
+    for count in [100, 1000, 10000]:
+        benchmark(count, repeat)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# --!-- coding: utf8 --!--
+
+"""
+Benchmarks the markdown tokenizer used by the editor's highlighter.
+
+Usage: python3 util/benchmark_tokenizer.py [project folder] [repeat]
+
+Tokenizes every block of the texts of the project (the sample project by
+default), then synthetic paragraphs of growing length, and prints the best
+time out of `repeat` runs for each suite, with the inline scanner and with
+the cascade of QRegExp searches.
+"""
+
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent))
+
+from manuskript.ui.highlighters import MarkdownTokenizer
+from manuskript.ui.highlighters import MarkdownState as MS
+
+SAMPLE_PROJECT = pathlib.Path(__file__).absolute().parent.parent / "sample-projects" / "book-of-acts"
+
+# One sentence of dialogue with the usual inline markup
+SENTENCE = "“Did you *really* say that?” she asked, **frowning**. [See](note) ~~what~~ {++he++} meant @Peter. "
+
+
+def projectTexts(path):
+    "Returns the text of every markdown file of the project in `path`, without its header."
+    texts = []
+    for file in sorted(pathlib.Path(path).glob("**/*.md")):
+        content = file.read_text(encoding="utf-8")
+        # The header ends with the first empty line
+        header, _, text = content.partition("\n\n")
+        texts.append(text)
+    return texts
+
+
+def syntheticTexts():
+    "Returns paragraphs of dialogue of growing length."
+    return [SENTENCE * count for count in [10, 100, 1000]]
+
+
+def tokenizeText(tokenizer, text):
+    "Tokenizes `text` block by block, as the highlighter does."
+    previousState = MS.MarkdownStateUnknown
+    tokens = 0
+    for block in text.split("\n"):
+        tokenizer.clear()
+        tokenizer.tokenize(block, MS.MarkdownStateUnknown, previousState, MS.MarkdownStateUnknown)
+        tokens += len(tokenizer.getTokens())
+        previousState = tokenizer.getState()
+    return tokens
+
+
+def timeTokenizer(tokenizer, texts, repeat):
+    "Returns the best time to tokenize `texts` and the number of tokens."
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        tokens = sum(tokenizeText(tokenizer, text) for text in texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tokens
+
+
+def benchmark(name, texts, repeat):
+    tokenizer = MarkdownTokenizer()
+    times = {}
+    for scanner in [True, False]:
+        tokenizer.useInlineScanner = scanner
+        times[scanner], tokens = timeTokenizer(tokenizer, texts, repeat)
+
+    size = sum(len(text) for text in texts)
+    print("{:<30} {:>10} chars {:>8} tokens {:>10.1f} ms {:>10.1f} ms".format(
+        name, size, tokens, times[True] * 1000, times[False] * 1000))
+
+
+def main(argv) -> int:
+    path = argv[1] if len(argv) > 1 else SAMPLE_PROJECT
+    repeat = int(argv[2]) if len(argv) > 2 else 3
+
+    if not os.path.isdir(path):
+        print("Not a project folder: {}".format(path))
+        return 1
+
+    print("{:<30} {:>16} {:>15} {:>13} {:>13}".format("", "", "", "scanner", "cascade"))
+    benchmark("Project: {}".format(pathlib.Path(path).name), projectTexts(path), repeat)
+    for text in syntheticTexts():
+        benchmark("Paragraph of {} chars".format(len(text)), [text], repeat)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))